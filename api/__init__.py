@@ -0,0 +1,12 @@
+"""
+Optional HTTP API for sharing one database between several workstations.
+
+``api.server`` needs fastapi/uvicorn and ``api.client`` needs requests; import
+the submodules directly so the desktop app does not depend on them.
+"""
+
+# Largest page the server returns from GET /offenders
+MAX_PAGE_SIZE = 500
+
+# Shared secret: the server requires it as "Authorization: Bearer <token>"
+API_TOKEN_ENV = "OFFENDER_API_TOKEN"
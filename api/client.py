@@ -0,0 +1,267 @@
+"""
+Client-mode replacement for DatabaseManager that talks to the API server.
+"""
+
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from api import API_TOKEN_ENV, MAX_PAGE_SIZE
+from database.database_manager import ConcurrencyConflictError
+from models.offender import Offender, RiskLevel, Status
+from models.offender_frame import OffenderFrame
+from services.offender_service import OffenderService
+
+
+class RemoteDatabaseManager:
+    """Offender operations of DatabaseManager served by a remote API server.
+
+    GET responses are kept per URL and revalidated with If-None-Match, so
+    unchanged data costs the server a 304 instead of a full response.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0, page_size: int = 500,
+                 token: Optional[str] = None):
+        """Initialize client with server base URL and the server's access token."""
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.db_path = self.base_url
+        self.timeout = timeout
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.session: Optional[requests.Session] = None
+        self._etag_cache: Dict[str, Tuple[str, Any]] = {}
+        self._is_connected = False
+
+    def connect(self):
+        """Open HTTP session."""
+        if not self._is_connected:
+            self.session = requests.Session()
+            self._is_connected = True
+
+    def disconnect(self):
+        """Close HTTP session."""
+        if self.session and self._is_connected:
+            self.session.close()
+            self.session = None
+            self._is_connected = False
+
+    def clone(self) -> 'RemoteDatabaseManager':
+        """New client for the same server with its own HTTP session (for worker threads)."""
+        return RemoteDatabaseManager(self.base_url, self.timeout, self.page_size, self.token)
+
+    def __enter__(self):
+        """Context manager entry."""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.disconnect()
+
+    def ensure_connected(self):
+        """Ensure HTTP session is open."""
+        if not self._is_connected or not self.session:
+            self.connect()
+
+    def commit(self):
+        """Writes are committed by the server."""
+
+    def rollback(self):
+        """Writes are committed by the server."""
+
+    @contextmanager
+    def read_snapshot(self) -> Iterator['RemoteDatabaseManager']:
+        """Each server response is read from one snapshot already."""
+        yield self
+
+    # HTTP helpers
+    def _headers(self) -> Dict[str, str]:
+        """Headers sent with every request."""
+        return {'Authorization': f"Bearer {self.token}"} if self.token else {}
+
+    @staticmethod
+    def _check_authorized(response: requests.Response):
+        """Turn a 401 into an error that names the missing setting."""
+        if response.status_code == 401:
+            raise PermissionError(f"Máy chủ từ chối truy cập: thiếu hoặc sai mã {API_TOKEN_ENV}")
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET JSON, revalidating a previously cached response with its ETag."""
+        self.ensure_connected()
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        key = f"{path}?{sorted(params.items())}"
+        headers = self._headers()
+        cached = self._etag_cache.get(key)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+
+        response = self.session.get(f"{self.base_url}{path}", params=params,
+                                    headers=headers, timeout=self.timeout)
+        self._check_authorized(response)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            self._etag_cache[key] = (etag, data)
+        return data
+
+    def _send(self, method: str, path: str, payload: Optional[dict] = None) -> Any:
+        """Send a write request and return the JSON response."""
+        self.ensure_connected()
+        response = self.session.request(method, f"{self.base_url}{path}", json=payload,
+                                        headers=self._headers(), timeout=self.timeout)
+        self._check_authorized(response)
+        if response.status_code == 422:
+            raise ValueError(response.json().get('detail', 'Dữ liệu không hợp lệ'))
+        if response.status_code == 409:
+            detail = response.json()['detail']
+            current = Offender.from_dict(dict(detail['current'])) if detail.get('current') else None
+            raise ConcurrencyConflictError(
+                (payload or {}).get('id'), detail['expected_version'], current
+            )
+        response.raise_for_status()
+        return response.json()
+
+    # Offender operations
+    def create_offender(self, offender: Offender) -> int:
+        """Create new offender record."""
+        return self._send('POST', '/offenders', offender.to_dict())['id']
+
+    def get_offender(self, offender_id: int) -> Optional[Offender]:
+        """Get offender by ID."""
+        data = self._get(f'/offenders/{offender_id}')
+        return Offender.from_dict(dict(data)) if data else None
+
+    def get_offenders_page(self, offset: int = 0, limit: int = 50,
+                           status: Optional[str] = None,
+                           search_term: Optional[str] = None) -> Tuple[List[Offender], int]:
+        """Get one page of offenders and the total number of matching rows."""
+        if limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must not exceed the server's page size cap ({MAX_PAGE_SIZE})")
+        if offset % limit:
+            raise ValueError("offset must be a multiple of limit")
+        data = self._get('/offenders', {
+            'page': offset // limit + 1, 'page_size': limit,
+            'status': status, 'search': search_term
+        })
+        return [Offender.from_dict(dict(item)) for item in data['items']], data['total']
+
+    def _get_all_pages(self, status: Optional[str] = None,
+                       search_term: Optional[str] = None) -> List[Offender]:
+        """Fetch every page of a listing."""
+        offenders: List[Offender] = []
+        offset = 0
+        while True:
+            page, total = self.get_offenders_page(offset, self.page_size, status, search_term)
+            offenders.extend(page)
+            offset += self.page_size
+            if not page or offset >= total:
+                return offenders
+
+    def get_all_offenders(self) -> List[Offender]:
+        """Get all offenders."""
+        return self._get_all_pages()
+
+    def count_offenders(self) -> int:
+        """Count all offenders."""
+        return self.get_offenders_page(0, 1)[1]
+
+    def count_offenders_by_status(self, status: Status) -> int:
+        """Count offenders with a status."""
+        return self.get_offenders_page(0, 1, status=status.value)[1]
+
+    def count_offenders_by_risk_level(self, risk_level: RiskLevel) -> int:
+        """Count offenders with a risk level (from the server's statistics)."""
+        return self._get('/statistics')[f'{risk_level.name.lower()}_risk']
+    
+    def iter_offenders(self, batch_size: int = 1000) -> Iterator[Offender]:
+        """Iterate over all offenders page by page."""
+        # Pages are addressed by index, so request them at the size the server actually serves
+        batch_size = min(batch_size, MAX_PAGE_SIZE)
+        offset = 0
+        while True:
+            page, total = self.get_offenders_page(offset, batch_size)
+            yield from page
+            offset += batch_size
+            if not page or offset >= total:
+                return
+
+    def get_offenders_frame(self, as_of: Optional[date] = None) -> OffenderFrame:
+        """Load all offenders as columnar arrays for analytics."""
+        return OffenderFrame.from_offenders(self.get_all_offenders(), as_of)
+    
+    def update_offender(self, offender: Offender) -> bool:
+        """Update offender record; raises ConcurrencyConflictError if it changed meanwhile."""
+        success = self._send('PUT', f'/offenders/{offender.id}', offender.to_dict())['success']
+        if success:
+            offender.row_version += 1
+        return success
+
+    def count_violations(self, offender_id: int) -> int:
+        """Violation history is applied by the server when it saves the record."""
+        return 0
+    
+    def get_statuses_by_case_number(self, case_numbers: List[str]) -> Dict[str, Status]:
+        """Stored status of each existing offender among ``case_numbers``."""
+        data = self._send('POST', '/offenders/statuses', {'case_numbers': list(case_numbers)})
+        return {case_number: Status(value) for case_number, value in data.items()}
+
+    def upsert_offenders(self, rows: List[tuple], commit: bool = True) -> int:
+        """Insert or update rows of UPSERT_COLUMNS on the server in one request.
+
+        The server commits each request, so ``commit=False`` cannot defer it.
+        """
+        encoded = [
+            [value.isoformat() if isinstance(value, date) else getattr(value, 'value', value)
+             for value in row]
+            for row in rows
+        ]
+        return self._send('POST', '/offenders/upsert', {'rows': encoded})['count']
+
+    def delete_offender(self, offender_id: int) -> bool:
+        """Delete offender record."""
+        return self._send('DELETE', f'/offenders/{offender_id}')['success']
+
+    def search_offenders(self, search_term: str) -> List[Offender]:
+        """Search offenders by name or case number."""
+        return self._get_all_pages(search_term=search_term)
+
+    def get_offenders_by_status(self, status: str) -> List[Offender]:
+        """Get offenders by status."""
+        return self._get_all_pages(status=status)
+
+    def get_offenders_by_completion_range(self, start_date: date, end_date: date) -> List[Offender]:
+        """Get offenders whose completion date falls within [start_date, end_date]."""
+        today = date.today()
+        data = self._get('/offenders/expiring', {
+            'start_days': (start_date - today).days,
+            'end_days': (end_date - today).days
+        })
+        return [Offender.from_dict(dict(item)) for item in data]
+
+    def count_offenders_by_completion_buckets(self, today: date, bucket_days: List[int]) -> List[int]:
+        """Count offenders completing within each of the given day horizons from today."""
+        # The server's buckets are computed for its own "today"
+        counts = self._get('/offenders/expiring/counts')
+        by_days = {OffenderService.EXPIRY_BUCKETS[name]: count for name, count in counts.items()}
+        missing = [days for days in bucket_days if days not in by_days]
+        if missing:
+            raise ValueError(f"Unsupported expiry buckets: {missing}")
+        return [by_days[days] for days in bucket_days]
+
+    def count_offender_cohorts(self, today: date, expiring_days: int = 30) -> Dict[str, int]:
+        """Dashboard cohort counts, computed by the server for its own "today"."""
+        return self._get('/offenders/cohorts', {'expiring_days': expiring_days})
+
+    def get_recent_activity(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest activity entries recorded by the server, newest first."""
+        entries = self._get('/activity', {'limit': limit})
+        for entry in entries:
+            entry['created_at'] = datetime.fromisoformat(entry['created_at'])
+        return entries
@@ -0,0 +1,284 @@
+"""
+HTTP API server sharing one offender database between several workstations.
+
+Run with:
+    OFFENDER_API_TOKEN=<secret> python -m api.server --db data/database.db --host 0.0.0.0 --port 8000
+
+Every request must carry "Authorization: Bearer <secret>". Without a token the
+server only listens on the loopback interface.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Body, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+from api import API_TOKEN_ENV, MAX_PAGE_SIZE
+from database.database_manager import UPSERT_COLUMNS, DatabaseManager, ConcurrencyConflictError
+from database.migrations import create_tables
+from models.offender import Offender
+from services.offender_service import OffenderService
+from services.report_service import ReportService
+
+
+OFFENDER_FIELDS = {f.name for f in fields(Offender)}
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values json does not know about."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, 'value'):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def decode_offender_data(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a JSON offender payload into typed field values (enums, dates)."""
+    data = {key: value for key, value in payload.items() if key in OFFENDER_FIELDS and key != 'id'}
+    offender = Offender.from_dict(dict(data))
+    return {key: getattr(offender, key) for key in data}
+
+
+class ResponseCache:
+    """Small LRU cache of serialized GET responses, invalidated by a data version token."""
+
+    def __init__(self, max_entries: int = 256):
+        """Initialize cache."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: str, version: str, build: Callable[[], Any]) -> Tuple[bytes, str]:
+        """Return (body, etag) for key, rebuilding it when the version changed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+
+        body = json.dumps(build(), ensure_ascii=False, default=_json_default).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, etag
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+
+class OffenderAPI:
+    """Holds per-thread database connections and the response cache for the API."""
+
+    def __init__(self, db_path: str = "data/database.db", cache_entries: int = 256):
+        """Initialize API state."""
+        self.db_path = db_path
+        self.cache = ResponseCache(cache_entries)
+        self.report_service = ReportService()
+        self._local = threading.local()
+        self._write_counter = 0
+        self._write_lock = threading.Lock()
+        # Never writes, so its data_version moves on every commit by the workers or other processes
+        self._version_db = DatabaseManager(db_path)
+        self._version_lock = threading.Lock()
+
+    def offender_service(self) -> OffenderService:
+        """Get the OffenderService bound to this worker thread's connection."""
+        service = getattr(self._local, 'offender_service', None)
+        if service is None:
+            db_manager = DatabaseManager(self.db_path)
+            db_manager.connect()
+            service = OffenderService(db_manager)
+            self._local.offender_service = service
+        return service
+
+    def data_version(self) -> str:
+        """Version token combining writes made through the API and SQLite's data_version."""
+        with self._version_lock:
+            data_version = self._version_db.get_data_version()
+        return f"{self._write_counter}:{data_version}"
+
+    def mark_changed(self):
+        """Invalidate cached responses after a write."""
+        with self._write_lock:
+            self._write_counter += 1
+
+    def cached_response(self, request: Request, build: Callable[[], Any]) -> Response:
+        """Serve a GET response from cache, answering 304 when the client's ETag matches."""
+        key = f"{request.url.path}?{request.url.query}"
+        body, etag = self.cache.get_or_build(key, self.data_version(), build)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def create_app(db_path: str = "data/database.db", cache_entries: int = 256,
+               token: Optional[str] = None) -> FastAPI:
+    """Create the FastAPI application; with a token every request must present it."""
+    create_tables(db_path)
+    api = OffenderAPI(db_path, cache_entries)
+    app = FastAPI(title="Offender Management API")
+    app.state.api = api
+
+    if token:
+        expected = f"Bearer {token}".encode()
+
+        @app.middleware("http")
+        async def require_token(request: Request, call_next):
+            supplied = request.headers.get('authorization', '').encode()
+            if not hmac.compare_digest(supplied, expected):
+                return JSONResponse({'detail': 'Unauthorized'}, status_code=401,
+                                    headers={'WWW-Authenticate': 'Bearer'})
+            return await call_next(request)
+
+    @app.get("/offenders")
+    def list_offenders(request: Request, page: int = 1, page_size: int = 50,
+                       status: Optional[str] = None, search: Optional[str] = None):
+        page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+
+        def build():
+            result = api.offender_service().get_offenders_page(page, page_size, status, search)
+            result['items'] = [o.to_dict() for o in result['items']]
+            return result
+        return api.cached_response(request, build)
+
+    @app.get("/offenders/expiring")
+    def expiring_offenders(request: Request, start_days: int = 0, end_days: int = 30):
+        def build():
+            offenders = api.offender_service().get_expiry_window(start_days, end_days)
+            return [o.to_dict() for o in offenders]
+        return api.cached_response(request, build)
+
+    @app.get("/offenders/expiring/counts")
+    def expiry_bucket_counts(request: Request):
+        return api.cached_response(request, lambda: api.offender_service().get_expiry_bucket_counts())
+
+    @app.get("/offenders/cohorts")
+    def cohort_counts(request: Request, expiring_days: int = 30):
+        return api.cached_response(request, lambda: api.offender_service().get_cohort_counts(expiring_days))
+
+    @app.get("/offenders/{offender_id}")
+    def get_offender(request: Request, offender_id: int):
+        offender = api.offender_service().get_offender(offender_id)
+        if not offender:
+            raise HTTPException(status_code=404, detail=f"Offender with ID {offender_id} not found")
+        return api.cached_response(request, offender.to_dict)
+
+    @app.post("/offenders", status_code=201)
+    def create_offender(payload: Dict[str, Any] = Body(...)):
+        try:
+            offender = api.offender_service().create_offender(decode_offender_data(payload))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        api.mark_changed()
+        return offender.to_dict()
+
+    @app.post("/offenders/statuses")
+    def offender_statuses(payload: Dict[str, Any] = Body(...)):
+        statuses = api.offender_service().db_manager.get_statuses_by_case_number(
+            payload.get('case_numbers', [])
+        )
+        return {case_number: status.value for case_number, status in statuses.items()}
+
+    @app.post("/offenders/upsert")
+    def upsert_offenders(payload: Dict[str, Any] = Body(...)):
+        rows = payload.get('rows', [])
+        if not isinstance(rows, list) or any(
+            not isinstance(row, list) or len(row) != len(UPSERT_COLUMNS) for row in rows
+        ):
+            raise HTTPException(status_code=422,
+                                detail=f"Each row must list the {len(UPSERT_COLUMNS)} upsert columns")
+        count = api.offender_service().db_manager.upsert_offenders([tuple(row) for row in rows])
+        api.mark_changed()
+        return {'count': count}
+
+    @app.put("/offenders/{offender_id}")
+    def update_offender(offender_id: int, payload: Dict[str, Any] = Body(...)):
+        try:
+            success = api.offender_service().update_offender(offender_id, decode_offender_data(payload))
+        except ConcurrencyConflictError as e:
+            api.mark_changed()
+            raise HTTPException(status_code=409, detail={
+                'message': str(e),
+                'expected_version': e.expected_version,
+                'current': e.current.to_dict() if e.current else None
+            })
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        api.mark_changed()
+        return {'success': success}
+
+    @app.delete("/offenders/{offender_id}")
+    def delete_offender(offender_id: int):
+        success = api.offender_service().delete_offender(offender_id)
+        api.mark_changed()
+        return {'success': success}
+
+    @app.get("/statistics")
+    def statistics(request: Request):
+        return api.cached_response(request, lambda: api.offender_service().get_statistics())
+
+    @app.get("/activity")
+    def recent_activity(limit: int = 10):
+        return api.offender_service().activity_log.recent(min(max(1, limit), 200))
+
+    @app.get("/reports/{report_type}")
+    def report(request: Request, report_type: str, status: Optional[str] = None,
+               risk_level: Optional[str] = None, search: Optional[str] = None):
+        if report_type not in api.report_service.report_templates:
+            raise HTTPException(status_code=404, detail=f"Unknown report type: {report_type}")
+        filters = {'status': status, 'risk_level': risk_level, 'search': search}
+
+        def build():
+            with api.offender_service().read_snapshot() as snapshot:
+                offenders = snapshot.get_offenders_frame()
+            return api.report_service.generate_report(report_type, offenders, filters)
+        return api.cached_response(request, build)
+
+    return app
+
+
+def main():
+    """Run the API server with uvicorn."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Offender management API server")
+    parser.add_argument("--db", default="data/database.db", help="SQLite database path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--limit-concurrency", type=int, default=None,
+                        help="Max concurrent connections before answering 503")
+    parser.add_argument("--token", default=os.environ.get(API_TOKEN_ENV),
+                        help=f"Access token clients must send (default: ${API_TOKEN_ENV})")
+    args = parser.parse_args()
+    if not args.token and args.host not in LOOPBACK_HOSTS:
+        parser.error(f"listening on {args.host} requires --token or {API_TOKEN_ENV}")
+
+    uvicorn.run(create_app(args.db, token=args.token), host=args.host, port=args.port,
+                limit_concurrency=args.limit_concurrency)
+
+
+if __name__ == "__main__":
+    main()
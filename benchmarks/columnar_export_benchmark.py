@@ -0,0 +1,65 @@
+"""
+Columnar export benchmark: Parquet/Arrow vs the Excel export for analytics handoff.
+
+Exports the same offenders as .xlsx (ExcelService.export_all_to_excel) and as
+Parquet and Arrow IPC (ExportService.export_columnar), then reports write time,
+file size and the time to load each file back with pandas.
+
+Run from the project root (requires pyarrow):
+    python -m benchmarks.columnar_export_benchmark --rows 50000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.hydration_benchmark import populate
+from database.database_manager import DatabaseManager
+from services.excel_service import ExcelService
+from services.export_service import ExportService
+from services.offender_service import OffenderService
+
+
+def timed(action):
+    """Seconds taken by ``action()``."""
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        populate(db_path, args.rows)
+        xlsx_path = str(Path(tmp) / "offenders.xlsx")
+        columnar_dir = Path(tmp) / "columnar"
+        with DatabaseManager(db_path) as db:
+            results = {
+                'xlsx': (timed(lambda: ExcelService(OffenderService(db)).export_all_to_excel(xlsx_path)),
+                         xlsx_path, lambda: pd.read_excel(xlsx_path))
+            }
+            for fmt in ('parquet', 'arrow'):
+                path = str(columnar_dir / f"offenders.{fmt}")
+                write = timed(lambda: ExportService(db).export_columnar(
+                    str(columnar_dir), fmt, tables=('offenders',)))
+                read = (lambda p=path: pd.read_parquet(p)) if fmt == 'parquet' else \
+                    (lambda p=path: pd.read_feather(p))
+                results[fmt] = (write, path, read)
+
+        print(f"rows: {args.rows}")
+        for name, (write, path, read) in results.items():
+            size = os.path.getsize(path)
+            print(f"{name:8} write {write:7.2f} s  size {size / 1024 / 1024:7.2f} MiB  "
+                  f"read {timed(read):7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Document render benchmark: seconds to render a batch of letters from one template.
+
+Renders the same jobs inline (one worker) and across the process pool with
+increasing worker counts.
+
+Run from the project root:
+    python -m benchmarks.document_render_benchmark --documents 200 --workers 1 2 4
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from docx import Document
+
+from services.document_service import DocumentService, RenderJob
+
+
+def build_template(path: str, paragraphs: int = 40):
+    """A letter-sized template with a few variables per paragraph."""
+    doc = Document()
+    doc.add_heading("GIẤY XÁC NHẬN {{ so_ho_so }}", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(f"{i}. Họ tên: {{{{ ten_doi_tuong }}}}, ngày sinh {{{{ ngay_sinh }}}}, "
+                          f"nơi cư trú {{{{ dia_chi }}}}.")
+    doc.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template_path = str(Path(tmp) / "template.docx")
+        build_template(template_path)
+        service = DocumentService()
+        print(f"documents: {args.documents}")
+        for workers in args.workers:
+            jobs = [
+                RenderJob(str(i), {'so_ho_so': f'HS{i}', 'ten_doi_tuong': f'Nguyễn Văn {i}',
+                                   'ngay_sinh': '01/01/1990', 'dia_chi': 'Phường 1'},
+                          str(Path(tmp) / f"w{workers}" / f"doc_{i}.docx"))
+                for i in range(args.documents)
+            ]
+            started = time.perf_counter()
+            result = service.render_batch(template_path, jobs, max_workers=workers)
+            elapsed = time.perf_counter() - started
+            print(f"workers {workers:2}  {elapsed:8.2f} s  {args.documents / elapsed:8.1f} docs/s  "
+                  f"errors {result['error_count']}")
+
+
+if __name__ == "__main__":
+    main()
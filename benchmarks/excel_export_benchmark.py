@@ -0,0 +1,70 @@
+"""
+Excel export benchmark: time and peak Python memory of the streaming exporter.
+
+Populates a temporary database, then exports every offender through
+ExcelService.export_all_to_excel (write-only workbook fed from a cursor) and
+through the previous DataFrame-based path, reporting tracemalloc peaks.
+
+Run from the project root:
+    python -m benchmarks.excel_export_benchmark --rows 100000
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.hydration_benchmark import populate
+from database.database_manager import DatabaseManager
+from services.excel_service import EXPORT_COLUMNS, EXPORT_SHEET_NAME, ExcelService
+from services.offender_service import OffenderService
+
+
+def legacy_export(db: DatabaseManager, file_path: str):
+    """List of dicts -> DataFrame -> openpyxl in normal mode, as before."""
+    data = [{column.header: column.value(o) for column in EXPORT_COLUMNS}
+            for o in db.get_all_offenders()]
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        pd.DataFrame(data).to_excel(writer, sheet_name=EXPORT_SHEET_NAME, index=False)
+
+
+def measure(export):
+    """Seconds and peak traced bytes of ``export()``."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    export()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        populate(db_path, args.rows)
+        with DatabaseManager(db_path) as db:
+            service = ExcelService(OffenderService(db))
+            results = {'streaming': measure(
+                lambda: service.export_all_to_excel(str(Path(tmp) / "streaming.xlsx")))}
+            if not args.skip_legacy:
+                results['legacy'] = measure(lambda: legacy_export(db, str(Path(tmp) / "legacy.xlsx")))
+
+    print(f"rows: {args.rows}")
+    for name, (elapsed, peak) in results.items():
+        print(f"{name:10} {elapsed:8.1f} s  {args.rows / elapsed:8.0f} rows/s  "
+              f"peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Excel import benchmark: seconds to import a district-sized workbook.
+
+Builds a workbook with the streaming exporter from a populated temporary
+database, then imports it into an empty database (all inserts) and again
+into the same database (all updates).
+
+Run from the project root:
+    python -m benchmarks.excel_import_benchmark --rows 50000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.hydration_benchmark import populate
+from database.database_manager import DatabaseManager
+from database.migrations import create_tables
+from services.excel_service import ExcelService
+from services.offender_service import OffenderService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source_path = str(Path(tmp) / "source.db")
+        workbook_path = str(Path(tmp) / "district.xlsx")
+        populate(source_path, args.rows)
+        with DatabaseManager(source_path) as db:
+            ExcelService(OffenderService(db)).export_all_to_excel(workbook_path)
+
+        target_path = str(Path(tmp) / "target.db")
+        create_tables(target_path)
+        with DatabaseManager(target_path) as db:
+            service = ExcelService(OffenderService(db))
+            print(f"rows: {args.rows}")
+            for label in ("insert", "update"):
+                started = time.perf_counter()
+                result = service.import_from_excel(workbook_path)
+                elapsed = time.perf_counter() - started
+                print(f"{label:8} {elapsed:8.1f} s  {args.rows / elapsed:8.0f} rows/s  "
+                      f"created {result['created_count']}  updated {result['updated_count']}  "
+                      f"errors {len(result['errors'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Microbenchmark: rows per second when hydrating Offender objects from SQLite.
+
+"before" decodes like the previous code did: rows come back as strings and
+every enum field is built with try/except and every date with fromisoformat.
+"after" is DatabaseManager.get_all_offenders, where the sqlite3 driver decodes
+enums and dates through the registered converters.
+
+Run from the project root:
+    python -m benchmarks.hydration_benchmark --rows 20000
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from database.database_manager import DatabaseManager
+from database.migrations import create_tables
+from models.offender import CaseType, Gender, Offender, RiskLevel, Status
+
+
+def legacy_from_dict(data: dict) -> Offender:
+    """Decoding as done by Offender.from_dict before driver-level converters."""
+    for name, enum_cls, default in [
+        ('gender', Gender, Gender.MALE), ('case_type', CaseType, CaseType.SUSPENDED_SENTENCE),
+        ('status', Status, Status.ACTIVE), ('risk_level', RiskLevel, RiskLevel.MEDIUM)
+    ]:
+        if name in data and data[name] and not hasattr(data[name], 'value'):
+            try:
+                data[name] = enum_cls(data[name])
+            except Exception:
+                data[name] = default
+    for date_field in ['birth_date', 'start_date', 'reduction_date', 'completion_date']:
+        if date_field in data and data[date_field] and isinstance(data[date_field], str):
+            data[date_field] = datetime.fromisoformat(data[date_field]).date()
+    for datetime_field in ['created_at', 'updated_at']:
+        if datetime_field in data and data[datetime_field] and isinstance(data[datetime_field], str):
+            data[datetime_field] = datetime.fromisoformat(data[datetime_field])
+    return Offender(**data)
+
+
+def populate(db_path: str, rows: int):
+    """Insert synthetic offenders."""
+    create_tables(db_path)
+    with DatabaseManager(db_path) as db:
+        today = date.today()
+        for i in range(rows):
+            offender = Offender(
+                case_number=f"HS{i:06d}", full_name=f"Đối tượng {i}",
+                gender=list(Gender)[i % 2], case_type=list(CaseType)[i % 5],
+                birth_date=date(1970 + i % 40, 1 + i % 12, 1 + i % 28),
+                start_date=today - timedelta(days=i % 700), duration_months=6 + i % 30,
+                risk_level=list(RiskLevel)[i % 3], ward=f"Phường {i % 12}"
+            )
+            db.execute(
+                "INSERT INTO offenders (case_number, full_name, gender, birth_date, case_type, "
+                "start_date, duration_months, completion_date, status, risk_level, ward, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (offender.case_number, offender.full_name, offender.gender, offender.birth_date,
+                 offender.case_type, offender.start_date, offender.duration_months,
+                 offender.completion_date, offender.status, offender.risk_level, offender.ward,
+                 offender.created_at, offender.updated_at)
+            )
+        db.commit()
+
+
+def bench_before(db_path: str) -> float:
+    """Hydrate from undecoded rows with per-field Enum construction."""
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    start = time.perf_counter()
+    rows = connection.execute("SELECT * FROM offenders ORDER BY created_at DESC").fetchall()
+    offenders = [legacy_from_dict(dict(row)) for row in rows]
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return len(offenders) / elapsed
+
+
+def bench_after(db_path: str) -> float:
+    """Hydrate through DatabaseManager with driver-level converters."""
+    with DatabaseManager(db_path) as db:
+        start = time.perf_counter()
+        offenders = db.get_all_offenders()
+        elapsed = time.perf_counter() - start
+    return len(offenders) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        populate(db_path, args.rows)
+        before = max(bench_before(db_path) for _ in range(args.repeat))
+        after = max(bench_after(db_path) for _ in range(args.repeat))
+
+    print(f"rows: {args.rows}")
+    print(f"before: {before:,.0f} rows/s")
+    print(f"after:  {after:,.0f} rows/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
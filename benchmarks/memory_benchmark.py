@@ -0,0 +1,58 @@
+"""
+Memory benchmark: per-record footprint of Offender vs its slotted variants.
+
+Loads the same rows from SQLite as regular Offender objects and as
+CompactOffender / FrozenOffender records, measuring retained memory with
+tracemalloc.
+
+Run from the project root:
+    python -m benchmarks.memory_benchmark --rows 100000
+"""
+
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.hydration_benchmark import populate
+from database.database_manager import DatabaseManager
+from models.compact import to_compact
+
+
+def measure(load) -> int:
+    """Bytes still allocated by the list returned from ``load``."""
+    gc.collect()
+    tracemalloc.start()
+    records = load()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        populate(db_path, args.rows)
+        with DatabaseManager(db_path) as db:
+            results = {
+                'Offender': measure(lambda: list(db.iter_offenders())),
+                'CompactOffender': measure(lambda: [to_compact(o) for o in db.iter_offenders()]),
+                'FrozenOffender': measure(lambda: [to_compact(o, True) for o in db.iter_offenders()])
+            }
+
+    baseline = results['Offender']
+    print(f"rows: {args.rows}")
+    for name, size in results.items():
+        print(f"{name:16} {size / args.rows:8.0f} bytes/record  "
+              f"{size / 1024 / 1024:8.1f} MiB  ({size / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Microbenchmark: milliseconds per 1,000 records when scoring the whole caseload.
+
+"rules" is the hand-weighted scorer AIService falls back to; "model" is a
+RiskModel trained on the same synthetic history (needs scikit-learn), scored
+through AIService.predict_risk_batch like OffenderService.rescore_all_risks.
+
+Run from the project root:
+    python -m benchmarks.risk_scoring_benchmark --rows 100000
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from models.offender import CaseType, Gender, Offender
+from models.offender_frame import OffenderFrame
+from services.ai_service import AIService
+from services.risk_model import train_risk_model
+
+
+def build_frame(rows: int) -> OffenderFrame:
+    """Synthetic caseload, half of it with ended terms and some violations."""
+    today = date.today()
+    offenders = []
+    violations = {}
+    for i in range(rows):
+        offenders.append(Offender(
+            id=i + 1, case_number=f"HS{i:06d}", full_name=f"Đối tượng {i}",
+            gender=list(Gender)[i % 2], case_type=list(CaseType)[i % 5],
+            birth_date=date(1960 + i % 45, 1 + i % 12, 1 + i % 28),
+            occupation=['', 'Thất nghiệp', 'Kỹ sư', 'Công nhân'][i % 4],
+            address=['Thành phố Hà Nội', 'Xã Hồng Hà', ''][i % 3],
+            start_date=today - timedelta(days=i % 1400), duration_months=6 + i % 30
+        ))
+        if i % 7 == 0 or (i % 4 < 2 and i % 3 == 0):
+            violations[i + 1] = 1 + i % 3
+    return OffenderFrame.from_offenders(offenders, violation_counts=violations)
+
+
+def bench(service: AIService, frame: OffenderFrame, repeat: int) -> float:
+    """Best time to score the frame, in ms per 1,000 records."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        service.predict_risk_batch(frame)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / (len(frame) / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = build_frame(args.rows)
+    rules = bench(AIService(model_dir=None), frame, args.repeat)
+    print(f"rows:  {args.rows}")
+    print(f"rules: {rules:.3f} ms per 1,000 records")
+    try:
+        model = train_risk_model(frame)
+    except RuntimeError as e:
+        print(f"model: skipped ({e})")
+        return
+    service = AIService(model_dir=None)
+    service.model = model
+    print(f"model: {bench(service, frame, args.repeat):.3f} ms per 1,000 records")
+
+
+if __name__ == "__main__":
+    main()
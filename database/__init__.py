@@ -2,10 +2,14 @@
 Database package for the offender management system.
 """
 
-from .database_manager import DatabaseManager
+from .database_manager import DatabaseManager, ConcurrencyConflictError
 from .migrations import create_tables
+from .maintenance import DatabaseMaintenance, MaintenanceScheduler
 
 __all__ = [
     'DatabaseManager',
-    'create_tables'
+    'ConcurrencyConflictError',
+    'create_tables',
+    'DatabaseMaintenance',
+    'MaintenanceScheduler'
 ] 
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+SQLite adapters and converters for model types.
+
+Dates, datetimes and enum columns are decoded once by the sqlite3 driver while
+rows are fetched, so models receive ready-made values. Enum columns are stored
+as TEXT, so queries request decoding with ``"column [type]"`` column-name hints
+(see OFFENDER_COLUMNS and USER_COLUMNS); DATE and DATETIME columns are decoded
+from their declared types.
+"""
+
+import sqlite3
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable, Dict, Optional, Type
+
+from models.offender import CaseType, Gender, RiskLevel, Status
+from models.user import UserRole, UserStatus
+from models.violation import ViolationStatus, ViolationType
+
+
+# Converter name -> Enum stored in that column
+ENUM_CONVERTERS: Dict[str, Type[Enum]] = {
+    'gender': Gender,
+    'case_type': CaseType,
+    'offender_status': Status,
+    'risk_level': RiskLevel,
+    'user_role': UserRole,
+    'user_status': UserStatus,
+    'violation_type': ViolationType,
+    'violation_status': ViolationStatus
+}
+
+
+def _enum_converter(enum_cls: Type[Enum]) -> Callable[[bytes], object]:
+    """Converter mapping raw column bytes to members; unknown values stay strings."""
+    members = {member.value.encode('utf-8'): member for member in enum_cls}
+
+    def convert(raw: bytes):
+        member = members.get(raw)
+        return member if member is not None else raw.decode('utf-8')
+    return convert
+
+
+def _convert_date(raw: bytes):
+    """DATE column converter."""
+    text = raw.decode('utf-8')
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return text
+
+
+def _convert_datetime(raw: bytes):
+    """DATETIME column converter."""
+    text = raw.decode('utf-8')
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+def _select_list(columns: Dict[str, Optional[str]]) -> str:
+    """Build a SELECT column list with converter hints for enum columns."""
+    return ", ".join(
+        f'{name} AS "{name} [{converter}]"' if converter else name
+        for name, converter in columns.items()
+    )
+
+
+OFFENDER_COLUMNS = _select_list({
+    'id': None, 'case_number': None, 'full_name': None, 'gender': 'gender',
+    'birth_date': None, 'address': None, 'ward': None, 'occupation': None, 'crime': None,
+    'case_type': 'case_type', 'sentence_number': None, 'decision_number': None,
+    'start_date': None, 'duration_months': None, 'reduced_months': None,
+    'reduction_date': None, 'reduction_count': None, 'completion_date': None,
+    'status': 'offender_status', 'days_remaining': None, 'risk_level': 'risk_level',
+    'risk_percentage': None, 'created_at': None, 'updated_at': None,
+    'created_by': None, 'notes': None, 'row_version': None
+})
+
+USER_COLUMNS = _select_list({
+    'id': None, 'username': None, 'email': None, 'full_name': None,
+    'role': 'user_role', 'status': 'user_status', 'password_hash': None, 'salt': None,
+    'created_at': None, 'updated_at': None, 'last_login': None,
+    'login_attempts': None, 'locked_until': None
+})
+
+
+def register_sqlite_types():
+    """Register adapters and converters with the sqlite3 module (idempotent)."""
+    for name, enum_cls in ENUM_CONVERTERS.items():
+        sqlite3.register_adapter(enum_cls, lambda member: member.value)
+        sqlite3.register_converter(name, _enum_converter(enum_cls))
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+    sqlite3.register_converter("date", _convert_date)
+    sqlite3.register_converter("datetime", _convert_datetime)
+    sqlite3.register_converter("timestamp", _convert_datetime)
@@ -3,12 +3,47 @@ Database manager for SQLite operations.
 """
 
 import sqlite3
-from typing import List, Optional
-from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime, date, timedelta
 from pathlib import Path
 
-from models.offender import Offender
+from models.offender import Offender, RiskLevel, Status
+from models.offender_frame import FRAME_QUERY, OffenderFrame
 from models.user import User
+from database.converters import OFFENDER_COLUMNS, USER_COLUMNS, register_sqlite_types
+
+
+register_sqlite_types()
+
+# Columns written by bulk imports (upsert_offenders), in parameter order
+UPSERT_COLUMNS = (
+    'case_number', 'full_name', 'gender', 'birth_date', 'address', 'occupation', 'crime',
+    'case_type', 'sentence_number', 'decision_number', 'start_date', 'duration_months',
+    'reduced_months', 'reduction_date', 'reduction_count', 'completion_date', 'status',
+    'days_remaining', 'notes', 'risk_level', 'risk_percentage'
+)
+
+# Upsert columns written only when a record is created; updated records keep them
+UPSERT_INSERT_ONLY_COLUMNS = ('risk_level', 'risk_percentage')
+
+# Stay well below SQLite's bound-parameter limit in IN (...) lists
+_MAX_IN_PARAMS = 500
+
+
+class ConcurrencyConflictError(Exception):
+    """Raised when a record was changed by someone else since it was read."""
+    
+    def __init__(self, offender_id: int, expected_version: int, current: Optional[Offender] = None):
+        """Keep the version the caller expected and the record as it is now."""
+        self.offender_id = offender_id
+        self.expected_version = expected_version
+        self.current = current
+        super().__init__(
+            f"Offender with ID {offender_id} was modified by another user "
+            f"(expected version {expected_version}, "
+            f"current version {current.row_version if current else 'deleted'})"
+        )
 
 
 class DatabaseManager:
@@ -30,6 +65,8 @@ class DatabaseManager:
                 check_same_thread=False
             )
             self.connection.row_factory = sqlite3.Row
+            # WAL lets snapshot readers run alongside writers without blocking either
+            self.connection.execute("PRAGMA journal_mode = WAL")
             self._is_connected = True
     
     def disconnect(self):
@@ -39,6 +76,10 @@ class DatabaseManager:
             self.connection = None
             self._is_connected = False
     
+    def clone(self) -> 'DatabaseManager':
+        """New manager for the same database with its own connection (for worker threads)."""
+        return DatabaseManager(str(self.db_path))
+    
     def __enter__(self):
         """Context manager entry."""
         self.connect()
@@ -53,6 +94,31 @@ class DatabaseManager:
         if not self._is_connected or not self.connection:
             self.connect()
     
+    @contextmanager
+    def read_snapshot(self) -> Iterator['SnapshotReader']:
+        """Open a dedicated read-only connection pinned to one consistent WAL snapshot.
+        
+        Everything read through the yielded reader sees the database as it was when
+        the block started, regardless of writes committed on other connections.
+        """
+        connection = sqlite3.connect(
+            f"file:{self.db_path.resolve().as_posix()}?mode=ro",
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        connection.row_factory = sqlite3.Row
+        try:
+            connection.execute("BEGIN")
+            # The snapshot is taken by the first read inside the transaction
+            connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            yield SnapshotReader(self.db_path, connection)
+        finally:
+            if connection.in_transaction:
+                connection.execute("COMMIT")
+            connection.close()
+    
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
         """Execute SQL query."""
         self.ensure_connected()
@@ -73,22 +139,41 @@ class DatabaseManager:
         if self.connection and self._is_connected:
             self.connection.rollback()
     
+    def iter_row_batches(self, query: str, params: tuple = (),
+                         batch_size: int = 1000) -> Iterator[List[sqlite3.Row]]:
+        """Run a query and yield its rows in lists of up to batch_size."""
+        cursor = self.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    
+    def count_rows(self, table: str) -> int:
+        """Count the rows of an existing table."""
+        exists = self.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if not exists:
+            raise ValueError(f"Unknown table: {table}")
+        return self.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    
     # Offender operations
     def create_offender(self, offender: Offender) -> int:
         """Create new offender record."""
         query = """
         INSERT INTO offenders (
-            case_number, full_name, gender, birth_date, address, occupation,
+            case_number, full_name, gender, birth_date, address, ward, occupation,
             crime, case_type, sentence_number, decision_number, start_date,
             duration_months, reduced_months, reduction_date, reduction_count,
             completion_date, status, days_remaining, risk_level, risk_percentage,
             created_at, updated_at, created_by, notes
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
         params = (
             offender.case_number, offender.full_name, offender.gender.value if hasattr(offender.gender, 'value') else str(offender.gender),
-            offender.birth_date, offender.address, offender.occupation,
+            offender.birth_date, offender.address, offender.ward, offender.occupation,
             offender.crime, offender.case_type.value if hasattr(offender.case_type, 'value') else str(offender.case_type), offender.sentence_number,
             offender.decision_number, offender.start_date, offender.duration_months,
             offender.reduced_months, offender.reduction_date, offender.reduction_count,
@@ -104,7 +189,7 @@ class DatabaseManager:
     
     def get_offender(self, offender_id: int) -> Optional[Offender]:
         """Get offender by ID."""
-        query = "SELECT * FROM offenders WHERE id = ?"
+        query = f"SELECT {OFFENDER_COLUMNS} FROM offenders WHERE id = ?"
         cursor = self.execute(query, (offender_id,))
         row = cursor.fetchone()
         
@@ -114,38 +199,165 @@ class DatabaseManager:
     
     def get_all_offenders(self) -> List[Offender]:
         """Get all offenders."""
-        query = "SELECT * FROM offenders ORDER BY created_at DESC"
+        query = f"SELECT {OFFENDER_COLUMNS} FROM offenders ORDER BY created_at DESC"
         cursor = self.execute(query)
         return [self._row_to_offender(row) for row in cursor.fetchall()]
     
+    def count_offenders(self) -> int:
+        """Count all offenders."""
+        return self.execute("SELECT COUNT(*) FROM offenders").fetchone()[0]
+    
+    def count_offenders_by_status(self, status: Status) -> int:
+        """Count offenders with a stored status (answered from idx_offenders_status)."""
+        return self.execute("SELECT COUNT(*) FROM offenders WHERE status = ?", (status,)).fetchone()[0]
+    
+    def count_offenders_by_risk_level(self, risk_level: RiskLevel) -> int:
+        """Count offenders with a stored risk level (answered from idx_offenders_risk_level)."""
+        return self.execute(
+            "SELECT COUNT(*) FROM offenders WHERE risk_level = ?", (risk_level,)
+        ).fetchone()[0]
+    
+    def iter_offenders(self, batch_size: int = 1000) -> Iterator[Offender]:
+        """Iterate over all offenders, fetching rows in batches."""
+        cursor = self.execute(f"SELECT {OFFENDER_COLUMNS} FROM offenders ORDER BY created_at DESC")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._row_to_offender(row)
+    
+    def get_offenders_frame(self, as_of: Optional[date] = None) -> OffenderFrame:
+        """Load all offenders as columnar arrays for analytics."""
+        return OffenderFrame.from_cursor(self.execute(FRAME_QUERY), as_of)
+    
+    def get_offenders_page(self, offset: int = 0, limit: int = 50,
+                           status: Optional[str] = None,
+                           search_term: Optional[str] = None) -> Tuple[List[Offender], int]:
+        """Get one page of offenders and the total number of matching rows."""
+        where = []
+        params: list = []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if search_term:
+            where.append("(full_name LIKE ? OR case_number LIKE ?)")
+            params.extend([f"%{search_term}%", f"%{search_term}%"])
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        
+        total = self.execute(f"SELECT COUNT(*) FROM offenders {where_sql}", tuple(params)).fetchone()[0]
+        cursor = self.execute(
+            f"SELECT {OFFENDER_COLUMNS} FROM offenders {where_sql} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            tuple(params) + (limit, offset)
+        )
+        return [self._row_to_offender(row) for row in cursor.fetchall()], total
+    
+    def get_data_version(self) -> int:
+        """SQLite's data_version: changes whenever another connection commits (not on this one's commits)."""
+        return self.execute("PRAGMA data_version").fetchone()[0]
+    
     def update_offender(self, offender: Offender) -> bool:
         """Update offender record."""
         query = """
         UPDATE offenders SET
             case_number = ?, full_name = ?, gender = ?, birth_date = ?,
-            address = ?, occupation = ?, crime = ?, case_type = ?,
+            address = ?, ward = ?, occupation = ?, crime = ?, case_type = ?,
             sentence_number = ?, decision_number = ?, start_date = ?,
             duration_months = ?, reduced_months = ?, reduction_date = ?,
             reduction_count = ?, completion_date = ?, status = ?,
             days_remaining = ?, risk_level = ?, risk_percentage = ?,
-            updated_at = ?, notes = ?
-        WHERE id = ?
+            updated_at = ?, notes = ?, row_version = row_version + 1
+        WHERE id = ? AND row_version = ?
         """
         
         params = (
             offender.case_number, offender.full_name, offender.gender.value if hasattr(offender.gender, 'value') else str(offender.gender),
-            offender.birth_date, offender.address, offender.occupation,
+            offender.birth_date, offender.address, offender.ward, offender.occupation,
             offender.crime, offender.case_type.value if hasattr(offender.case_type, 'value') else str(offender.case_type), offender.sentence_number,
             offender.decision_number, offender.start_date, offender.duration_months,
             offender.reduced_months, offender.reduction_date, offender.reduction_count,
             offender.completion_date, offender.status.value if hasattr(offender.status, 'value') else str(offender.status), offender.days_remaining,
             offender.risk_level.value if hasattr(offender.risk_level, 'value') else str(offender.risk_level), offender.risk_percentage,
-            datetime.now(), offender.notes, offender.id
+            datetime.now(), offender.notes, offender.id, offender.row_version
         )
         
         cursor = self.execute(query, params)
         self.commit()
-        return cursor.rowcount > 0
+        if cursor.rowcount > 0:
+            offender.row_version += 1
+            return True
+        
+        # No row matched: either it was deleted or someone else updated it first
+        current = self.get_offender(offender.id)
+        if current is None:
+            return False
+        raise ConcurrencyConflictError(offender.id, offender.row_version, current)
+    
+    def count_violations(self, offender_id: int) -> int:
+        """Number of violations recorded for an offender."""
+        row = self.execute("SELECT COUNT(*) FROM violations WHERE offender_id = ?", (offender_id,)).fetchone()
+        return row[0]
+    
+    def update_risk_scores(self, updates: List[Tuple[str, float, int]]) -> int:
+        """Write (risk_level, risk_percentage, id) rows in one transaction.
+        
+        Risk is derived data, so row_version is left alone and open edit forms
+        do not conflict with a re-scoring run.
+        """
+        if not updates:
+            return 0
+        now = datetime.now()
+        self.executemany(
+            "UPDATE offenders SET risk_level = ?, risk_percentage = ?, updated_at = ? WHERE id = ?",
+            [(level, percentage, now, offender_id) for level, percentage, offender_id in updates]
+        )
+        self.commit()
+        return len(updates)
+    
+    def get_statuses_by_case_number(self, case_numbers: Sequence[str]) -> Dict[str, Status]:
+        """Stored status of each existing offender among ``case_numbers``."""
+        statuses: Dict[str, Status] = {}
+        for start in range(0, len(case_numbers), _MAX_IN_PARAMS):
+            chunk = list(case_numbers[start:start + _MAX_IN_PARAMS])
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.execute(
+                f'SELECT case_number, status AS "status [offender_status]" FROM offenders '
+                f"WHERE case_number IN ({placeholders})", tuple(chunk)
+            )
+            statuses.update((row[0], row[1]) for row in cursor)
+        return statuses
+    
+    def upsert_offenders(self, rows: List[tuple], commit: bool = True) -> int:
+        """Insert or update (matched on case_number) rows of UPSERT_COLUMNS in one transaction.
+        
+        New records take the row's risk; updated records keep their risk
+        (UPSERT_INSERT_ONLY_COLUMNS) and get their row_version bumped so open
+        edit forms notice the change. With ``commit=False`` the caller decides
+        whether to commit or roll back.
+        """
+        if not rows:
+            return 0
+        columns = ", ".join(UPSERT_COLUMNS)
+        placeholders = ", ".join("?" * len(UPSERT_COLUMNS))
+        updates = ", ".join(
+            f"{name} = excluded.{name}" for name in UPSERT_COLUMNS[1:]
+            if name not in UPSERT_INSERT_ONLY_COLUMNS
+        )
+        query = f"""
+        INSERT INTO offenders ({columns}, created_at, updated_at)
+        VALUES ({placeholders}, ?, ?)
+        ON CONFLICT(case_number) DO UPDATE SET {updates},
+            updated_at = excluded.updated_at, row_version = row_version + 1
+        """
+        now = datetime.now()
+        try:
+            self.executemany(query, [row + (now, now) for row in rows])
+            if commit:
+                self.commit()
+        except sqlite3.Error:
+            self.rollback()
+            raise
+        return len(rows)
     
     def delete_offender(self, offender_id: int) -> bool:
         """Delete offender record."""
@@ -156,8 +368,8 @@ class DatabaseManager:
     
     def search_offenders(self, search_term: str) -> List[Offender]:
         """Search offenders by name or case number."""
-        query = """
-        SELECT * FROM offenders 
+        query = f"""
+        SELECT {OFFENDER_COLUMNS} FROM offenders 
         WHERE full_name LIKE ? OR case_number LIKE ?
         ORDER BY created_at DESC
         """
@@ -167,17 +379,179 @@ class DatabaseManager:
     
     def get_offenders_by_status(self, status: str) -> List[Offender]:
         """Get offenders by status."""
-        query = "SELECT * FROM offenders WHERE status = ? ORDER BY created_at DESC"
+        query = f"SELECT {OFFENDER_COLUMNS} FROM offenders WHERE status = ? ORDER BY created_at DESC"
         cursor = self.execute(query, (status,))
         return [self._row_to_offender(row) for row in cursor.fetchall()]
     
+    def get_offenders_by_completion_range(self, start_date: date, end_date: date) -> List[Offender]:
+        """Get offenders whose completion date falls within [start_date, end_date]."""
+        query = f"""
+        SELECT {OFFENDER_COLUMNS} FROM offenders
+        WHERE completion_date BETWEEN ? AND ?
+        ORDER BY completion_date
+        """
+        cursor = self.execute(query, (start_date, end_date))
+        return [self._row_to_offender(row) for row in cursor.fetchall()]
+    
+    def count_offenders_by_completion_buckets(self, today: date, bucket_days: List[int]) -> List[int]:
+        """Count offenders completing within each of the given day horizons from today."""
+        if not bucket_days:
+            return []
+        cases = ", ".join(
+            "COALESCE(SUM(CASE WHEN completion_date <= ? THEN 1 ELSE 0 END), 0)" for _ in bucket_days
+        )
+        query = f"""
+        SELECT {cases} FROM offenders
+        WHERE completion_date BETWEEN ? AND ?
+        """
+        params = tuple(today + timedelta(days=days) for days in bucket_days)
+        params += (today, today + timedelta(days=max(bucket_days)))
+        cursor = self.execute(query, params)
+        return list(cursor.fetchone())
+
+    def count_offender_cohorts(self, today: date, expiring_days: int = 30) -> Dict[str, int]:
+        """Count the dashboard cohorts, each with a query answered from an index.
+
+        Keys: total, active, completed, violation, high_risk (status/risk indexes),
+        expiring (completing within expiring_days), overdue (past completion date but
+        not completed) and reduction_eligible (served at least a third of the sentence,
+        still serving) from completion_date ranges.
+        """
+        by_status = dict(self.execute(
+            "SELECT status, COUNT(*) FROM offenders GROUP BY status"
+        ).fetchall())
+        high_risk = self.execute(
+            "SELECT COUNT(*) FROM offenders WHERE risk_level = ?", (RiskLevel.HIGH,)
+        ).fetchone()[0]
+        expiring = self.execute(
+            "SELECT COUNT(*) FROM offenders WHERE completion_date BETWEEN ? AND ?",
+            (today, today + timedelta(days=expiring_days))
+        ).fetchone()[0]
+        overdue = self.execute(
+            "SELECT COUNT(*) FROM offenders WHERE completion_date < ? AND status != ?",
+            (today, Status.COMPLETED)
+        ).fetchone()[0]
+        # Same rule as Offender.is_eligible_for_reduction, checked only for rows still serving
+        reduction_eligible = self.execute(
+            """
+            SELECT COUNT(*) FROM offenders
+            WHERE completion_date > ? AND status != ? AND start_date IS NOT NULL
+              AND julianday(?) - julianday(start_date) >= duration_months * 30.44 / 3
+            """,
+            (today, Status.COMPLETED, today)
+        ).fetchone()[0]
+        return {
+            'total': sum(by_status.values()),
+            'active': by_status.get(Status.ACTIVE.value, 0),
+            'completed': by_status.get(Status.COMPLETED.value, 0),
+            'violation': by_status.get(Status.VIOLATION.value, 0),
+            'high_risk': high_risk,
+            'expiring': expiring,
+            'overdue': overdue,
+            'reduction_eligible': reduction_eligible
+        }
+
     def _row_to_offender(self, row: sqlite3.Row) -> Offender:
         """Convert database row to Offender object."""
-        data = dict(row)
+        # Enums and dates were already decoded by the registered converters
+        return Offender(**dict(row))
+    
+    # Daily statistics operations
+    DAILY_STATS_DIMENSIONS = {
+        'status': 'status',
+        'risk_level': 'risk_level',
+        'ward': "COALESCE(ward, '')",
+        'case_type': 'case_type'
+    }
+    
+    def save_daily_stats(self, snapshot_date: date) -> int:
+        """Write aggregated offender counts for one day, replacing any earlier snapshot."""
+        self.ensure_connected()
+        created_at = datetime.now()
+        try:
+            self.execute("DELETE FROM daily_stats WHERE snapshot_date = ?", (snapshot_date,))
+            self.execute(
+                """
+                INSERT INTO daily_stats (snapshot_date, dimension, dimension_value, count, created_at)
+                SELECT ?, 'total', 'all', COUNT(*), ? FROM offenders
+                """,
+                (snapshot_date, created_at)
+            )
+            for dimension, column in self.DAILY_STATS_DIMENSIONS.items():
+                self.execute(
+                    f"""
+                    INSERT INTO daily_stats (snapshot_date, dimension, dimension_value, count, created_at)
+                    SELECT ?, ?, {column}, COUNT(*), ? FROM offenders GROUP BY {column}
+                    """,
+                    (snapshot_date, dimension, created_at)
+                )
+            self.commit()
+        except sqlite3.Error:
+            self.rollback()
+            raise
         
-        # Convert enum values
-        from models.offender import Offender
-        return Offender.from_dict(data)
+        cursor = self.execute("SELECT COUNT(*) FROM daily_stats WHERE snapshot_date = ?", (snapshot_date,))
+        return cursor.fetchone()[0]
+    
+    def has_daily_stats(self, snapshot_date: date) -> bool:
+        """Check whether a snapshot already exists for the given day."""
+        cursor = self.execute(
+            "SELECT 1 FROM daily_stats WHERE snapshot_date = ? LIMIT 1", (snapshot_date,)
+        )
+        return cursor.fetchone() is not None
+    
+    def get_daily_stats(self, dimension: str, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        dimension_value: Optional[str] = None) -> List[Tuple[date, str, int]]:
+        """Get (snapshot_date, dimension_value, count) rows for a dimension, oldest first."""
+        query = "SELECT snapshot_date, dimension_value, count FROM daily_stats WHERE dimension = ?"
+        params: list = [dimension]
+        if start_date:
+            query += " AND snapshot_date >= ?"
+            params.append(start_date)
+        if end_date:
+            query += " AND snapshot_date <= ?"
+            params.append(end_date)
+        if dimension_value is not None:
+            query += " AND dimension_value = ?"
+            params.append(dimension_value)
+        query += " ORDER BY snapshot_date, dimension_value"
+        
+        cursor = self.execute(query, tuple(params))
+        return [
+            (row['snapshot_date'] if isinstance(row['snapshot_date'], date)
+             else date.fromisoformat(row['snapshot_date']),
+             row['dimension_value'], row['count'])
+            for row in cursor.fetchall()
+        ]
+    
+    # Activity log operations
+    def insert_activities(self, rows: Sequence[tuple]) -> int:
+        """Append (created_at, user_id, action, entity_type, entity_id, description) rows."""
+        try:
+            self.executemany(
+                """
+                INSERT INTO activity_log (created_at, user_id, action, entity_type, entity_id, description)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                list(rows)
+            )
+            self.commit()
+        except sqlite3.Error:
+            self.rollback()
+            raise
+        return len(rows)
+    
+    def get_recent_activity(self, limit: int = 10) -> List[Dict[str, object]]:
+        """Latest activity entries, newest first (read backwards along idx_activity_log_created_at)."""
+        cursor = self.execute(
+            """
+            SELECT id, created_at, user_id, action, entity_type, entity_id, description
+            FROM activity_log ORDER BY created_at DESC, id DESC LIMIT ?
+            """,
+            (limit,)
+        )
+        return [dict(row) for row in cursor.fetchall()]
     
     # User operations
     def create_user(self, user: User) -> int:
@@ -201,7 +575,7 @@ class DatabaseManager:
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        query = "SELECT * FROM users WHERE username = ?"
+        query = f"SELECT {USER_COLUMNS} FROM users WHERE username = ?"
         cursor = self.execute(query, (username,))
         row = cursor.fetchone()
         
@@ -237,14 +611,26 @@ class DatabaseManager:
     
     def _row_to_user(self, row: sqlite3.Row) -> User:
         """Convert database row to User object."""
-        data = dict(row)
-        
-        # Convert enum values
-        from models.user import UserRole, UserStatus
-        
-        if data['role']:
-            data['role'] = UserRole(data['role'])
-        if data['status']:
-            data['status'] = UserStatus(data['status'])
-        
-        return User(**data) 
\ No newline at end of file
+        return User.from_dict(dict(row))
+
+
+class SnapshotReader(DatabaseManager):
+    """Read-only DatabaseManager bound to a connection inside a snapshot transaction."""
+    
+    def __init__(self, db_path: Path, connection: sqlite3.Connection):
+        """Wrap an already open snapshot connection."""
+        self.db_path = db_path
+        self.connection = connection
+        self._is_connected = True
+    
+    def connect(self):
+        """Connection is owned by DatabaseManager.read_snapshot."""
+    
+    def disconnect(self):
+        """Connection is owned by DatabaseManager.read_snapshot."""
+    
+    def commit(self):
+        """Never end the snapshot transaction early."""
+    
+    def rollback(self):
+        """Never end the snapshot transaction early."""
@@ -0,0 +1,200 @@
+"""
+Database maintenance: planner statistics, incremental vacuum and integrity checks.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_NONE = 0
+AUTO_VACUUM_FULL = 1
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class DatabaseMaintenance:
+    """Runs maintenance tasks on a dedicated SQLite connection."""
+
+    def __init__(self, db_path: str = "data/database.db", busy_timeout_ms: int = 5000):
+        """Initialize maintenance with database path."""
+        self.db_path = Path(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection used only for maintenance."""
+        connection = sqlite3.connect(str(self.db_path), isolation_level=None)
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        return connection
+
+    @staticmethod
+    def _pragma(connection: sqlite3.Connection, name: str) -> int:
+        """Read an integer PRAGMA value."""
+        return connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def get_space_usage(self, connection: sqlite3.Connection) -> Dict[str, int]:
+        """Get page size, page count and free pages of the database file."""
+        page_size = self._pragma(connection, "page_size")
+        page_count = self._pragma(connection, "page_count")
+        freelist_count = self._pragma(connection, "freelist_count")
+        return {
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'file_bytes': page_size * page_count,
+            'free_bytes': page_size * freelist_count
+        }
+
+    def ensure_incremental_auto_vacuum(self, connection: sqlite3.Connection) -> bool:
+        """Switch the database to incremental auto_vacuum; returns True if a VACUUM was needed."""
+        if self._pragma(connection, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return False
+        # Changing auto_vacuum on an existing database only takes effect after a full VACUUM
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("VACUUM")
+        return True
+
+    def optimize(self, connection: sqlite3.Connection, full_analyze: bool = False):
+        """Refresh query planner statistics."""
+        if full_analyze:
+            connection.execute("ANALYZE")
+        else:
+            connection.execute("PRAGMA optimize")
+
+    def incremental_vacuum(self, connection: sqlite3.Connection, max_pages: Optional[int] = None) -> int:
+        """Release free pages to the file system; returns the number of pages freed."""
+        before = self._pragma(connection, "freelist_count")
+        if max_pages:
+            connection.execute(f"PRAGMA incremental_vacuum({int(max_pages)})").fetchall()
+        else:
+            connection.execute("PRAGMA incremental_vacuum").fetchall()
+        after = self._pragma(connection, "freelist_count")
+        return before - after
+
+    def quick_check(self, connection: sqlite3.Connection) -> list:
+        """Run PRAGMA quick_check; returns a list of problems (empty if the database is ok)."""
+        rows = [row[0] for row in connection.execute("PRAGMA quick_check").fetchall()]
+        return [] if rows == ['ok'] else rows
+
+    def run(self, full_analyze: bool = False, max_vacuum_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Run all maintenance tasks and return a report with timings and space reclaimed."""
+        report: Dict[str, Any] = {
+            'started_at': datetime.now(),
+            'timings': {},
+            'success': True,
+            'error': None
+        }
+        connection = self._connect()
+        try:
+            before = self.get_space_usage(connection)
+            report['size_before'] = before['file_bytes']
+
+            start = time.perf_counter()
+            report['converted_auto_vacuum'] = self.ensure_incremental_auto_vacuum(connection)
+            report['timings']['auto_vacuum'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.optimize(connection, full_analyze)
+            report['timings']['optimize'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            report['pages_freed'] = self.incremental_vacuum(connection, max_vacuum_pages)
+            report['timings']['incremental_vacuum'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            report['integrity_errors'] = self.quick_check(connection)
+            report['timings']['quick_check'] = time.perf_counter() - start
+
+            after = self.get_space_usage(connection)
+            report['size_after'] = after['file_bytes']
+            report['bytes_reclaimed'] = before['file_bytes'] - after['file_bytes']
+        except sqlite3.Error as e:
+            report['success'] = False
+            report['error'] = str(e)
+        finally:
+            connection.close()
+
+        report['finished_at'] = datetime.now()
+        report['duration'] = sum(report['timings'].values())
+        return report
+
+
+class MaintenanceScheduler:
+    """Runs DatabaseMaintenance periodically on a background thread when the app is idle."""
+
+    def __init__(self, maintenance: DatabaseMaintenance,
+                 interval_seconds: float = 6 * 60 * 60,
+                 idle_seconds: float = 5 * 60,
+                 poll_seconds: float = 60,
+                 on_report: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """Initialize scheduler."""
+        self.maintenance = maintenance
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+        self.poll_seconds = poll_seconds
+        self.on_report = on_report
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._last_activity = time.monotonic()
+        self._last_run: Optional[float] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify_activity(self):
+        """Record user activity; maintenance waits until the app has been idle for a while."""
+        self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        """Check whether no activity was recorded for idle_seconds."""
+        return time.monotonic() - self._last_activity >= self.idle_seconds
+
+    def is_due(self) -> bool:
+        """Check whether the maintenance interval has elapsed."""
+        return self._last_run is None or time.monotonic() - self._last_run >= self.interval_seconds
+
+    def run_now(self) -> Dict[str, Any]:
+        """Run maintenance immediately on the calling thread."""
+        report = self.maintenance.run()
+        self._last_run = time.monotonic()
+        self.last_report = report
+        if self.on_report:
+            try:
+                self.on_report(report)
+            except Exception as e:
+                print(f"Error handling maintenance report: {e}")
+        return report
+
+    def start(self):
+        """Start the background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        """Background loop: run maintenance when due and idle."""
+        while not self._stop_event.wait(self.poll_seconds):
+            if self.is_due() and self.is_idle():
+                self.run_now()
+
+
+def format_maintenance_report(report: Dict[str, Any]) -> str:
+    """Format a maintenance report for logs."""
+    if not report.get('success'):
+        return f"Bảo trì CSDL thất bại: {report.get('error')}"
+    integrity = "OK" if not report.get('integrity_errors') else f"{len(report['integrity_errors'])} lỗi"
+    return (
+        f"Bảo trì CSDL xong trong {report['duration']:.2f}s - "
+        f"giải phóng {report.get('bytes_reclaimed', 0) / 1024:.1f} KB, "
+        f"kiểm tra toàn vẹn: {integrity}"
+    )
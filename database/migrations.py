@@ -14,6 +14,10 @@ def create_tables(db_path: str = "data/database.db"):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    # Let freed pages be returned incrementally (only applies to a new, empty database;
+    # existing files are converted by DatabaseMaintenance)
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    
     # Create offenders table
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS offenders (
@@ -41,7 +45,9 @@ def create_tables(db_path: str = "data/database.db"):
         created_at DATETIME NOT NULL,
         updated_at DATETIME NOT NULL,
         created_by INTEGER,
-        notes TEXT
+        notes TEXT,
+        ward TEXT DEFAULT '',
+        row_version INTEGER NOT NULL DEFAULT 1
     )
     """)
     
@@ -137,12 +143,42 @@ def create_tables(db_path: str = "data/database.db"):
     )
     """)
     
+    # Create daily statistics snapshot table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS daily_stats (
+        snapshot_date DATE NOT NULL,
+        dimension TEXT NOT NULL,
+        dimension_value TEXT NOT NULL,
+        count INTEGER DEFAULT 0,
+        created_at DATETIME NOT NULL,
+        PRIMARY KEY (snapshot_date, dimension, dimension_value)
+    )
+    """)
+    
+    # Create activity (audit) log table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS activity_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at DATETIME NOT NULL,
+        user_id INTEGER,
+        action TEXT NOT NULL,
+        entity_type TEXT,
+        entity_id INTEGER,
+        description TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """)
+    
+    # Add columns introduced after the initial schema
+    _add_missing_columns(cursor)
+    
     # Create indexes for better performance
     try:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_offenders_case_number ON offenders(case_number)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_offenders_full_name ON offenders(full_name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_offenders_status ON offenders(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_offenders_completion_date ON offenders(completion_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_offenders_risk_level ON offenders(risk_level)")
         
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
@@ -152,6 +188,10 @@ def create_tables(db_path: str = "data/database.db"):
         
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_reductions_offender_id ON reductions(offender_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_reductions_status ON reductions(status)")
+        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_stats_dimension ON daily_stats(dimension, snapshot_date)")
+        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_activity_log_created_at ON activity_log(created_at)")
     except sqlite3.OperationalError as e:
         print(f"Warning: Could not create some indexes: {e}")
     
@@ -161,6 +201,23 @@ def create_tables(db_path: str = "data/database.db"):
     print("Database tables created successfully!")
 
 
+def _add_missing_columns(cursor: sqlite3.Cursor):
+    """Add columns missing from databases created with an older schema."""
+    new_columns = {
+        'offenders': [
+            ('ward', "TEXT DEFAULT ''"),
+            ('row_version', "INTEGER NOT NULL DEFAULT 1"),
+        ],
+    }
+    
+    for table, columns in new_columns.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, definition in columns:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
 def create_default_admin():
     """Create default admin user."""
     from database.database_manager import DatabaseManager
@@ -3,6 +3,7 @@
 Main application entry point for the Offender Management System.
 """
 
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -12,20 +13,40 @@ import traceback
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from PyQt6.QtWidgets import QApplication, QMessageBox
-from PyQt6.QtCore import Qt, QTranslator, QLocale
+from PyQt6.QtCore import Qt, QTranslator, QLocale, QObject, QEvent
 from PyQt6.QtGui import QFont, QIcon
 
 from database.database_manager import DatabaseManager
 from database.migrations import create_tables, create_default_admin
+from database.maintenance import DatabaseMaintenance, MaintenanceScheduler, format_maintenance_report
 from services.offender_service import OffenderService
 from services.user_service import UserService
 from services.ai_service import AIService
 from services.report_service import ReportService
+from services.stats_service import StatsService
 from ui.login_dialog import LoginDialog
 from ui.main_window import MainWindow
 from constants import UI_LAYOUT, APP_INFO
 
 
+class ActivityMonitor(QObject):
+    """Forwards user input events to the maintenance scheduler so it only runs when idle."""
+    
+    ACTIVITY_EVENTS = (
+        QEvent.Type.KeyPress, QEvent.Type.MouseButtonPress,
+        QEvent.Type.MouseMove, QEvent.Type.Wheel
+    )
+    
+    def __init__(self, scheduler: MaintenanceScheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+    
+    def eventFilter(self, obj, event):
+        if event.type() in self.ACTIVITY_EVENTS:
+            self.scheduler.notify_activity()
+        return False
+
+
 class OffenderManagementApp:
     """Main application class."""
     
@@ -39,10 +60,20 @@ class OffenderManagementApp:
         
         # Initialize services
         self.db_manager = DatabaseManager()
-        self.offender_service = OffenderService(self.db_manager)
+        # Client mode: share offender data through an API server (see api/server.py)
+        api_url = os.environ.get("OFFENDER_API_URL")
+        if api_url:
+            from api import API_TOKEN_ENV
+            from api.client import RemoteDatabaseManager
+            self.offender_service = OffenderService(
+                RemoteDatabaseManager(api_url, token=os.environ.get(API_TOKEN_ENV))
+            )
+        else:
+            self.offender_service = OffenderService(self.db_manager)
         self.user_service = UserService(self.db_manager)
         self.ai_service = AIService()
         self.report_service = ReportService()
+        self.stats_service = StatsService(self.db_manager)
         
         # Initialize additional services
         from services.excel_service import ExcelService
@@ -50,6 +81,15 @@ class OffenderManagementApp:
         self.excel_service = ExcelService(self.offender_service)
         self.document_service = DocumentService()
         
+        # Database maintenance runs on its own connection/thread while the app is idle
+        self.maintenance_scheduler = MaintenanceScheduler(
+            DatabaseMaintenance(str(self.db_manager.db_path)),
+            on_report=lambda report: print(format_maintenance_report(report))
+        )
+        self.activity_monitor = ActivityMonitor(self.maintenance_scheduler)
+        self.app.installEventFilter(self.activity_monitor)
+        self.app.aboutToQuit.connect(self.maintenance_scheduler.stop)
+        
         # Initialize UI
         self.login_dialog = None
         self.main_window = None
@@ -124,8 +164,15 @@ class OffenderManagementApp:
             with self.db_manager:
                 print("✓ Database connection successful")
             
+            # Record today's statistics snapshot (no-op if already taken)
+            try:
+                self.stats_service.take_daily_snapshot()
+            except Exception as e:
+                print(f"Error taking daily statistics snapshot: {e}")
+            
             # Show login dialog
             self.show_login()
+            self.maintenance_scheduler.start()
             
             # Start event loop
             return self.app.exec()
@@ -159,4 +206,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # Batch rendering uses a process pool; in a frozen build its workers re-run
+    # this executable and must stop here instead of opening another window
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
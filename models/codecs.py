@@ -0,0 +1,56 @@
+"""
+Decoding helpers shared by model ``from_dict`` methods and the SQLite converters.
+
+Enum lookups go through value-to-member maps built once per Enum class instead
+of constructing the Enum (and catching ValueError) for every field of every row.
+"""
+
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Dict, Optional, Type, Union
+
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def value_map(enum_cls: Type[Enum]) -> Dict[Any, Enum]:
+    """Map of Enum values to members, built once per Enum class."""
+    return {member.value: member for member in enum_cls}
+
+
+def decode_enum(enum_cls: Type[Enum], value: Any, default: Any = _MISSING):
+    """Convert a stored value to an Enum member.
+
+    Unknown values return ``default`` or, when no default is given, raise
+    ValueError like calling the Enum would.
+    """
+    if isinstance(value, enum_cls):
+        return value
+    member = value_map(enum_cls).get(value)
+    if member is None:
+        if default is _MISSING:
+            raise ValueError(f"{value!r} is not a valid {enum_cls.__name__}")
+        return default
+    return member
+
+
+def decode_date(value: Union[str, bytes, date, None]) -> Optional[date]:
+    """Convert an ISO date (or datetime) string to a date."""
+    if value is None or type(value) is date:
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    return date.fromisoformat(value[:10])
+
+
+def decode_datetime(value: Union[str, bytes, datetime, None]) -> Optional[datetime]:
+    """Convert an ISO datetime string to a datetime."""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    return datetime.fromisoformat(value)
@@ -0,0 +1,139 @@
+"""
+Slotted, optionally frozen variants of the model dataclasses.
+
+Instances have no per-instance ``__dict__``, Enum fields always hold the shared
+Enum members and low-cardinality strings (ward, occupation, court name...) are
+interned, so large in-memory caseloads keep one copy of each repeated value.
+The variants have the same fields and methods as the model they mirror.
+"""
+
+import dataclasses
+import inspect
+import sys
+from enum import Enum
+from typing import Any, Dict, Tuple, Type
+
+from models.case import Case
+from models.codecs import decode_enum
+from models.offender import Offender
+from models.reduction import Reduction
+from models.violation import Violation
+
+
+# Repeated strings worth interning per model
+INTERNED_FIELDS: Dict[type, Tuple[str, ...]] = {
+    Offender: ('ward', 'occupation', 'crime', 'sentence'),
+    Violation: ('location', 'penalty'),
+    Reduction: ('reason',),
+    Case: ('court_name', 'judge_name', 'prosecutor_name')
+}
+
+# Members that must not be copied from the model class
+_SKIPPED_MEMBERS = {'__init__', '__post_init__', '__repr__', '__eq__', '__hash__', '__setattr__',
+                    '__delattr__', '__getstate__', '__setstate__'}
+
+
+def _field_spec(model_field: dataclasses.Field) -> Tuple[str, Any, dataclasses.Field]:
+    """Copy a dataclass field definition for a new class."""
+    if model_field.default_factory is not dataclasses.MISSING:
+        spec = dataclasses.field(default_factory=model_field.default_factory)
+    else:
+        spec = dataclasses.field(default=model_field.default)
+    return model_field.name, model_field.type, spec
+
+
+def _normalize(instance, enum_fields: Dict[str, Tuple[Type[Enum], Any]], interned: Tuple[str, ...]):
+    """Replace Enum values by members and intern repeated strings (works on frozen instances)."""
+    for name, (enum_cls, default) in enum_fields.items():
+        value = getattr(instance, name)
+        if not isinstance(value, enum_cls) and value is not None:
+            object.__setattr__(instance, name, decode_enum(enum_cls, value, default))
+    for name in interned:
+        value = getattr(instance, name)
+        if type(value) is str:
+            object.__setattr__(instance, name, sys.intern(value))
+
+
+def compact_model(model_cls: type, frozen: bool = False) -> type:
+    """Build a slotted (and optionally frozen) dataclass mirroring ``model_cls``."""
+    model_fields = dataclasses.fields(model_cls)
+    field_names = [f.name for f in model_fields]
+    interned = tuple(name for name in INTERNED_FIELDS.get(model_cls, ()) if name in field_names)
+    enum_fields = {
+        f.name: (f.type, f.default) for f in model_fields
+        if inspect.isclass(f.type) and issubclass(f.type, Enum)
+    }
+    model_post_init = getattr(model_cls, '__post_init__', None)
+
+    namespace: Dict[str, Any] = {}
+    for name, member in vars(model_cls).items():
+        if name in _SKIPPED_MEMBERS or name.startswith('__dataclass'):
+            continue
+        if inspect.isfunction(member):
+            namespace[name] = member
+        elif isinstance(member, (classmethod, staticmethod)):
+            namespace[name] = type(member)(member.__func__)
+
+    def __post_init__(self):
+        """Apply the model's initialization, then normalize values."""
+        if model_post_init:
+            if frozen:
+                # Run the model's own __post_init__ on a mutable draft and copy the result back
+                draft = object.__new__(model_cls)
+                draft.__dict__.update({name: getattr(self, name) for name in field_names})
+                model_post_init(draft)
+                for name in field_names:
+                    object.__setattr__(self, name, draft.__dict__[name])
+            else:
+                model_post_init(self)
+        _normalize(self, enum_fields, interned)
+
+    @classmethod
+    def from_model(cls, instance):
+        """Copy an initialized model instance without re-running its initialization."""
+        compact = object.__new__(cls)
+        for name in field_names:
+            object.__setattr__(compact, name, getattr(instance, name))
+        _normalize(compact, enum_fields, interned)
+        return compact
+
+    def to_model(self):
+        """Convert back to a regular (mutable, dict-backed) model instance."""
+        model = object.__new__(model_cls)
+        model.__dict__.update({name: getattr(self, name) for name in field_names})
+        return model
+
+    namespace.update(__post_init__=__post_init__, from_model=from_model, to_model=to_model)
+    prefix = 'Frozen' if frozen else 'Compact'
+    compact_cls = dataclasses.make_dataclass(
+        f"{prefix}{model_cls.__name__}",
+        [_field_spec(f) for f in model_fields],
+        namespace=namespace,
+        slots=True,
+        frozen=frozen
+    )
+    compact_cls.__module__ = __name__
+    compact_cls.__doc__ = f"Slotted{' frozen' if frozen else ''} variant of {model_cls.__name__}."
+    return compact_cls
+
+
+CompactOffender = compact_model(Offender)
+FrozenOffender = compact_model(Offender, frozen=True)
+CompactViolation = compact_model(Violation)
+FrozenViolation = compact_model(Violation, frozen=True)
+CompactReduction = compact_model(Reduction)
+FrozenReduction = compact_model(Reduction, frozen=True)
+CompactCase = compact_model(Case)
+FrozenCase = compact_model(Case, frozen=True)
+
+_VARIANTS = {
+    (Offender, False): CompactOffender, (Offender, True): FrozenOffender,
+    (Violation, False): CompactViolation, (Violation, True): FrozenViolation,
+    (Reduction, False): CompactReduction, (Reduction, True): FrozenReduction,
+    (Case, False): CompactCase, (Case, True): FrozenCase
+}
+
+
+def to_compact(instance, frozen: bool = False):
+    """Convert a model instance to its slotted (or frozen) variant."""
+    return _VARIANTS[(type(instance), frozen)].from_model(instance)
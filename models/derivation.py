@@ -0,0 +1,151 @@
+"""
+Derivation engine for completion date, status and days remaining.
+
+All derived offender fields are computed here against an explicit "as of"
+date, so results are deterministic and the same thresholds apply everywhere.
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+from models.offender import Status
+
+
+# Số ngày trước ngày hoàn thành thì chuyển sang "Sắp kết thúc"
+EXPIRING_SOON_DAYS = 30
+
+# Ordinal of 1970-01-01, to convert between date.toordinal() and numpy day numbers
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Day number used for missing dates (far outside any real date, safe to subtract)
+NO_DATE = -(2 ** 31)
+
+
+@lru_cache(maxsize=65536)
+def shift_months(start: date, months: int) -> date:
+    """Add (or subtract) calendar months, clamping to the last day of the month."""
+    return start + relativedelta(months=months)
+
+
+def derive_completion_date(start_date: Optional[date], duration_months: int,
+                           reduced_months: int = 0) -> Optional[date]:
+    """Completion date = start + duration months, minus any reduced months."""
+    if not start_date or duration_months <= 0:
+        return None
+    completion = shift_months(start_date, duration_months)
+    if reduced_months > 0:
+        completion = shift_months(completion, -reduced_months)
+    return completion
+
+
+def derive_status(completion_date: Optional[date], as_of: date,
+                  current_status: Optional[Status] = None) -> Status:
+    """Status from days until completion; a recorded violation is kept until completion."""
+    if not completion_date:
+        return Status.ACTIVE
+    days_until = (completion_date - as_of).days
+    if days_until <= 0:
+        return Status.COMPLETED
+    if current_status == Status.VIOLATION:
+        return Status.VIOLATION
+    if days_until <= EXPIRING_SOON_DAYS:
+        return Status.EXPIRING_SOON
+    return Status.ACTIVE
+
+
+def derive_days_remaining(completion_date: Optional[date], as_of: date) -> int:
+    """Days left until completion (never negative)."""
+    if not completion_date:
+        return 0
+    return max(0, (completion_date - as_of).days)
+
+
+def derive(start_date: Optional[date], duration_months: int, reduced_months: int,
+           as_of: date, current_status: Optional[Status] = None) -> Tuple[Optional[date], Status, int]:
+    """Derive (completion_date, status, days_remaining) for one record."""
+    completion = derive_completion_date(start_date, duration_months, reduced_months)
+    return (
+        completion,
+        derive_status(completion, as_of, current_status),
+        derive_days_remaining(completion, as_of)
+    )
+
+
+def apply_derivation(offender, as_of: Optional[date] = None):
+    """Set completion_date, status and days_remaining on an offender in place."""
+    offender.completion_date, offender.status, offender.days_remaining = derive(
+        offender.start_date, offender.duration_months, offender.reduced_months,
+        as_of or date.today(), offender.status
+    )
+
+
+def derive_batch(offenders: Iterable, as_of: Optional[date] = None) -> list:
+    """Apply derivation to many offenders against the same as-of date."""
+    as_of = as_of or date.today()
+    offenders = list(offenders)
+    for offender in offenders:
+        apply_derivation(offender, as_of)
+    return offenders
+
+
+# Vectorized derivation over day-number arrays (days since 1970-01-01)
+STATUS_CODES = {status: code for code, status in enumerate(Status)}
+STATUS_BY_CODE = list(Status)
+
+
+def date_to_day(value: Optional[date]) -> int:
+    """Convert a date to a day number; NO_DATE for missing dates."""
+    return value.toordinal() - EPOCH_ORDINAL if value else NO_DATE
+
+
+def day_to_date(day: int) -> Optional[date]:
+    """Convert a day number back to a date; None for NO_DATE."""
+    return date.fromordinal(int(day) + EPOCH_ORDINAL) if day != NO_DATE else None
+
+
+def shift_months_array(days: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Vectorized shift_months on day numbers, with the same end-of-month clamping."""
+    day_values = days.astype('datetime64[D]')
+    month_starts = day_values.astype('datetime64[M]')
+    day_of_month = (day_values - month_starts.astype('datetime64[D]')).astype(np.int64)
+    target_months = month_starts + months.astype('timedelta64[M]')
+    month_length = ((target_months + 1).astype('datetime64[D]')
+                    - target_months.astype('datetime64[D]')).astype(np.int64)
+    shifted = target_months.astype('datetime64[D]') + np.minimum(day_of_month, month_length - 1)
+    return shifted.astype(np.int64)
+
+
+def derive_arrays(start_days: np.ndarray, duration_months: np.ndarray,
+                  reduced_months: np.ndarray, as_of: date,
+                  status_codes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized derive over whole columns.
+
+    ``start_days`` uses NO_DATE for missing start dates. Returns completion day numbers
+    (NO_DATE when undefined), status codes (index into ``STATUS_BY_CODE``) and days remaining.
+    """
+    start_days = np.asarray(start_days, dtype=np.int64)
+    duration_months = np.asarray(duration_months, dtype=np.int64)
+    reduced_months = np.asarray(reduced_months, dtype=np.int64)
+    valid = (start_days != NO_DATE) & (duration_months > 0)
+
+    completion = np.full(start_days.shape, NO_DATE, dtype=np.int64)
+    if valid.any():
+        base = shift_months_array(start_days[valid], duration_months[valid])
+        reduced = reduced_months[valid]
+        base = np.where(reduced > 0, shift_months_array(base, -np.maximum(reduced, 0)), base)
+        completion[valid] = base
+
+    days_until = completion - date_to_day(as_of)
+    days_remaining = np.where(valid, np.maximum(days_until, 0), 0)
+
+    status = np.full(start_days.shape, STATUS_CODES[Status.ACTIVE], dtype=np.int8)
+    status[valid & (days_until <= EXPIRING_SOON_DAYS)] = STATUS_CODES[Status.EXPIRING_SOON]
+    if status_codes is not None:
+        violation = np.asarray(status_codes) == STATUS_CODES[Status.VIOLATION]
+        status[valid & violation] = STATUS_CODES[Status.VIOLATION]
+    status[valid & (days_until <= 0)] = STATUS_CODES[Status.COMPLETED]
+    return completion, status, days_remaining
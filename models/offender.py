@@ -7,6 +7,8 @@ from typing import Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from models.codecs import decode_date, decode_datetime, decode_enum
+
 
 class Gender(Enum):
     """Gender enumeration."""
@@ -38,6 +40,15 @@ class RiskLevel(Enum):
     HIGH = "Cao"
 
 
+# Enum fields of Offender with the value used when a stored value is invalid
+ENUM_FIELDS = [
+    ('gender', Gender, Gender.MALE),
+    ('case_type', CaseType, CaseType.SUSPENDED_SENTENCE),
+    ('status', Status, Status.ACTIVE),
+    ('risk_level', RiskLevel, RiskLevel.MEDIUM)
+]
+
+
 @dataclass
 class Offender:
     """Offender data model."""
@@ -78,87 +89,36 @@ class Offender:
     updated_at: Optional[datetime] = None
     created_by: Optional[int] = None
     notes: str = ""
+    row_version: int = 1  # Tăng mỗi lần cập nhật, dùng để phát hiện sửa đồng thời
     
     def __post_init__(self):
         """Calculate derived fields after initialization and ensure Enum fields are valid."""
         # Convert string fields to Enum if needed
         if isinstance(self.gender, str):
-            try:
-                self.gender = Gender(self.gender)
-            except Exception:
-                self.gender = Gender.MALE
+            self.gender = decode_enum(Gender, self.gender, Gender.MALE)
         if isinstance(self.case_type, str):
-            try:
-                self.case_type = CaseType(self.case_type)
-            except Exception:
-                self.case_type = CaseType.SUSPENDED_SENTENCE
+            self.case_type = decode_enum(CaseType, self.case_type, CaseType.SUSPENDED_SENTENCE)
         if isinstance(self.status, str):
-            try:
-                self.status = Status(self.status)
-            except Exception:
-                self.status = Status.ACTIVE
+            self.status = decode_enum(Status, self.status, Status.ACTIVE)
         if isinstance(self.risk_level, str):
-            try:
-                self.risk_level = RiskLevel(self.risk_level)
-            except Exception:
-                self.risk_level = RiskLevel.MEDIUM
+            self.risk_level = decode_enum(RiskLevel, self.risk_level, RiskLevel.MEDIUM)
         # Existing logic
         if self.created_at is None:
             self.created_at = datetime.now()
         if self.updated_at is None:
             self.updated_at = datetime.now()
-        self._calculate_completion_date()
-        self._calculate_status()
-        self._calculate_days_remaining()
-    
-    def _calculate_completion_date(self):
-        """Calculate completion date based on start date and duration."""
-        if self.start_date and self.duration_months > 0:
-            # Calculate base completion date
-            from dateutil.relativedelta import relativedelta
-            base_completion = self.start_date + \
-                relativedelta(months=self.duration_months)
-            # Apply reductions
-            if self.reduced_months > 0:
-                self.completion_date = base_completion - \
-                    relativedelta(months=self.reduced_months)
-            else:
-                self.completion_date = base_completion
-        else:
-            self.completion_date = None
-    
-    def _calculate_status(self):
-        """Calculate current status based on completion date."""
-        if not self.completion_date:
-            self.status = Status.ACTIVE
-            return
-        today = date.today()
-        days_until_completion = (
-            self.completion_date - today
-        ).days
-        if days_until_completion <= 0:
-            self.status = Status.COMPLETED
-        elif days_until_completion <= 5:  # Cảnh báo trước 5 ngày
-            self.status = Status.EXPIRING_SOON
-        else:
-            self.status = Status.ACTIVE
+        self.recalculate()
     
-    def _calculate_days_remaining(self):
-        """Calculate days remaining until completion."""
-        if self.completion_date:
-            today = date.today()
-            days = (
-                self.completion_date - today
-            ).days
-            self.days_remaining = max(0, days)
-        else:
-            self.days_remaining = 0
+    def recalculate(self, as_of: Optional[date] = None):
+        """Recalculate completion date, status and days remaining as of a given date."""
+        from models.derivation import apply_derivation
+        apply_derivation(self, as_of)
     
-    def is_eligible_for_reduction(self) -> bool:
+    def is_eligible_for_reduction(self, as_of: Optional[date] = None) -> bool:
         """Check if offender is eligible for sentence reduction."""
         if not self.start_date or not self.completion_date:
             return False
-        today = date.today()
+        today = as_of or date.today()
         served_months = (
             today - self.start_date
         ).days / 30.44
@@ -166,24 +126,21 @@ class Offender:
         required_months = self.duration_months / 3
         return served_months >= required_months
     
-    def get_next_reduction_date(self) -> Optional[date]:
+    def get_next_reduction_date(self, as_of: Optional[date] = None) -> Optional[date]:
         """Calculate next possible reduction date."""
-        if not self.is_eligible_for_reduction():
+        if not self.is_eligible_for_reduction(as_of):
             return None
         # Can apply for reduction every 6 months
-        from dateutil.relativedelta import relativedelta
+        from models.derivation import shift_months
         last_reduction = self.reduction_date or self.start_date
         if last_reduction is None:
             return None
-        return last_reduction + relativedelta(months=6)
+        return shift_months(last_reduction, 6)
 
-    def get_days_remaining(self) -> int:
+    def get_days_remaining(self, as_of: Optional[date] = None) -> int:
         """Trả về số ngày còn lại cho đến ngày hoàn thành án."""
-        if self.completion_date:
-            today = date.today()
-            days = (self.completion_date - today).days
-            return max(0, days)
-        return 0
+        from models.derivation import derive_days_remaining
+        return derive_days_remaining(self.completion_date, as_of or date.today())
     
     def to_dict(self) -> dict:
         """Convert to dictionary for database storage."""
@@ -215,39 +172,23 @@ class Offender:
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.created_by,
-            'notes': self.notes
+            'notes': self.notes,
+            'row_version': self.row_version
         }
     
     @classmethod
     def from_dict(cls, data: dict) -> 'Offender':
         """Create Offender instance from dictionary, with robust Enum conversion."""
         # Convert string values back to enums, fallback to default if invalid
-        if 'gender' in data and data['gender'] and not hasattr(data['gender'], 'value'):
-            try:
-                data['gender'] = Gender(data['gender'])
-            except Exception:
-                data['gender'] = Gender.MALE
-        if 'case_type' in data and data['case_type'] and not hasattr(data['case_type'], 'value'):
-            try:
-                data['case_type'] = CaseType(data['case_type'])
-            except Exception:
-                data['case_type'] = CaseType.SUSPENDED_SENTENCE
-        if 'status' in data and data['status'] and not hasattr(data['status'], 'value'):
-            try:
-                data['status'] = Status(data['status'])
-            except Exception:
-                data['status'] = Status.ACTIVE
-        if 'risk_level' in data and data['risk_level'] and not hasattr(data['risk_level'], 'value'):
-            try:
-                data['risk_level'] = RiskLevel(data['risk_level'])
-            except Exception:
-                data['risk_level'] = RiskLevel.MEDIUM
+        for field_name, enum_cls, default in ENUM_FIELDS:
+            if data.get(field_name):
+                data[field_name] = decode_enum(enum_cls, data[field_name], default)
         # Convert date strings back to date objects
         for date_field in ['birth_date', 'start_date', 'reduction_date', 'completion_date']:
-            if date_field in data and data[date_field] and isinstance(data[date_field], str):
-                data[date_field] = datetime.fromisoformat(data[date_field]).date()
+            if data.get(date_field) and isinstance(data[date_field], str):
+                data[date_field] = decode_date(data[date_field])
         # Convert datetime strings back to datetime objects
         for datetime_field in ['created_at', 'updated_at']:
-            if datetime_field in data and data[datetime_field] and isinstance(data[datetime_field], str):
-                data[datetime_field] = datetime.fromisoformat(data[datetime_field])
+            if data.get(datetime_field) and isinstance(data[datetime_field], str):
+                data[datetime_field] = decode_datetime(data[datetime_field])
         return cls(**data) 
\ No newline at end of file
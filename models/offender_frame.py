@@ -0,0 +1,224 @@
+"""
+Columnar, NumPy-backed view of many offenders for analytics.
+
+Dates are stored as int64 day numbers (days since 1970-01-01, ``NO_DATE`` when
+missing) and enums as small integer codes (index of the member in its Enum), so
+reports can be computed with masks and bincounts instead of Python loops.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from models.derivation import NO_DATE, date_to_day, derive_arrays
+from models.codecs import value_map
+from models.offender import ENUM_FIELDS, Offender, RiskLevel, Status
+
+
+ENUM_COLUMNS = {name: enum_cls for name, enum_cls, _ in ENUM_FIELDS}
+
+# Code used when a stored value is not a valid Enum value (same fallbacks as Offender.from_dict)
+ENUM_DEFAULTS = {name: default for name, _, default in ENUM_FIELDS}
+
+DATE_COLUMNS = ['birth_day', 'start_day', 'completion_day', 'created_day']
+
+INT_COLUMNS = ['id', 'duration_months', 'reduced_months', 'days_remaining', 'violation_count']
+
+TEXT_COLUMNS = ['case_number', 'full_name', 'occupation', 'address', 'ward']
+
+# Column order of FRAME_QUERY; date columns are converted to day numbers by SQLite itself
+FRAME_COLUMNS = (
+    ['id'] + TEXT_COLUMNS + list(ENUM_COLUMNS) + DATE_COLUMNS
+    + ['duration_months', 'reduced_months', 'days_remaining', 'risk_percentage', 'violation_count']
+)
+
+_DAY = "COALESCE(CAST(julianday({0}) - 2440587.5 AS INTEGER), {1})"
+
+FRAME_QUERY = f"""
+SELECT id, case_number, full_name, COALESCE(occupation, ''), COALESCE(address, ''),
+       COALESCE(ward, ''), gender, case_type, status, risk_level,
+       {_DAY.format('birth_date', NO_DATE)}, {_DAY.format('start_date', NO_DATE)},
+       {_DAY.format('completion_date', NO_DATE)}, {_DAY.format('date(created_at)', NO_DATE)},
+       COALESCE(duration_months, 0), COALESCE(reduced_months, 0),
+       COALESCE(days_remaining, 0), COALESCE(risk_percentage, 0.0),
+       COALESCE(v.violation_count, 0)
+FROM offenders
+LEFT JOIN (
+    SELECT offender_id, COUNT(*) AS violation_count FROM violations GROUP BY offender_id
+) v ON v.offender_id = offenders.id
+ORDER BY created_at DESC
+"""
+
+
+def enum_code(member) -> int:
+    """Integer code of an Enum member (its position in the Enum)."""
+    return list(type(member)).index(member)
+
+
+def _encode_enum(values: Sequence, enum_cls, default) -> np.ndarray:
+    """Encode Enum values (members or their string values) as int8 codes."""
+    members = list(enum_cls)
+    default_code = members.index(default)
+    if not len(values):
+        return np.zeros(0, dtype=np.int8)
+    raw = np.array([getattr(v, 'value', v) or '' for v in values], dtype=object)
+    # Only the distinct values need a Python lookup
+    uniques, inverse = np.unique(raw, return_inverse=True)
+    by_value = value_map(enum_cls)
+    lookup = np.array([
+        members.index(by_value[u]) if u in by_value else default_code for u in uniques
+    ], dtype=np.int8)
+    return lookup[inverse]
+
+
+class OffenderFrame:
+    """Column arrays for a set of offenders."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], as_of: Optional[date] = None):
+        """Initialize frame from column arrays of equal length."""
+        self.columns = columns
+        self.as_of = as_of or date.today()
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        columns = self.__dict__.get('columns', {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    @classmethod
+    def empty(cls, as_of: Optional[date] = None) -> 'OffenderFrame':
+        """Frame with no rows."""
+        return cls._from_columns([[] for _ in FRAME_COLUMNS], as_of)
+
+    @classmethod
+    def from_cursor(cls, cursor, as_of: Optional[date] = None,
+                    batch_size: int = 5000) -> 'OffenderFrame':
+        """Build a frame from a cursor executing FRAME_QUERY.
+
+        Completion date, status and days remaining are re-derived for ``as_of``,
+        as they would be when loading ``Offender`` objects.
+        """
+        columns: List[list] = [[] for _ in FRAME_COLUMNS]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+        frame = cls._from_columns(columns, as_of)
+        frame.rederive()
+        return frame
+
+    @classmethod
+    def from_offenders(cls, offenders: Iterable[Offender], as_of: Optional[date] = None,
+                       violation_counts: Optional[Dict[int, int]] = None) -> 'OffenderFrame':
+        """Build a frame from Offender objects, keeping their derived fields as they are."""
+        offenders = list(offenders)
+        violation_counts = violation_counts or {}
+        columns = [
+            [o.id or 0 for o in offenders],
+            [o.case_number or '' for o in offenders],
+            [o.full_name or '' for o in offenders],
+            [o.occupation or '' for o in offenders],
+            [o.address or '' for o in offenders],
+            [o.ward or '' for o in offenders],
+            [o.gender for o in offenders],
+            [o.case_type for o in offenders],
+            [o.status for o in offenders],
+            [o.risk_level for o in offenders],
+            [date_to_day(o.birth_date) for o in offenders],
+            [date_to_day(o.start_date) for o in offenders],
+            [date_to_day(o.completion_date) for o in offenders],
+            [date_to_day(o.created_at.date() if o.created_at else None) for o in offenders],
+            [o.duration_months for o in offenders],
+            [o.reduced_months for o in offenders],
+            [o.days_remaining for o in offenders],
+            [o.risk_percentage for o in offenders],
+            [violation_counts.get(o.id, 0) for o in offenders]
+        ]
+        return cls._from_columns(columns, as_of)
+
+    @classmethod
+    def from_columns(cls, values: Dict[str, Sequence], as_of: Optional[date] = None) -> 'OffenderFrame':
+        """Build a frame from raw values keyed by FRAME_COLUMNS name (dates as day numbers).
+
+        Missing columns are filled with the values of a new record: no id, text
+        or dates, default enum members and zero counts.
+        """
+        length = len(next(iter(values.values()))) if values else 0
+        defaults = {name: [ENUM_DEFAULTS[name]] * length for name in ENUM_COLUMNS}
+        defaults.update({name: [''] * length for name in TEXT_COLUMNS})
+        defaults.update({name: [NO_DATE] * length for name in DATE_COLUMNS})
+        return cls._from_columns([values.get(name, defaults.get(name, [0] * length))
+                                  for name in FRAME_COLUMNS], as_of)
+
+    @classmethod
+    def _from_columns(cls, values: List[Sequence], as_of: Optional[date]) -> 'OffenderFrame':
+        """Convert raw column lists (in FRAME_COLUMNS order) to typed arrays."""
+        raw = dict(zip(FRAME_COLUMNS, values))
+        columns: Dict[str, np.ndarray] = {}
+        for name in INT_COLUMNS + DATE_COLUMNS:
+            columns[name] = np.array(raw[name], dtype=np.int64)
+        for name in TEXT_COLUMNS:
+            columns[name] = np.array(raw[name], dtype=object)
+        for name, enum_cls in ENUM_COLUMNS.items():
+            columns[name] = _encode_enum(raw[name], enum_cls, ENUM_DEFAULTS[name])
+        columns['risk_percentage'] = np.array(raw['risk_percentage'], dtype=np.float64)
+        return cls(columns, as_of)
+
+    def rederive(self):
+        """Recompute completion date, status and days remaining for self.as_of."""
+        completion, status, remaining = derive_arrays(
+            self.start_day, self.duration_months, self.reduced_months,
+            self.as_of, self.status
+        )
+        self.columns['completion_day'] = completion
+        self.columns['status'] = status
+        self.columns['days_remaining'] = remaining
+
+    def filter(self, mask: np.ndarray) -> 'OffenderFrame':
+        """Rows where mask is True."""
+        return OffenderFrame({name: column[mask] for name, column in self.columns.items()}, self.as_of)
+
+    # Masks and counts
+    def is_status(self, status: Status) -> np.ndarray:
+        """Mask of rows with the given status."""
+        return self.status == enum_code(status)
+
+    def is_risk(self, risk_level: RiskLevel) -> np.ndarray:
+        """Mask of rows with the given risk level."""
+        return self.risk_level == enum_code(risk_level)
+
+    def value_mask(self, column: str, value) -> np.ndarray:
+        """Mask of rows whose enum column equals an Enum member or its string value."""
+        by_value = {member.value: member for member in ENUM_COLUMNS[column]}
+        member = by_value.get(getattr(value, 'value', value))
+        if member is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.columns[column] == enum_code(member)
+
+    def counts(self, column: str) -> Dict:
+        """Number of rows per Enum member of an enum column."""
+        members = list(ENUM_COLUMNS[column])
+        counts = np.bincount(self.columns[column], minlength=len(members))
+        return {member: int(count) for member, count in zip(members, counts)}
+
+    def ages(self) -> np.ndarray:
+        """Age in years as of self.as_of (NaN where birth date is missing)."""
+        known = self.birth_day != NO_DATE
+        return np.where(known, (date_to_day(self.as_of) - self.birth_day) / 365.25, np.nan)
+
+    def created_months(self) -> np.ndarray:
+        """Creation month as months since 1970-01 (-1 where unknown)."""
+        known = self.created_day != NO_DATE
+        months = np.where(known, self.created_day, 0).astype('datetime64[D]').astype('datetime64[M]')
+        return np.where(known, months.astype(np.int64), -1)
+
+    def text_contains(self, column: str, term: str) -> np.ndarray:
+        """Case-insensitive substring match on a text column."""
+        values = np.char.lower(self.columns[column].astype(str))
+        return np.char.find(values, term.lower()) >= 0
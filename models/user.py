@@ -9,6 +9,8 @@ from enum import Enum
 import hashlib
 import secrets
 
+from models.codecs import decode_datetime, decode_enum
+
 
 class UserRole(Enum):
     """User role enumeration."""
@@ -126,13 +128,13 @@ class User:
         """Create User instance from dictionary."""
         # Convert string values back to enums
         if 'role' in data and data['role']:
-            data['role'] = UserRole(data['role'])
+            data['role'] = decode_enum(UserRole, data['role'])
         if 'status' in data and data['status']:
-            data['status'] = UserStatus(data['status'])
+            data['status'] = decode_enum(UserStatus, data['status'])
         
         # Convert datetime strings back to datetime objects
         for datetime_field in ['created_at', 'updated_at', 'last_login', 'locked_until']:
             if datetime_field in data and data[datetime_field]:
-                data[datetime_field] = datetime.fromisoformat(data[datetime_field])
+                data[datetime_field] = decode_datetime(data[datetime_field])
         
         return cls(**data) 
\ No newline at end of file
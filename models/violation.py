@@ -7,6 +7,8 @@ from typing import Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from models.codecs import decode_date, decode_datetime, decode_enum
+
 
 class ViolationType(Enum):
     """Violation type enumeration."""
@@ -100,18 +102,18 @@ class Violation:
         """Create Violation instance from dictionary."""
         # Convert string values back to enums
         if 'violation_type' in data and data['violation_type']:
-            data['violation_type'] = ViolationType(data['violation_type'])
+            data['violation_type'] = decode_enum(ViolationType, data['violation_type'])
         if 'status' in data and data['status']:
-            data['status'] = ViolationStatus(data['status'])
+            data['status'] = decode_enum(ViolationStatus, data['status'])
         
         # Convert date strings back to date objects
         for date_field in ['violation_date', 'report_date', 'resolved_date']:
             if date_field in data and data[date_field]:
-                data[date_field] = datetime.fromisoformat(data[date_field]).date()
+                data[date_field] = decode_date(data[date_field])
         
         # Convert datetime strings back to datetime objects
         for datetime_field in ['created_at', 'updated_at']:
             if datetime_field in data and data[datetime_field]:
-                data[datetime_field] = datetime.fromisoformat(data[datetime_field])
+                data[datetime_field] = decode_datetime(data[datetime_field])
         
         return cls(**data) 
\ No newline at end of file
@@ -6,10 +6,14 @@ from .offender_service import OffenderService
 from .user_service import UserService
 from .ai_service import AIService
 from .report_service import ReportService
+from .stats_service import StatsService
+from .export_service import ExportService
 
 __all__ = [
     'OffenderService',
     'UserService', 
     'AIService',
-    'ReportService'
+    'ReportService',
+    'StatsService',
+    'ExportService'
 ] 
\ No newline at end of file
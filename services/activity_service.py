@@ -0,0 +1,174 @@
+"""
+Activity (audit) log with a batched, asynchronous writer.
+
+Services call ``ActivityLogger.log``, which only appends to an in-memory
+queue. A background thread writes queued entries to the ``activity_log``
+table in batches on its own connection, so logging never adds a database
+round trip to the action being logged.
+"""
+
+import atexit
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from database.database_manager import DatabaseManager
+
+
+# Entries written per transaction, and how long the writer waits to fill a batch
+ACTIVITY_BATCH_SIZE = 200
+ACTIVITY_FLUSH_INTERVAL = 0.5
+
+# Entries kept in memory if the database is unavailable; newer ones are dropped
+ACTIVITY_QUEUE_LIMIT = 10000
+
+
+class ActivityAction:
+    """Action names stored in activity_log.action."""
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    REDUCTION = 'reduction'
+    IMPORT = 'import'
+    EXPORT = 'export'
+    LOGIN = 'login'
+    LOGOUT = 'logout'
+
+
+class ActivityEntry(NamedTuple):
+    """One activity_log row, in insert column order."""
+    created_at: datetime
+    user_id: Optional[int]
+    action: str
+    entity_type: Optional[str]
+    entity_id: Optional[int]
+    description: str
+
+
+class ActivityLogger:
+    """Queues activity entries and writes them in batches from a background thread."""
+
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = ACTIVITY_BATCH_SIZE,
+                 flush_interval: float = ACTIVITY_FLUSH_INTERVAL):
+        """Initialize logger; the writer thread starts with the first entry."""
+        # Own manager for reads: the caller's may be a snapshot or a worker's short-lived one
+        self.db_manager = db_manager.clone()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Managers without insert_activities (the remote API client) only read the log
+        self.enabled = hasattr(db_manager, 'insert_activities')
+        self.user_id: Optional[int] = None
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[ActivityEntry]]" = queue.Queue(ACTIVITY_QUEUE_LIMIT)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def log(self, action: str, description: str, entity_type: Optional[str] = None,
+            entity_id: Optional[int] = None):
+        """Record an action by the current user; returns immediately."""
+        if not self.enabled:
+            return
+        entry = ActivityEntry(datetime.now(), self.user_id, action, entity_type, entity_id, description)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Writer loop: block for an entry, gather a batch, insert it in one transaction."""
+        db_manager = self.db_manager.clone()
+        try:
+            db_manager.connect()
+        except Exception as e:
+            print(f"Lỗi ghi nhật ký hoạt động: {e}")
+            self._discard_queued()
+            return
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    self._queue.task_done()
+                    return
+                batch = [entry]
+                stop = False
+                while len(batch) < self.batch_size:
+                    try:
+                        entry = self._queue.get(timeout=self.flush_interval)
+                    except queue.Empty:
+                        break
+                    if entry is None:
+                        stop = True
+                        break
+                    batch.append(entry)
+                try:
+                    db_manager.insert_activities(batch)
+                except Exception as e:
+                    print(f"Lỗi ghi nhật ký hoạt động: {e}")
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            db_manager.disconnect()
+
+    def _discard_queued(self):
+        """Drop queued entries (writer cannot connect) so flush() does not wait forever."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self.dropped += 1
+            self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued entry has been written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest ``limit`` entries, newest first."""
+        return self.db_manager.get_recent_activity(limit)
+
+
+_loggers: Dict[str, ActivityLogger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_activity_logger(db_manager: DatabaseManager) -> ActivityLogger:
+    """The shared logger for db_manager's database (one writer thread per database)."""
+    db_path = getattr(db_manager, 'db_path', None)
+    base_url = getattr(db_manager, 'base_url', None)
+    if isinstance(db_path, (str, Path)):
+        key = str(Path(db_path).resolve())
+    elif isinstance(base_url, str):
+        key = base_url
+    else:
+        # Not a database this module knows how to identify: give it a logger of its own
+        return ActivityLogger(db_manager)
+    with _loggers_lock:
+        logger = _loggers.get(key)
+        if logger is None:
+            logger = ActivityLogger(db_manager)
+            _loggers[key] = logger
+            atexit.register(logger.close)
+        return logger
@@ -2,18 +2,31 @@
 AI service for risk prediction and analysis.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime, date
+from pathlib import Path
 import random
 
-from models.offender import Offender, RiskLevel
+import numpy as np
+
+from models.offender import Offender, RiskLevel, Status
+from models.offender_frame import OffenderFrame
+from services import risk_model
+from services.risk_model import RISK_MODEL_DIR, RiskModel, load_latest_model, risk_levels
 
 
 class AIService:
     """Service for AI-powered features."""
     
-    def __init__(self):
-        """Initialize AI service."""
+    def __init__(self, model_dir: Optional[Union[str, Path]] = RISK_MODEL_DIR):
+        """Initialize AI service.
+        
+        The newest trained model in ``model_dir`` scores risk when there is one;
+        otherwise (or with ``model_dir=None``) the weights below are used.
+        """
+        self.model_dir = model_dir
+        self._model: Optional[RiskModel] = None
+        self._model_loaded = model_dir is None
         self.risk_factors = {
             'age_young': 0.25,
             'age_old': -0.1,
@@ -27,8 +40,51 @@ class AIService:
             'education_high': -0.1
         }
     
-    def predict_risk(self, offender: Offender) -> Dict[str, Any]:
-        """Predict risk level for offender."""
+    # Nghề nghiệp được tính như không có việc làm ổn định
+    UNEMPLOYED_OCCUPATIONS = risk_model.UNEMPLOYED_OCCUPATIONS
+    URBAN_MARKER = risk_model.URBAN_MARKER
+    
+    @property
+    def model(self) -> Optional[RiskModel]:
+        """Trained risk model, loaded on first use (None: rule-based scoring)."""
+        if not self._model_loaded:
+            self._model = load_latest_model(self.model_dir)
+            self._model_loaded = True
+        return self._model
+    
+    @model.setter
+    def model(self, model: Optional[RiskModel]):
+        self._model = model
+        self._model_loaded = True
+    
+    def reload_model(self):
+        """Pick up a newly trained model version on next use."""
+        self._model = None
+        self._model_loaded = self.model_dir is None
+    
+    def predict_risk(self, offender: Offender, violation_count: int = 0) -> Dict[str, Any]:
+        """Predict risk level for offender (trained model if available, else rules)."""
+        model = self.model
+        risk_score, factors = self._rule_risk(offender, violation_count)
+        if model is not None:
+            frame = OffenderFrame.from_offenders([offender], violation_counts={offender.id: violation_count})
+            risk_score = float(model.score_frame(frame, self.risk_factors['previous_violations'])['risk_score'][0])
+            thresholds = model.thresholds
+        else:
+            thresholds = risk_model.RISK_THRESHOLDS
+        risk_level = list(RiskLevel)[risk_levels(np.array([risk_score]), thresholds)[0]]
+        
+        return {
+            'risk_score': risk_score,
+            'risk_level': risk_level,
+            'risk_percentage': risk_score * 100,
+            'risk_factors': factors,
+            'recommendations': self._get_recommendations(risk_level, factors),
+            'model_version': model.version if model is not None else None
+        }
+    
+    def _rule_risk(self, offender: Offender, violation_count: int = 0):
+        """Rule-based (score, factor labels); the labels also explain model scores."""
         risk_score = 0.0
         factors = []
         
@@ -43,7 +99,7 @@ class AIService:
                 factors.append("Tuổi cao")
         
         # Employment factor
-        if not offender.occupation or offender.occupation.lower() in ['thất nghiệp', 'nông dân']:
+        if not offender.occupation or offender.occupation.lower() in self.UNEMPLOYED_OCCUPATIONS:
             risk_score += self.risk_factors['unemployed']
             factors.append("Thất nghiệp")
         
@@ -52,70 +108,99 @@ class AIService:
             risk_score += self.risk_factors['expiring_soon']
             factors.append("Sắp hết hạn")
         
+        # Violation history factor
+        if violation_count > 0:
+            risk_score += self.risk_factors['previous_violations']
+            factors.append("Có tiền sử vi phạm")
+        
         # Location factor (simplified)
         if offender.address:
-            if 'thành phố' in offender.address.lower():
+            if self.URBAN_MARKER in offender.address.lower():
                 risk_score += self.risk_factors['urban_area']
             else:
                 risk_score += self.risk_factors['rural_area']
         
         # Normalize risk score
-        risk_score = min(1.0, max(0.0, risk_score))
+        return min(1.0, max(0.0, risk_score)), factors
+    
+    def predict_risk_batch(self, frame: OffenderFrame) -> Dict[str, np.ndarray]:
+        """Score every offender in a frame the same way as predict_risk.
         
-        # Determine risk level
-        if risk_score < 0.3:
-            risk_level = RiskLevel.LOW
-        elif risk_score < 0.7:
-            risk_level = RiskLevel.MEDIUM
-        else:
-            risk_level = RiskLevel.HIGH
+        Returns arrays aligned with the frame: ``id``, ``risk_score``,
+        ``risk_percentage`` and ``risk_level`` (RiskLevel codes).
+        """
+        model = self.model
+        if model is not None:
+            return model.score_frame(frame, self.risk_factors['previous_violations'])
+        return self._rule_risk_batch(frame)
+    
+    def _rule_risk_batch(self, frame: OffenderFrame) -> Dict[str, np.ndarray]:
+        """Vectorized rule-based scores (same rules as _rule_risk)."""
+        risk_score = np.zeros(len(frame), dtype=np.float64)
+        
+        # Age factor
+        ages = frame.ages()
+        known = ~np.isnan(ages)
+        risk_score += np.where(known & (ages < 25), self.risk_factors['age_young'], 0.0)
+        risk_score += np.where(known & (ages > 50), self.risk_factors['age_old'], 0.0)
+        
+        # Employment factor
+        occupation = np.char.lower(frame.occupation.astype(str))
+        unemployed = (occupation == '') | np.isin(occupation, self.UNEMPLOYED_OCCUPATIONS)
+        risk_score += np.where(unemployed, self.risk_factors['unemployed'], 0.0)
+        
+        # Time remaining factor
+        risk_score += np.where(frame.days_remaining < 30, self.risk_factors['expiring_soon'], 0.0)
+        
+        # Violation history factor
+        risk_score += np.where(frame.violation_count > 0, self.risk_factors['previous_violations'], 0.0)
+        
+        # Location factor
+        has_address = frame.address.astype(str) != ''
+        urban = frame.text_contains('address', self.URBAN_MARKER)
+        risk_score += np.where(has_address & urban, self.risk_factors['urban_area'], 0.0)
+        risk_score += np.where(has_address & ~urban, self.risk_factors['rural_area'], 0.0)
+        
+        # Normalize and determine risk level
+        risk_score = np.clip(risk_score, 0.0, 1.0)
         
         return {
+            'id': frame.id,
             'risk_score': risk_score,
-            'risk_level': risk_level,
             'risk_percentage': risk_score * 100,
-            'risk_factors': factors,
-            'recommendations': self._get_recommendations(risk_level, factors)
+            'risk_level': risk_levels(risk_score)
         }
     
-    def analyze_trends(self, offenders: List[Offender]) -> Dict[str, Any]:
-        """Analyze trends in offender data."""
-        if not offenders:
+    def analyze_trends(self, offenders: Union[List[Offender], OffenderFrame],
+                       history: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Analyze trends in offender data.
+        
+        ``history`` is an optional summary from ``StatsService.get_trend_summary``
+        describing how counts changed over time.
+        """
+        frame = self._as_frame(offenders)
+        if not len(frame):
             return {}
         
         # Calculate statistics
-        total = len(offenders)
-        active = len([
-            o for o in offenders
-            if (o.status.value if hasattr(o.status, 'value') else str(o.status)) == "Đang chấp hành"
-        ])
-        completed = len([
-            o for o in offenders
-            if (o.status.value if hasattr(o.status, 'value') else str(o.status)) == "Đã hoàn thành"
-        ])
-        violations = len([
-            o for o in offenders
-            if (o.status.value if hasattr(o.status, 'value') else str(o.status)) == "Vi phạm"
-        ])
+        total = len(frame)
+        status_counts = frame.counts('status')
+        active = status_counts[Status.ACTIVE]
+        completed = status_counts[Status.COMPLETED]
+        violations = status_counts[Status.VIOLATION]
         
         # Risk distribution
-        high_risk = len([o for o in offenders if o.risk_level == RiskLevel.HIGH])
-        medium_risk = len([o for o in offenders if o.risk_level == RiskLevel.MEDIUM])
-        low_risk = len([o for o in offenders if o.risk_level == RiskLevel.LOW])
+        risk_counts = frame.counts('risk_level')
+        high_risk = risk_counts[RiskLevel.HIGH]
+        medium_risk = risk_counts[RiskLevel.MEDIUM]
+        low_risk = risk_counts[RiskLevel.LOW]
         
         # Age distribution
-        age_groups = {'18-25': 0, '26-35': 0, '36-50': 0, '50+': 0}
-        for offender in offenders:
-            if offender.birth_date:
-                age = (date.today() - offender.birth_date).days / 365.25
-                if age <= 25:
-                    age_groups['18-25'] += 1
-                elif age <= 35:
-                    age_groups['26-35'] += 1
-                elif age <= 50:
-                    age_groups['36-50'] += 1
-                else:
-                    age_groups['50+'] += 1
+        ages = frame.ages()
+        known = ~np.isnan(ages)
+        bins = np.digitize(ages[known], [25, 35, 50], right=True)
+        age_counts = np.bincount(bins, minlength=4)
+        age_groups = dict(zip(['18-25', '26-35', '36-50', '50+'], age_counts.tolist()))
         
         return {
             'total_offenders': total,
@@ -131,34 +216,34 @@ class AIService:
             },
             'age_distribution': age_groups,
             'completion_rate': (completed / total * 100) if total > 0 else 0,
-            'violation_rate': (violations / total * 100) if total > 0 else 0
+            'violation_rate': (violations / total * 100) if total > 0 else 0,
+            'history': history or {}
         }
     
-    def generate_insights(self, offenders: List[Offender]) -> List[str]:
+    def generate_insights(self, offenders: Union[List[Offender], OffenderFrame]) -> List[str]:
         """Generate insights from offender data."""
         insights = []
         
-        if not offenders:
+        frame = self._as_frame(offenders)
+        if not len(frame):
             return ["Không có dữ liệu để phân tích"]
         
         # Expiring soon
-        expiring = [o for o in offenders if o.days_remaining <= 30 and o.days_remaining > 0]
+        expiring = int(((frame.days_remaining <= 30) & (frame.days_remaining > 0)).sum())
         if expiring:
-            insights.append(f"{len(expiring)} đối tượng sắp hết hạn trong 30 ngày tới")
+            insights.append(f"{expiring} đối tượng sắp hết hạn trong 30 ngày tới")
         
         # High risk offenders
-        high_risk = [o for o in offenders if o.risk_level == RiskLevel.HIGH]
+        high_risk = frame.counts('risk_level')[RiskLevel.HIGH]
         if high_risk:
-            insights.append(f"{len(high_risk)} đối tượng có nguy cơ cao cần giám sát đặc biệt")
+            insights.append(f"{high_risk} đối tượng có nguy cơ cao cần giám sát đặc biệt")
         
         # Completion rate
-        completed = [o for o in offenders if o.status.value == "Đã hoàn thành"]
-        completion_rate = len(completed) / len(offenders) * 100
+        completion_rate = frame.is_status(Status.COMPLETED).mean() * 100
         insights.append(f"Tỷ lệ hoàn thành: {completion_rate:.1f}%")
         
         # Violation rate
-        violations = [o for o in offenders if o.status.value == "Vi phạm"]
-        violation_rate = len(violations) / len(offenders) * 100
+        violation_rate = frame.is_status(Status.VIOLATION).mean() * 100
         insights.append(f"Tỷ lệ vi phạm: {violation_rate:.1f}%")
         
         return insights
@@ -200,6 +285,13 @@ class AIService:
         
         return "Tôi không hiểu câu hỏi của bạn. Vui lòng hỏi về điều kiện giảm án, thời gian thử thách, vi phạm hoặc quyền lợi."
     
+    @staticmethod
+    def _as_frame(offenders: Union[List[Offender], OffenderFrame]) -> OffenderFrame:
+        """Accept either Offender objects or an already loaded OffenderFrame."""
+        if isinstance(offenders, OffenderFrame):
+            return offenders
+        return OffenderFrame.from_offenders(offenders or [])
+    
     def _get_recommendations(self, risk_level: RiskLevel, factors: List[str]) -> List[str]:
         """Get recommendations based on risk level and factors."""
         recommendations = []
@@ -2,21 +2,409 @@
 Document service for generating documents from templates.
 """
 
-from typing import Dict, Any, Optional
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Any, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from datetime import datetime, date
 from pathlib import Path
 
+from docx.oxml.ns import qn
 from docxtpl import DocxTemplate
+from jinja2 import Environment, Template
+from lxml import etree
 from models.offender import Offender, Gender, CaseType
-from docx2pdf import convert
+from services.export_service import ProgressCallback
+from services.pdf_service import convert_many, get_pdf_backend
+
+
+# Upper bound on parallel render processes (each holds its own parsed template)
+MAX_RENDER_WORKERS = 4
+
+
+class RenderJob(NamedTuple):
+    """One document of a batch: a label for progress/errors, its context and output file."""
+    label: str
+    context: Dict[str, Any]
+    output_path: str
+
+
+def safe_filename(text: str) -> str:
+    """Make text usable in a file name (case numbers contain '/')."""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', str(text)).strip('_') or 'document'
+
+
+class SafeDict(dict):
+    """Render context that leaves missing fields as {{field_name}} placeholders."""
+    def __missing__(self, key):
+        return '{{' + key + '}}'
+
+
+class CompilingEnvironment(Environment):
+    """Jinja environment that compiles each distinct template source once.
+
+    docxtpl hands the patched XML of every document part to ``from_string``;
+    compiling it is most of the cost of a render and the XML is the same for
+    every render of a template, so compiled templates are kept (LRU).
+    """
+
+    def __init__(self, max_entries: int = 64, **options):
+        """Initialize environment."""
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self._compiled: "OrderedDict[str, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def from_string(self, source, globals=None, template_class=None) -> Template:
+        """Compiled template for source, from the cache when it was seen before."""
+        if globals or template_class or not isinstance(source, str):
+            return super().from_string(source, globals, template_class)
+        key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+        with self._lock:
+            template = self._compiled.get(key)
+            if template is not None:
+                self._compiled.move_to_end(key)
+                return template
+        template = super().from_string(source)
+        with self._lock:
+            self._compiled[key] = template
+            while len(self._compiled) > self.max_entries:
+                self._compiled.popitem(last=False)
+        return template
+
+
+class CachedTemplate(NamedTuple):
+    """A template file read once: its bytes, their SHA-256 and the variables it uses."""
+    data: bytes
+    digest: str
+    variables: FrozenSet[str]
+
+
+class TemplateCache:
+    """Templates keyed by (path, mtime); every render works on a fresh clone.
+
+    Editing a template file changes its mtime, so the next render reloads it.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """Initialize cache."""
+        self.max_entries = max_entries
+        self.env = CompilingEnvironment()
+        self._entries: "OrderedDict[Tuple[str, int], CachedTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template_path: str) -> CachedTemplate:
+        """Cached entry for template_path, (re)loading it when the file changed."""
+        path = str(Path(template_path).resolve())
+        key = (path, os.stat(path).st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        data = Path(path).read_bytes()
+        variables = DocxTemplate(io.BytesIO(data)).get_undeclared_template_variables(self.env)
+        entry = CachedTemplate(data, hashlib.sha256(data).hexdigest(), frozenset(variables))
+        with self._lock:
+            # Drop entries of older versions of the same file
+            for stale in [k for k in self._entries if k[0] == path]:
+                del self._entries[stale]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clone(self, template_path: str) -> DocxTemplate:
+        """A new DocxTemplate over the cached bytes, safe to render and save once."""
+        return DocxTemplate(io.BytesIO(self.get(template_path).data))
+
+    def variables(self, template_path: str) -> FrozenSet[str]:
+        """Names of the context fields the template refers to."""
+        return self.get(template_path).variables
+
+    def clear(self):
+        """Drop all cached templates."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Per process: batch render workers each build their own
+_template_cache = TemplateCache()
+
+
+def render_document(template_path: str, context: Dict[str, Any], output_path: str) -> str:
+    """Render one template to a .docx file (also runs in batch worker processes)."""
+    doc = _template_cache.clone(template_path)
+    doc.render(SafeDict(context), _template_cache.env)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    # Written next to the target and moved into place, so a file at output_path is always complete
+    partial = f"{output_path}.{os.getpid()}.part"
+    doc.save(partial)
+    os.replace(partial, output_path)
+    return output_path
+
+
+EXPORTS_DIR = Path("data/exports")
+
+# Eviction limits for rendered documents in the exports directory
+RENDER_CACHE_MAX_BYTES = 500 * 1024 * 1024
+RENDER_CACHE_MAX_AGE_DAYS = 30
+
+# Seconds between automatic eviction scans
+RENDER_CACHE_EVICT_INTERVAL = 60
+
+
+class RenderCache:
+    """Rendered documents addressed by a hash of template content and context.
+    
+    A document is stored as ``<prefix>_<key>.docx``; rendering the same
+    template with the same context again returns that file. Serving a file
+    refreshes its mtime, and eviction removes the least recently used files
+    older than ``max_age_days`` or beyond ``max_bytes``. Only files named by
+    the cache are ever removed, so other exports in the directory are safe.
+    """
+    
+    KEY_LENGTH = 20
+    
+    def __init__(self, directory: Path = EXPORTS_DIR, max_bytes: int = RENDER_CACHE_MAX_BYTES,
+                 max_age_days: float = RENDER_CACHE_MAX_AGE_DAYS):
+        """Initialize cache."""
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._last_evict = 0.0
+        self._lock = threading.Lock()
+        self._name_pattern = re.compile(rf'_[0-9a-f]{{{self.KEY_LENGTH}}}\.docx$')
+    
+    @staticmethod
+    def key(template_path: str, context: Dict[str, Any]) -> str:
+        """SHA-256 over the template bytes and the canonical JSON of the context."""
+        payload = json.dumps(context, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(_template_cache.get(template_path).digest.encode('ascii'))
+        digest.update(payload.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def path_for(self, template_path: str, context: Dict[str, Any], prefix: str) -> Path:
+        """Where the document for this template and context lives."""
+        return self.directory / f"{safe_filename(prefix)}_{self.key(template_path, context)[:self.KEY_LENGTH]}.docx"
+    
+    def lookup(self, path: Path) -> bool:
+        """Whether path is cached; a hit marks it as recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+    
+    def get_or_render(self, template_path: str, context: Dict[str, Any], prefix: str) -> str:
+        """Path of the rendered document, rendering it only when not cached."""
+        path = self.path_for(template_path, context, prefix)
+        if not self.lookup(path):
+            render_document(template_path, context, str(path))
+            self.maybe_evict()
+        return str(path)
+    
+    def maybe_evict(self):
+        """Evict, at most once per RENDER_CACHE_EVICT_INTERVAL seconds."""
+        now = time.monotonic()
+        if now - self._last_evict >= RENDER_CACHE_EVICT_INTERVAL:
+            self._last_evict = now
+            self.evict()
+    
+    def evict(self) -> int:
+        """Remove expired files, then the least recently used until under max_bytes."""
+        with self._lock:
+            if not self.directory.exists():
+                return 0
+            entries = []
+            for path in self.directory.iterdir():
+                if not self._name_pattern.search(path.name):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+            
+            removed = 0
+            expire_before = time.time() - self.max_age_days * 86400
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if mtime >= expire_before and total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
+
+
+# Separates records in merged output
+PAGE_BREAK_XML = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+
+def _iter_record_bodies(doc: DocxTemplate, contexts: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Rendered body content (without the section properties) of each context.
+    
+    doc must have been render_init()-ed once by the caller: re-initializing per
+    record would restart the drawing (wp:docPr) ids, and Word rejects a document
+    with duplicate ids, so they keep counting up across the merged body.
+    """
+    sect_pr = qn('w:sectPr')
+    for context in contexts:
+        tree = doc.fix_tables(doc.build_xml(SafeDict(context), _template_cache.env))
+        doc.fix_docpr_ids(tree)
+        yield ''.join(etree.tostring(child, encoding='unicode') for child in tree if child.tag != sect_pr)
+
+
+def write_merged_docx(template_path: str, contexts: Iterable[Dict[str, Any]], output_path: str,
+                      progress: Optional[ProgressCallback] = None, total: Optional[int] = None) -> int:
+    """Render every context into one .docx, a page break between records.
+    
+    The document body is written to the zip entry record by record, so only
+    one rendered record is held in memory. Headers and footers are rendered
+    with the first context. Returns the number of records written.
+    """
+    doc = _template_cache.clone(template_path)
+    doc.render_init()
+    document_part = doc.docx._part.partname.lstrip('/')
+    body = doc.docx._element.body
+    section = body.find(qn('w:sectPr'))
+    
+    template_zip = zipfile.ZipFile(io.BytesIO(_template_cache.get(template_path).data))
+    document_xml = template_zip.read(document_part).decode('utf-8')
+    body_open = re.search(r'<w:body[^>]*>', document_xml)
+    prefix = document_xml[:body_open.end()]
+    suffix = ((etree.tostring(section, encoding='unicode') if section is not None else '')
+              + '</w:body>' + document_xml[document_xml.index('</w:body>') + len('</w:body>'):])
+    
+    contexts = iter(contexts)
+    first = next(contexts, None)
+    if first is not None:
+        contexts = itertools.chain([first], contexts)
+    # Header/footer part name -> rendered XML
+    replaced = {}
+    if first is not None:
+        for uri in (doc.HEADER_URI, doc.FOOTER_URI):
+            for rel_key, xml in doc.build_headers_footers_xml(SafeDict(first), uri, _template_cache.env):
+                replaced[doc.docx._part.rels[rel_key].target_part.partname.lstrip('/')] = xml
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    if progress:
+        progress(0, total or 0)
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as out:
+        for item in template_zip.infolist():
+            if item.filename == document_part:
+                continue
+            out.writestr(item, replaced.get(item.filename) or template_zip.read(item.filename))
+        with out.open(document_part, 'w', force_zip64=True) as stream:
+            stream.write(prefix.encode('utf-8'))
+            for content in _iter_record_bodies(doc, contexts):
+                if count:
+                    stream.write(PAGE_BREAK_XML.encode('utf-8'))
+                stream.write(content.encode('utf-8'))
+                count += 1
+                if progress:
+                    progress(count, max(total or 0, count))
+            stream.write(suffix.encode('utf-8'))
+    return count
+
+
+def _text(value) -> str:
+    """Enum value or plain text."""
+    return value.value if hasattr(value, 'value') else str(value)
+
+
+def _day(value: Optional[date]) -> str:
+    """dd/mm/YYYY, empty when missing."""
+    return value.strftime('%d/%m/%Y') if value else ''
+
+
+# Template variable -> value for an offender (and the render time)
+CONTEXT_FIELDS: Dict[str, Callable[[Offender, datetime], Any]] = {
+    # Basic information
+    'ten_ho_so': lambda o, now: o.case_number,
+    'ten_doi_tuong': lambda o, now: o.full_name,
+    'gioi_tinh': lambda o, now: _text(o.gender),
+    'ten_khac': lambda o, now: '',  # Placeholder
+    'ngay_sinh': lambda o, now: _day(o.birth_date),
+    'noi_dktt': lambda o, now: o.address,
+    'noi_o_hien_nay': lambda o, now: o.address,
+    'toi_danh': lambda o, now: o.crime,
+    
+    # Case information
+    'hinh_phat': lambda o, now: _text(o.case_type),
+    'thoi_han': lambda o, now: f"{o.duration_months} tháng",
+    'thoi_han_chap_hanh': lambda o, now: f"{o.duration_months} tháng",
+    'ngay_chap_hanh': lambda o, now: _day(o.start_date),
+    'ban_an_so': lambda o, now: o.sentence_number,
+    'ngay_ban_an': lambda o, now: _day(o.start_date),
+    'toa_an': lambda o, now: 'TAND huyện Thạch Hà, tỉnh Hà Tĩnh',
+    'qd_thi_hanh_so': lambda o, now: o.decision_number,
+    'ngay_qd_thi_hanh': lambda o, now: _day(o.start_date),
+    'toa_an_qd': lambda o, now: 'TAND huyện Thạch Hà, tỉnh Hà Tĩnh',
+    'noi_dung_chap_hanh': lambda o, now: f"Chấp hành án {_text(o.case_type)}",
+    'so_ho_so': lambda o, now: o.case_number,
+    'ngay_lap_ho_so': lambda o, now: now.strftime('%d/%m/%Y'),
+    'so_to': lambda o, now: '15',  # Placeholder
+    
+    # Completion information
+    'ngay_hoan_thanh': lambda o, now: _day(o.completion_date),
+    'trang_thai': lambda o, now: _text(o.status),
+    'so_ngay_con_lai': lambda o, now: o.days_remaining,
+    
+    # Reduction information
+    'duoc_giam_thoi_gian': lambda o, now: f"{o.reduced_months} tháng" if o.reduced_months > 0 else "Không",
+    'ngay_duoc_giam': lambda o, now: _day(o.reduction_date),
+    'so_lan_giam': lambda o, now: o.reduction_count,
+    
+    # Officer information (placeholders)
+    'can_bo_giao': lambda o, now: 'Nguyễn Văn A',
+    'chuc_vu_giao': lambda o, now: 'Cán bộ quản lý',
+    'don_vi_giao': lambda o, now: 'Phòng Thi hành án dân sự',
+    'can_bo_nhan': lambda o, now: 'Trần Thị B',
+    'chuc_vu_nhan': lambda o, now: 'Cán bộ tiếp nhận',
+    'don_vi_nhan': lambda o, now: 'Phòng Thi hành án dân sự',
+    
+    # Document metadata
+    'can_cu_khoan': lambda o, now: 'Khoản 1 Điều 1 Nghị định số 62/2015/NĐ-CP',
+    'thoi_gian_giao': lambda o, now: now.strftime('%H:%M ngày %d/%m/%Y'),
+    'dia_diem_giao': lambda o, now: 'Phòng Thi hành án dân sự, TAND huyện Thạch Hà',
+    'gio_ket_thuc': lambda o, now: now.strftime('%H:%M'),
+    
+    # Current date
+    'ngay_hien_tai': lambda o, now: now.strftime('%d/%m/%Y'),
+    'thang_hien_tai': lambda o, now: now.strftime('%m/%Y'),
+    'nam_hien_tai': lambda o, now: str(now.year),
+}
 
 
 class DocumentService:
     """Service for generating documents from templates."""
     
-    def __init__(self):
+    def __init__(self, render_cache: Optional[RenderCache] = None):
         """Initialize document service."""
         self.templates_dir = Path("assets/templates")
+        self.render_cache = render_cache or RenderCache()
         
     def generate_confirmation_letter(self, offender: Offender, template_name: str = "CD44A_template.docx") -> Optional[str]:
         """Generate confirmation letter from template."""
@@ -25,114 +413,145 @@ class DocumentService:
             if not template_path.exists():
                 raise FileNotFoundError(f"Template không tồn tại: {template_path}")
             
-            # Load template
-            doc = DocxTemplate(str(template_path))
-            
-            # Prepare context data
-            context = self._prepare_context(offender)
-            
-            # Render template
-            doc.render(context)
+            # Prepare only the fields this template uses
+            context = self._prepare_context(offender, self.template_variables(template_name))
             
-            # Generate output filename
-            output_filename = f"Giay_xac_nhan_{offender.case_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-            output_path = Path("data/exports") / output_filename
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save document
-            doc.save(str(output_path))
-            
-            return str(output_path)
+            # Reuse the document when template and data are unchanged
+            return self.render_cache.get_or_render(
+                str(template_path), context, f"Giay_xac_nhan_{offender.case_number}"
+            )
             
         except Exception as e:
             print(f"Lỗi tạo giấy xác nhận: {e}")
             return None
     
-    def generate_batch_confirmation_letters(self, offenders: list, template_name: str = "CD44A_template.docx") -> Dict[str, Any]:
-        """Generate confirmation letters for multiple offenders."""
+    def generate_batch_confirmation_letters(self, offenders: list, template_name: str = "CD44A_template.docx",
+                                            max_workers: Optional[int] = None,
+                                            progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Generate confirmation letters for multiple offenders in parallel."""
+        template_path = self.templates_dir / template_name
+        if not template_path.exists():
+            return {
+                'success_count': 0,
+                'error_count': len(offenders),
+                'errors': [f"Template không tồn tại: {template_path}"],
+                'generated_files': []
+            }
+        
+        fields = self.template_variables(template_name)
+        cached, jobs = [], []
+        for offender in offenders:
+            context = self._prepare_context(offender, fields)
+            path = self.render_cache.path_for(str(template_path), context, f"Giay_xac_nhan_{offender.case_number}")
+            job = RenderJob(offender.full_name, context, str(path))
+            (cached if self.render_cache.lookup(path) else jobs).append(job)
+        
+        # Documents already on disk count as done; only the others are rendered
+        total = len(offenders)
+        results = self.render_batch(
+            str(template_path), jobs, max_workers,
+            (lambda done, _: progress(len(cached) + done, total)) if progress else None
+        )
+        for job in cached:
+            results['success_count'] += 1
+            results['generated_files'].append(job.output_path)
+            results['documents'].append({'label': job.label, 'path': job.output_path, 'error': None})
+        self.render_cache.maybe_evict()
+        return results
+    
+    def render_batch(self, template_path: str, jobs: List[RenderJob],
+                     max_workers: Optional[int] = None,
+                     progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Render many documents from one template across a process pool.
+        
+        At most ``max_workers`` processes are used (default: MAX_RENDER_WORKERS,
+        capped at the CPU count); a single document or worker renders in
+        this process. ``progress(done, total)`` is called as each document
+        finishes. A failing document does not stop the batch: its error is
+        recorded in ``errors`` and in its ``documents`` entry.
+        """
         results = {
             'success_count': 0,
             'error_count': 0,
             'errors': [],
-            'generated_files': []
+            'generated_files': [],
+            'documents': []
         }
+        total = len(jobs)
+        if progress:
+            progress(0, total)
         
-        for offender in offenders:
-            try:
-                file_path = self.generate_confirmation_letter(offender, template_name)
-                if file_path:
-                    results['success_count'] += 1
-                    results['generated_files'].append(file_path)
-                else:
-                    results['error_count'] += 1
-                    results['errors'].append(f"Không thể tạo giấy xác nhận cho {offender.full_name}")
-            except Exception as e:
+        def record(job: RenderJob, error: Optional[Exception]):
+            if error is None:
+                results['success_count'] += 1
+                results['generated_files'].append(job.output_path)
+            else:
                 results['error_count'] += 1
-                results['errors'].append(f"Lỗi tạo giấy xác nhận cho {offender.full_name}: {str(e)}")
+                results['errors'].append(f"Lỗi tạo văn bản cho {job.label}: {error}")
+            results['documents'].append({
+                'label': job.label,
+                'path': job.output_path if error is None else None,
+                'error': str(error) if error is not None else None
+            })
+            if progress:
+                progress(len(results['documents']), total)
+        
+        workers = min(max_workers or min(MAX_RENDER_WORKERS, os.cpu_count() or 1), total)
+        if workers <= 1:
+            for job in jobs:
+                try:
+                    render_document(template_path, job.context, job.output_path)
+                    record(job, None)
+                except Exception as e:
+                    record(job, e)
+            return results
         
+        # Spawned, not forked: the app process runs several threads whose locks a fork could copy held
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {
+                pool.submit(render_document, template_path, job.context, job.output_path): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                record(futures[future], future.exception())
         return results
     
-    def _prepare_context(self, offender: Offender) -> Dict[str, Any]:
-        """Prepare context data for template rendering."""
-        context = {
-            # Basic information
-            'ten_ho_so': offender.case_number,
-            'ten_doi_tuong': offender.full_name,
-            'gioi_tinh': offender.gender.value if hasattr(offender.gender, 'value') else str(offender.gender),
-            'ten_khac': '',  # Placeholder
-            'ngay_sinh': offender.birth_date.strftime('%d/%m/%Y') if offender.birth_date else '',
-            'noi_dktt': offender.address,
-            'noi_o_hien_nay': offender.address,
-            'toi_danh': offender.crime,
-            
-            # Case information
-            'hinh_phat': offender.case_type.value if hasattr(offender.case_type, 'value') else str(offender.case_type),
-            'thoi_han': f"{offender.duration_months} tháng",
-            'thoi_han_chap_hanh': f"{offender.duration_months} tháng",
-            'ngay_chap_hanh': offender.start_date.strftime('%d/%m/%Y') if offender.start_date else '',
-            'ban_an_so': offender.sentence_number,
-            'ngay_ban_an': offender.start_date.strftime('%d/%m/%Y') if offender.start_date else '',
-            'toa_an': 'TAND huyện Thạch Hà, tỉnh Hà Tĩnh',
-            'qd_thi_hanh_so': offender.decision_number,
-            'ngay_qd_thi_hanh': offender.start_date.strftime('%d/%m/%Y') if offender.start_date else '',
-            'toa_an_qd': 'TAND huyện Thạch Hà, tỉnh Hà Tĩnh',
-            'noi_dung_chap_hanh': f"Chấp hành án {offender.case_type.value if hasattr(offender.case_type, 'value') else str(offender.case_type)}",
-            'so_ho_so': offender.case_number,
-            'ngay_lap_ho_so': datetime.now().strftime('%d/%m/%Y'),
-            'so_to': '15',  # Placeholder
-            
-            # Completion information
-            'ngay_hoan_thanh': offender.completion_date.strftime('%d/%m/%Y') if offender.completion_date else '',
-            'trang_thai': offender.status.value if hasattr(offender.status, 'value') else str(offender.status),
-            'so_ngay_con_lai': offender.days_remaining,
-            
-            # Reduction information
-            'duoc_giam_thoi_gian': f"{offender.reduced_months} tháng" if offender.reduced_months > 0 else "Không",
-            'ngay_duoc_giam': offender.reduction_date.strftime('%d/%m/%Y') if offender.reduction_date else '',
-            'so_lan_giam': offender.reduction_count,
-            
-            # Officer information (placeholders)
-            'can_bo_giao': 'Nguyễn Văn A',
-            'chuc_vu_giao': 'Cán bộ quản lý',
-            'don_vi_giao': 'Phòng Thi hành án dân sự',
-            'can_bo_nhan': 'Trần Thị B',
-            'chuc_vu_nhan': 'Cán bộ tiếp nhận',
-            'don_vi_nhan': 'Phòng Thi hành án dân sự',
-            
-            # Document metadata
-            'can_cu_khoan': 'Khoản 1 Điều 1 Nghị định số 62/2015/NĐ-CP',
-            'thoi_gian_giao': datetime.now().strftime('%H:%M ngày %d/%m/%Y'),
-            'dia_diem_giao': 'Phòng Thi hành án dân sự, TAND huyện Thạch Hà',
-            'gio_ket_thuc': datetime.now().strftime('%H:%M'),
-            
-            # Current date
-            'ngay_hien_tai': datetime.now().strftime('%d/%m/%Y'),
-            'thang_hien_tai': datetime.now().strftime('%m/%Y'),
-            'nam_hien_tai': str(datetime.now().year)
-        }
+    def render_merged(self, template_path: str, contexts: Iterable[Dict[str, Any]], output_path: str,
+                      progress: Optional[ProgressCallback] = None, total: Optional[int] = None) -> int:
+        """Render all contexts into one document, one record per page.
         
+        A .pdf output_path is converted from a temporary merged .docx. Returns
+        the number of records written.
+        """
+        if Path(output_path).suffix.lower() != '.pdf':
+            return write_merged_docx(template_path, contexts, output_path, progress, total)
+        with tempfile.TemporaryDirectory() as tmp:
+            word_path = str(Path(tmp) / (Path(output_path).stem + '.docx'))
+            count = write_merged_docx(template_path, contexts, word_path, progress, total)
+            if not get_pdf_backend().convert(word_path, output_path):
+                raise RuntimeError("Không thể chuyển văn bản gộp sang PDF")
+        return count
+    
+    def build_context(self, offender: Offender, template_name: str) -> Dict[str, Any]:
+        """Offender fields plus the template fields _prepare_context provides."""
+        context = offender.to_dict()
+        context.update(self._prepare_context(offender, self.template_variables(template_name)))
         return context
     
+    def _prepare_context(self, offender: Offender, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Prepare context data for template rendering.
+        
+        Only ``fields`` (e.g. the variables of the template being rendered) are
+        computed; all of CONTEXT_FIELDS when None. Unknown names are skipped.
+        """
+        now = datetime.now()
+        names = CONTEXT_FIELDS if fields is None else [f for f in fields if f in CONTEXT_FIELDS]
+        return {name: CONTEXT_FIELDS[name](offender, now) for name in names}
+    
+    def template_variables(self, template_name: str) -> FrozenSet[str]:
+        """Context fields used by a template in the templates directory."""
+        return _template_cache.variables(str(self.templates_dir / template_name))
+    
     def get_available_templates(self) -> list:
         """Get list of available templates."""
         templates = []
@@ -174,7 +593,7 @@ class DocumentService:
                 return {
                     'template_name': template_name,
                     'preview_path': preview_path,
-                    'sample_data': self._prepare_context(sample_offender)
+                    'sample_data': self._prepare_context(sample_offender, self.template_variables(template_name))
                 }
             
             return None
@@ -189,26 +608,46 @@ class DocumentService:
         Đổ dữ liệu vào template Word (docx) sử dụng docxtpl.
         Nếu trường nào chưa có dữ liệu, giữ nguyên {{field_name}} để người dùng bổ sung thủ công.
         """
-        doc = DocxTemplate(template_path)
-        # Nếu context thiếu trường, giữ nguyên placeholder
-        class SafeDict(dict):
-            def __missing__(self, key):
-                return '{{' + key + '}}'
-        doc.render(SafeDict(context))
-        doc.save(output_path)
+        render_document(template_path, context, output_path)
 
     @staticmethod
     def export_to_pdf(word_path: str, pdf_path: str) -> bool:
         """
-        Chuyển file Word đã đổ dữ liệu sang PDF bằng docx2pdf.
+        Chuyển file Word đã đổ dữ liệu sang PDF bằng PDF backend đang dùng
+        (LibreOffice chạy nền hoặc docx2pdf, xem services.pdf_service).
         Trả về True nếu thành công, False nếu lỗi.
         """
         try:
-            convert(word_path, pdf_path)
-            return True
+            return get_pdf_backend().convert(word_path, pdf_path)
         except Exception as e:
             print(f"Lỗi chuyển Word sang PDF: {e}")
             return False
+    
+    @staticmethod
+    def export_batch_to_pdf(word_paths: List[str], output_dir: Optional[str] = None,
+                            progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """Convert many Word files to PDF in batches through one converter process.
+        
+        Each PDF is written next to its Word file, or into ``output_dir``.
+        The result has the keys of render_batch.
+        """
+        jobs = [
+            (word_path, str(Path(output_dir or Path(word_path).parent) / (Path(word_path).stem + ".pdf")))
+            for word_path in word_paths
+        ]
+        errors = convert_many(jobs, progress=progress)
+        results = {'success_count': 0, 'error_count': 0, 'errors': [], 'generated_files': [], 'documents': []}
+        for (word_path, pdf_path), error in zip(jobs, errors):
+            if error is None:
+                results['success_count'] += 1
+                results['generated_files'].append(pdf_path)
+            else:
+                results['error_count'] += 1
+                results['errors'].append(f"Lỗi chuyển {Path(word_path).name} sang PDF: {error}")
+            results['documents'].append({'label': Path(word_path).name,
+                                         'path': pdf_path if error is None else None,
+                                         'error': error})
+        return results
 
 # Ví dụ sử dụng:
 # DocumentService.export_to_word(
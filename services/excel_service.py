@@ -3,10 +3,249 @@ Excel service for importing/exporting data with automatic calculations.
 """
 
 import pandas as pd
-from typing import List, Dict, Any
-from datetime import datetime
-from models.offender import Offender, Gender, CaseType
-from services.offender_service import OffenderService
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from datetime import date, datetime
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+import numpy as np
+from database.database_manager import UPSERT_COLUMNS
+from models.derivation import NO_DATE, STATUS_BY_CODE, STATUS_CODES, day_to_date, derive_arrays
+from models.offender import Offender, Gender, CaseType, RiskLevel, Status
+from models.offender_frame import OffenderFrame
+from services.activity_service import ActivityAction
+from services.export_service import ProgressCallback
+from services.offender_service import OffenderService, append_row_errors
+from utils.spreadsheet_reader import estimate_row_count, iter_sheet_chunks
+
+
+EXPORT_SHEET_NAME = 'Đối tượng thi hành án'
+EXPORT_BATCH_SIZE = 1000
+
+# Rows inspected to estimate column widths, and the width bounds
+WIDTH_SAMPLE_ROWS = 200
+MIN_COLUMN_WIDTH = 8
+MAX_COLUMN_WIDTH = 50
+
+DATE_FORMAT = 'DD/MM/YYYY'
+
+
+def _enum_text(value) -> str:
+    return value.value if hasattr(value, 'value') else str(value)
+
+
+class ExportColumn(NamedTuple):
+    """One exported column: header, value getter and optional number format."""
+    header: str
+    value: Callable[[Offender], Any]
+    number_format: Optional[str] = None
+
+
+EXPORT_COLUMNS: List[ExportColumn] = [
+    ExportColumn('Số hồ sơ', lambda o: o.case_number),
+    ExportColumn('Họ tên', lambda o: o.full_name),
+    ExportColumn('Giới tính', lambda o: _enum_text(o.gender)),
+    ExportColumn('Ngày sinh', lambda o: o.birth_date, DATE_FORMAT),
+    ExportColumn('Địa chỉ', lambda o: o.address),
+    ExportColumn('Nghề nghiệp', lambda o: o.occupation),
+    ExportColumn('Tội danh', lambda o: o.crime),
+    ExportColumn('Loại án', lambda o: _enum_text(o.case_type)),
+    ExportColumn('Số bản án', lambda o: o.sentence_number),
+    ExportColumn('Số quyết định', lambda o: o.decision_number),
+    ExportColumn('Ngày bắt đầu', lambda o: o.start_date, DATE_FORMAT),
+    ExportColumn('Thời gian (tháng)', lambda o: o.duration_months),
+    ExportColumn('Được giảm (tháng)', lambda o: o.reduced_months),
+    ExportColumn('Ngày được giảm', lambda o: o.reduction_date, DATE_FORMAT),
+    ExportColumn('Số lần giảm', lambda o: o.reduction_count),
+    ExportColumn('Ngày chấp hành xong', lambda o: o.completion_date, DATE_FORMAT),
+    ExportColumn('Trạng thái', lambda o: _enum_text(o.status)),
+    ExportColumn('Số ngày còn lại', lambda o: o.days_remaining),
+    ExportColumn('Mức độ nguy cơ', lambda o: _enum_text(o.risk_level)),
+    ExportColumn('Tỷ lệ nguy cơ (%)', lambda o: round(o.risk_percentage or 0.0, 1), '0.0'),
+    ExportColumn('Ghi chú', lambda o: o.notes)
+]
+
+HEADER_FONT = Font(bold=True, color='FFFFFF')
+HEADER_FILL = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+
+def _display_length(value: Any) -> int:
+    """Approximate rendered width of a cell value in characters."""
+    if value is None:
+        return 0
+    if isinstance(value, date):
+        return len(DATE_FORMAT)
+    return len(str(value))
+
+
+def estimate_column_widths(columns: List[ExportColumn], sample_rows: List[List[Any]]) -> List[float]:
+    """Column widths from the header and a sample of rows instead of every cell."""
+    widths = []
+    for index, column in enumerate(columns):
+        longest = max([len(column.header)] + [_display_length(row[index]) for row in sample_rows])
+        widths.append(min(max(longest + 2, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH))
+    return widths
+
+
+def write_offenders_xlsx(offenders: Iterable[Offender], file_path: str,
+                         columns: List[ExportColumn] = EXPORT_COLUMNS,
+                         sheet_name: str = EXPORT_SHEET_NAME,
+                         progress: Optional[ProgressCallback] = None,
+                         total: Optional[int] = None) -> int:
+    """Stream offenders into an .xlsx file using openpyxl's write-only mode.
+
+    Only the first WIDTH_SAMPLE_ROWS rows are buffered (to size the columns);
+    the rest are written as they are read. Returns the number of rows written.
+    """
+    rows = ([column.value(offender) for column in columns] for offender in offenders)
+    sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    for index, width in enumerate(estimate_column_widths(columns, sample), start=1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+    sheet.freeze_panes = 'A2'
+
+    header = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=column.header)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        header.append(cell)
+    sheet.append(header)
+
+    formatted = [(index, column.number_format) for index, column in enumerate(columns)
+                 if column.number_format]
+    count = 0
+    if progress:
+        progress(0, total or 0)
+    for row in chain(sample, rows):
+        for index, number_format in formatted:
+            if row[index] is not None:
+                cell = WriteOnlyCell(sheet, value=row[index])
+                cell.number_format = number_format
+                row[index] = cell
+        sheet.append(row)
+        count += 1
+        if progress and count % EXPORT_BATCH_SIZE == 0:
+            progress(count, total or count)
+    if progress:
+        progress(count, total or count)
+
+    workbook.save(file_path)
+    return count
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import when cancellation was requested."""
+
+
+# Import sheet header -> Offender field
+IMPORT_TEXT_COLUMNS = {
+    'Số hồ sơ': 'case_number', 'Họ tên': 'full_name', 'Địa chỉ': 'address',
+    'Nghề nghiệp': 'occupation', 'Tội danh': 'crime', 'Số bản án': 'sentence_number',
+    'Số quyết định': 'decision_number', 'Ghi chú': 'notes'
+}
+IMPORT_DATE_COLUMNS = {
+    'Ngày sinh': 'birth_date', 'Ngày bắt đầu': 'start_date', 'Ngày được giảm': 'reduction_date'
+}
+IMPORT_INT_COLUMNS = {
+    'Thời gian (tháng)': 'duration_months', 'Được giảm (tháng)': 'reduced_months',
+    'Số lần giảm': 'reduction_count'
+}
+IMPORT_CHUNK_SIZE = 1000
+
+IMPORT_DATE_FORMAT = '%d/%m/%Y'
+
+
+def parse_date_column(values: pd.Series) -> pd.Series:
+    """Excel date cells or dd/mm/yyyy text -> datetime64; NaT when missing or unparseable."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    is_text = values.map(lambda value: isinstance(value, str))
+    if is_text.any():
+        parsed[is_text] = pd.to_datetime(values[is_text].astype(str).str.strip(),
+                                         format=IMPORT_DATE_FORMAT, errors='coerce')
+    is_date = values.map(lambda value: isinstance(value, (datetime, date)))
+    if is_date.any():
+        parsed[is_date] = pd.to_datetime(values[is_date])
+    return parsed
+
+
+def map_import_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Map an import sheet to Offender field columns, parsing every column at once.
+    
+    Non-numeric values in number columns are kept as NaN so validation can
+    report them; missing columns are treated as empty.
+    """
+    def column(header: str) -> pd.Series:
+        return df[header] if header in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+    
+    frame = pd.DataFrame(index=df.index)
+    for header, name in IMPORT_TEXT_COLUMNS.items():
+        frame[name] = column(header).fillna('').astype(str).str.strip()
+    
+    gender = column('Giới tính').fillna('').astype(str).str.strip().str.lower()
+    frame['gender'] = np.where(gender.str.contains('nữ', regex=False), Gender.FEMALE, Gender.MALE)
+    
+    # Exact case type names first, then the short form "Cải tạo"
+    case_type = column('Loại án').fillna('').astype(str).str.strip().str.lower()
+    by_name = case_type.map({member.value.lower(): member for member in CaseType})
+    frame['case_type'] = by_name.where(by_name.notna(), np.where(
+        case_type.str.contains('cải tạo', regex=False), CaseType.PROBATION, CaseType.SUSPENDED_SENTENCE
+    ))
+    
+    for header, name in IMPORT_DATE_COLUMNS.items():
+        frame[name] = parse_date_column(column(header))
+    
+    for header, name in IMPORT_INT_COLUMNS.items():
+        raw = column(header)
+        numbers = pd.to_numeric(raw, errors='coerce')
+        # Empty cells count as 0; unparseable text stays NaN
+        frame[name] = numbers.where(numbers.notna() | raw.notna(), 0)
+    return frame
+
+
+def validate_import_frame(frame: pd.DataFrame, seen_case_numbers: Optional[set] = None) -> pd.Series:
+    """Per-row error messages ("" when valid) for a mapped import frame.
+    
+    Applies OffenderService's validation rules column-wise and also rejects
+    non-numeric number cells and case numbers repeated within the file. When
+    the file is validated chunk by chunk, ``seen_case_numbers`` carries the
+    case numbers of earlier chunks and is updated. The number columns are
+    converted to integers in place.
+    """
+    invalid_numbers = {header: frame[name].isna() for header, name in IMPORT_INT_COLUMNS.items()}
+    for name in IMPORT_INT_COLUMNS.values():
+        frame[name] = frame[name].fillna(0).astype(np.int64)
+    
+    errors = OffenderService.validate_offender_columns(frame)
+    for header, failed in invalid_numbers.items():
+        append_row_errors(errors, failed, f"Giá trị không hợp lệ ở cột '{header}'")
+    case_numbers = frame['case_number']
+    duplicated = case_numbers.duplicated(keep='first')
+    if seen_case_numbers is not None:
+        duplicated |= case_numbers.isin(seen_case_numbers)
+        seen_case_numbers.update(case_numbers[case_numbers.ne('')])
+    append_row_errors(errors, case_numbers.ne('') & duplicated, "Số hồ sơ bị trùng trong file")
+    return errors
+
+
+def _day_numbers(values: pd.Series) -> np.ndarray:
+    """datetime64 column -> int64 day numbers, NO_DATE for NaT."""
+    days = values.to_numpy(dtype='datetime64[D]').astype(np.int64)
+    return np.where(values.isna().to_numpy(), NO_DATE, days)
+
+
+def _to_dates(values: pd.Series) -> List[Optional[date]]:
+    """datetime64 column -> date objects, None for NaT."""
+    return [None if pd.isna(value) else value.date() for value in values]
 
 
 class ExcelService:
@@ -16,181 +255,174 @@ class ExcelService:
         """Initialize Excel service."""
         self.offender_service = offender_service
         
-    def import_from_excel(self, file_path: str) -> Dict[str, Any]:
-        """Import offenders from Excel file with automatic calculations."""
+    def import_from_excel(self, file_path: str, dry_run: bool = False,
+                          progress: Optional[ProgressCallback] = None,
+                          should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """Import offenders from an Excel (.xlsx/.xls) or CSV file with automatic calculations.
+        
+        The file is read in chunks of IMPORT_CHUNK_SIZE rows; each chunk is
+        mapped, parsed and validated column-wise and its valid rows are
+        upserted (matched on case number) in one transaction, so memory stays
+        flat however large the file is. Invalid rows are skipped and reported
+        in ``errors`` as "Dòng N: ..." once at the end.
+        
+        ``progress(done, total)`` is called after each chunk with the rows read
+        and the estimated row count. When ``should_cancel()`` returns True the
+        chunk being written is rolled back and the import stops; earlier chunks
+        stay saved. With ``dry_run`` nothing is written: created/updated counts
+        say what would happen.
+        """
+        chunks = iter_sheet_chunks(file_path, IMPORT_CHUNK_SIZE)
+        cancelled = False
+        rows_read = created_count = updated_count = 0
+        errors: List[str] = []
+        seen_case_numbers: set = set()
+        
         try:
-            # Read Excel file
-            df = pd.read_excel(file_path, sheet_name=0)
-            
-            imported_count = 0
-            errors = []
-            
-            for index, row in df.iterrows():
+            total = estimate_row_count(file_path) or 0
+            if progress:
+                progress(0, total)
+            for df in chunks:
+                if should_cancel and should_cancel():
+                    cancelled = True
+                    break
+                frame = map_import_columns(df)
+                row_errors = validate_import_frame(frame, seen_case_numbers)
                 try:
-                    # Convert row to offender data
-                    offender_data = self._convert_row_to_offender_data(row)
-                    
-                    # Create offender object (will trigger automatic calculations)
-                    offender = Offender.from_dict(offender_data)
-                    
-                    # Save to database
-                    offender_id = self.offender_service.db_manager.create_offender(offender)
-                    offender.id = offender_id
-                    
-                    imported_count += 1
-                    
-                except Exception as e:
-                    errors.append(f"Dòng {index + 2}: {str(e)}")
-            
-            return {
-                'success': True,
-                'imported_count': imported_count,
-                'errors': errors,
-                'total_rows': len(df)
-            }
-            
+                    created, updated = self._upsert_chunk(frame[row_errors == ''], dry_run, should_cancel)
+                except ImportCancelled:
+                    cancelled = True
+                    break
+                created_count += created
+                updated_count += updated
+                failed = row_errors[row_errors != '']
+                errors.extend(f"Dòng {index + 2}: {message}" for index, message in failed.items())
+                rows_read += len(df)
+                if progress:
+                    progress(rows_read, max(total, rows_read))
         except Exception as e:
+            stage = "Lỗi đọc file Excel" if rows_read == 0 else "Lỗi nhập dữ liệu"
             return {
                 'success': False,
-                'error': f"Lỗi đọc file Excel: {str(e)}",
-                'imported_count': 0,
-                'errors': []
+                'error': f"{stage}: {str(e)}",
+                'imported_count': 0 if dry_run else created_count + updated_count,
+                'errors': errors
             }
+        finally:
+            chunks.close()
+        
+        if not dry_run and created_count + updated_count:
+            self.offender_service.activity_log.log(
+                ActivityAction.IMPORT,
+                f"Nhập {created_count + updated_count} đối tượng từ {Path(file_path).name} "
+                f"({created_count} mới, {updated_count} cập nhật)"
+            )
+        return {
+            'success': True,
+            'dry_run': dry_run,
+            'cancelled': cancelled,
+            'imported_count': 0 if dry_run else created_count + updated_count,
+            'created_count': created_count,
+            'updated_count': updated_count,
+            'errors': errors,
+            'total_rows': rows_read
+        }
+    
+    def _upsert_chunk(self, chunk: pd.DataFrame, dry_run: bool = False,
+                      should_cancel: Optional[Callable[[], bool]] = None) -> Tuple[int, int]:
+        """Derive completion/status and risk for a chunk of valid rows and upsert it.
+        
+        The chunk is committed only if ``should_cancel()`` is still False once
+        it has been written; otherwise it is rolled back and ImportCancelled is
+        raised. Returns the number of created and updated records.
+        """
+        if chunk.empty:
+            return 0, 0
+        db_manager = self.offender_service.db_manager
+        case_numbers = chunk['case_number'].tolist()
+        existing = db_manager.get_statuses_by_case_number(case_numbers)
+        updated = len(existing)
+        if dry_run:
+            return len(chunk) - updated, updated
+        
+        # A recorded violation is kept, as when the record is edited by hand
+        status_codes = np.array(
+            [STATUS_CODES[existing.get(case_number, Status.ACTIVE)] for case_number in case_numbers],
+            dtype=np.int8
+        )
+        completion, status, days_remaining = derive_arrays(
+            _day_numbers(chunk['start_date']), chunk['duration_months'].to_numpy(),
+            chunk['reduced_months'].to_numpy(), date.today(), status_codes
+        )
+        derived = pd.DataFrame({
+            'completion_date': [day_to_date(day) for day in completion],
+            'status': [STATUS_BY_CODE[code] for code in status],
+            'days_remaining': days_remaining.tolist()
+        }, index=chunk.index)
+        
+        # Risk of the records this chunk creates (updated records keep theirs)
+        scores = self.offender_service.ai_service.predict_risk_batch(OffenderFrame.from_columns({
+            'case_number': case_numbers,
+            'occupation': chunk['occupation'].tolist(),
+            'address': chunk['address'].tolist(),
+            'gender': chunk['gender'].tolist(),
+            'case_type': chunk['case_type'].tolist(),
+            'status': derived['status'].tolist(),
+            'birth_day': _day_numbers(chunk['birth_date']),
+            'start_day': _day_numbers(chunk['start_date']),
+            'completion_day': completion,
+            'duration_months': chunk['duration_months'].to_numpy(),
+            'reduced_months': chunk['reduced_months'].to_numpy(),
+            'days_remaining': days_remaining
+        }))
+        risk_levels = list(RiskLevel)
+        derived['risk_level'] = [risk_levels[code] for code in scores['risk_level']]
+        derived['risk_percentage'] = scores['risk_percentage']
+        
+        records = chunk.assign(**{name: _to_dates(chunk[name]) for name in IMPORT_DATE_COLUMNS.values()})
+        records = pd.concat([records, derived], axis=1)[list(UPSERT_COLUMNS)]
+        rows = [tuple(row) for row in records.astype(object).itertuples(index=False, name=None)]
+        db_manager.upsert_offenders(rows, commit=False)
+        if should_cancel and should_cancel():
+            db_manager.rollback()
+            raise ImportCancelled()
+        db_manager.commit()
+        
+        return len(rows) - updated, updated
     
-    def export_to_excel(self, offenders: List[Offender], file_path: str) -> bool:
-        """Export offenders to Excel with calculated fields."""
+    def export_to_excel(self, offenders: Iterable[Offender], file_path: str,
+                        progress: Optional[ProgressCallback] = None,
+                        total: Optional[int] = None) -> bool:
+        """Export offenders to Excel with calculated fields.
+
+        Rows are streamed through a write-only workbook, so ``offenders`` may be
+        any iterable (e.g. a database cursor) and memory does not grow with it.
+        """
         try:
-            # Convert offenders to DataFrame
-            data = []
-            for offender in offenders:
-                data.append({
-                    'Số hồ sơ': offender.case_number,
-                    'Họ tên': offender.full_name,
-                    'Giới tính': offender.gender.value if hasattr(offender.gender, 'value') else str(offender.gender),
-                    'Ngày sinh': offender.birth_date.strftime('%d/%m/%Y') if offender.birth_date else '',
-                    'Địa chỉ': offender.address,
-                    'Nghề nghiệp': offender.occupation,
-                    'Tội danh': offender.crime,
-                    'Loại án': offender.case_type.value if hasattr(offender.case_type, 'value') else str(offender.case_type),
-                    'Số bản án': offender.sentence_number,
-                    'Số quyết định': offender.decision_number,
-                    'Ngày bắt đầu': offender.start_date.strftime('%d/%m/%Y') if offender.start_date else '',
-                    'Thời gian (tháng)': offender.duration_months,
-                    'Được giảm (tháng)': offender.reduced_months,
-                    'Ngày được giảm': offender.reduction_date.strftime('%d/%m/%Y') if offender.reduction_date else '',
-                    'Số lần giảm': offender.reduction_count,
-                    'Ngày chấp hành xong': offender.completion_date.strftime('%d/%m/%Y') if offender.completion_date else '',
-                    'Trạng thái': offender.status.value if hasattr(offender.status, 'value') else str(offender.status),
-                    'Số ngày còn lại': offender.days_remaining,
-                    'Mức độ nguy cơ': offender.risk_level.value if hasattr(offender.risk_level, 'value') else str(offender.risk_level),
-                    'Tỷ lệ nguy cơ (%)': f"{offender.risk_percentage:.1f}",
-                    'Ghi chú': offender.notes
-                })
-            
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
-            # Export to Excel
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Đối tượng thi hành án', index=False)
-                
-                # Auto-adjust column widths
-                worksheet = writer.sheets['Đối tượng thi hành án']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-            
+            if total is None and hasattr(offenders, '__len__'):
+                total = len(offenders)
+            count = write_offenders_xlsx(offenders, file_path, progress=progress, total=total)
+            self.offender_service.activity_log.log(
+                ActivityAction.EXPORT, f"Xuất {count} đối tượng ra Excel ({Path(file_path).name})"
+            )
             return True
             
         except Exception as e:
             print(f"Lỗi xuất Excel: {e}")
             return False
     
-    def _convert_row_to_offender_data(self, row: pd.Series) -> Dict[str, Any]:
-        """Convert Excel row to offender data."""
-        # Map Excel columns to offender fields
-        data = {}
-        
-        # Basic information
-        data['case_number'] = str(row.get('Số hồ sơ', '')).strip()
-        data['full_name'] = str(row.get('Họ tên', '')).strip()
-        
-        # Gender
-        gender_str = str(row.get('Giới tính', '')).strip()
-        data['gender'] = Gender.FEMALE if 'nữ' in gender_str.lower() else Gender.MALE
-        
-        # Birth date
-        birth_date = row.get('Ngày sinh')
-        if pd.notna(birth_date):
-            if isinstance(birth_date, str):
-                try:
-                    data['birth_date'] = datetime.strptime(birth_date, '%d/%m/%Y').date()
-                except:
-                    data['birth_date'] = None
-            else:
-                data['birth_date'] = birth_date.date() if hasattr(birth_date, 'date') else None
-        else:
-            data['birth_date'] = None
-        
-        data['address'] = str(row.get('Địa chỉ', '')).strip()
-        data['occupation'] = str(row.get('Nghề nghiệp', '')).strip()
-        data['crime'] = str(row.get('Tội danh', '')).strip()
-        
-        # Case type
-        case_type_str = str(row.get('Loại án', '')).strip()
-        if 'cải tạo' in case_type_str.lower():
-            data['case_type'] = CaseType.PROBATION
-        elif 'công ích' in case_type_str.lower():
-            data['case_type'] = CaseType.COMMUNITY_SERVICE
-        else:
-            data['case_type'] = CaseType.SUSPENDED_SENTENCE
-        
-        # Case information
-        data['sentence_number'] = str(row.get('Số bản án', '')).strip()
-        data['decision_number'] = str(row.get('Số quyết định', '')).strip()
-        
-        # Start date
-        start_date = row.get('Ngày bắt đầu')
-        if pd.notna(start_date):
-            if isinstance(start_date, str):
-                try:
-                    data['start_date'] = datetime.strptime(start_date, '%d/%m/%Y').date()
-                except:
-                    data['start_date'] = None
-            else:
-                data['start_date'] = start_date.date() if hasattr(start_date, 'date') else None
-        else:
-            data['start_date'] = None
-        
-        # Duration and reduction
-        data['duration_months'] = int(row.get('Thời gian (tháng)', 0))
-        data['reduced_months'] = int(row.get('Được giảm (tháng)', 0))
-        
-        # Reduction date
-        reduction_date = row.get('Ngày được giảm')
-        if pd.notna(reduction_date):
-            if isinstance(reduction_date, str):
-                try:
-                    data['reduction_date'] = datetime.strptime(reduction_date, '%d/%m/%Y').date()
-                except:
-                    data['reduction_date'] = None
-            else:
-                data['reduction_date'] = reduction_date.date() if hasattr(reduction_date, 'date') else None
-        else:
-            data['reduction_date'] = None
-        
-        data['reduction_count'] = int(row.get('Số lần giảm', 0))
-        data['notes'] = str(row.get('Ghi chú', '')).strip()
-        
-        return data
+    def export_all_to_excel(self, file_path: str,
+                            progress: Optional[ProgressCallback] = None) -> bool:
+        """Export every offender from one consistent database snapshot."""
+        try:
+            with self.offender_service.read_snapshot() as snapshot:
+                total = snapshot.count_offenders()
+                return self.export_to_excel(
+                    snapshot.iter_offenders(EXPORT_BATCH_SIZE), file_path, progress, total
+                )
+        except Exception as e:
+            print(f"Lỗi đọc dữ liệu xuất Excel: {e}")
+            return False
     
     def create_excel_template(self, file_path: str) -> bool:
         """Create Excel template for data import."""
@@ -0,0 +1,247 @@
+"""
+Export service streaming offender records straight from the database.
+"""
+
+import gzip
+import json
+import textwrap
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for columnar (Parquet/Arrow) exports
+    pa = pq = None
+
+from database.database_manager import DatabaseManager
+from services.activity_service import ActivityAction, get_activity_logger
+from models.offender import CaseType, Gender, RiskLevel, Status
+from models.reduction import ReductionStatus, ReductionType
+from models.violation import ViolationStatus, ViolationType
+
+
+# progress(done, total)
+ProgressCallback = Callable[[int, int], None]
+
+JSON_FORMATS = ('jsonl', 'array')
+
+
+def open_text_output(file_path: str, compress: bool) -> IO[str]:
+    """Open a UTF-8 text file for writing, gzip-compressed if requested."""
+    if compress:
+        return gzip.open(file_path, 'wt', encoding='utf-8', newline='')
+    return open(file_path, 'w', encoding='utf-8', newline='')
+
+
+def write_json_records(records: Iterable[Dict[str, Any]], output: IO[str], fmt: str = 'array',
+                       on_record: Optional[Callable[[int], None]] = None) -> int:
+    """Write records one at a time as a JSON array (indented) or as JSON Lines."""
+    if fmt not in JSON_FORMATS:
+        raise ValueError(f"Unknown JSON format: {fmt}")
+    count = 0
+    if fmt == 'array':
+        output.write('[')
+    for record in records:
+        if fmt == 'jsonl':
+            output.write(json.dumps(record, ensure_ascii=False, default=str))
+            output.write('\n')
+        else:
+            output.write(',\n' if count else '\n')
+            output.write(textwrap.indent(
+                json.dumps(record, ensure_ascii=False, indent=2, default=str), '  '
+            ))
+        count += 1
+        if on_record:
+            on_record(count)
+    if fmt == 'array':
+        output.write('\n]\n' if count else ']\n')
+    return count
+
+
+def detect_json_options(file_path: str) -> Dict[str, Any]:
+    """Infer format and compression from a file name (.json, .jsonl, .ndjson, optionally .gz)."""
+    suffixes = [suffix.lower() for suffix in Path(file_path).suffixes]
+    compress = bool(suffixes) and suffixes[-1] == '.gz'
+    if compress:
+        suffixes = suffixes[:-1]
+    fmt = 'jsonl' if suffixes and suffixes[-1] in ('.jsonl', '.ndjson') else 'array'
+    return {'fmt': fmt, 'compress': compress}
+
+
+# Column types of the columnar export: 'int32', 'int64', 'float64', 'string',
+# 'date', 'timestamp', or an Enum class (categorical with the Enum's values)
+ColumnType = Union[str, type]
+
+COLUMNAR_TABLES: Dict[str, List[Tuple[str, ColumnType]]] = {
+    'offenders': [
+        ('id', 'int64'), ('case_number', 'string'), ('full_name', 'string'), ('gender', Gender),
+        ('birth_date', 'date'), ('address', 'string'), ('ward', 'string'), ('occupation', 'string'),
+        ('crime', 'string'), ('case_type', CaseType), ('sentence_number', 'string'),
+        ('decision_number', 'string'), ('start_date', 'date'), ('duration_months', 'int32'),
+        ('reduced_months', 'int32'), ('reduction_date', 'date'), ('reduction_count', 'int32'),
+        ('completion_date', 'date'), ('status', Status), ('days_remaining', 'int32'),
+        ('risk_level', RiskLevel), ('risk_percentage', 'float64'), ('created_at', 'timestamp'),
+        ('updated_at', 'timestamp'), ('created_by', 'int64'), ('notes', 'string'),
+        ('row_version', 'int32')
+    ],
+    'violations': [
+        ('id', 'int64'), ('offender_id', 'int64'), ('violation_type', ViolationType),
+        ('description', 'string'), ('location', 'string'), ('violation_date', 'date'),
+        ('report_date', 'date'), ('penalty', 'string'), ('additional_months', 'int32'),
+        ('warning_level', 'int32'), ('status', ViolationStatus), ('resolution_notes', 'string'),
+        ('resolved_by', 'int64'), ('resolved_date', 'date'), ('created_at', 'timestamp'),
+        ('updated_at', 'timestamp'), ('created_by', 'int64')
+    ],
+    'reductions': [
+        ('id', 'int64'), ('offender_id', 'int64'), ('reduction_type', ReductionType),
+        ('months_reduced', 'int32'), ('reason', 'string'), ('evidence', 'string'),
+        ('application_date', 'date'), ('decision_date', 'date'), ('effective_date', 'date'),
+        ('status', ReductionStatus), ('decision_notes', 'string'), ('decided_by', 'int64'),
+        ('created_at', 'timestamp'), ('updated_at', 'timestamp'), ('created_by', 'int64')
+    ]
+}
+
+# File suffix per columnar format
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _require_pyarrow():
+    """Raise a clear error when the optional pyarrow dependency is missing."""
+    if pa is None:
+        raise RuntimeError("Xuất Parquet/Arrow cần thư viện pyarrow (pip install pyarrow)")
+
+
+def _arrow_type(column_type: ColumnType):
+    """Arrow type for a COLUMNAR_TABLES column type."""
+    if isinstance(column_type, type) and issubclass(column_type, Enum):
+        return pa.dictionary(pa.int8(), pa.string())
+    return {
+        'int32': pa.int32(), 'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string(),
+        'date': pa.date32(), 'timestamp': pa.timestamp('us')
+    }[column_type]
+
+
+def columnar_schema(table: str):
+    """Arrow schema of an exported table."""
+    _require_pyarrow()
+    return pa.schema([(name, _arrow_type(column_type)) for name, column_type in COLUMNAR_TABLES[table]])
+
+
+def _arrow_column(values: List[Any], column_type: ColumnType):
+    """Build one Arrow column from the values of a batch of rows."""
+    if isinstance(column_type, type) and issubclass(column_type, Enum):
+        # Fixed dictionary (the Enum's values) so codes mean the same in every batch
+        members = list(column_type)
+        codes = {member.value: code for code, member in enumerate(members)}
+        codes.update({member: code for code, member in enumerate(members)})
+        return pa.DictionaryArray.from_arrays(
+            pa.array([codes.get(value) for value in values], type=pa.int8()),
+            pa.array([member.value for member in members], type=pa.string())
+        )
+    if column_type == 'date':
+        values = [value if isinstance(value, date) and not isinstance(value, datetime) else None
+                  for value in values]
+    elif column_type == 'timestamp':
+        values = [value if isinstance(value, datetime) else None for value in values]
+    elif column_type == 'string':
+        values = [None if value is None else str(value) for value in values]
+    return pa.array(values, type=_arrow_type(column_type))
+
+
+def rows_to_record_batch(table: str, rows: Sequence[Sequence[Any]]):
+    """Convert database rows (in COLUMNAR_TABLES column order) to an Arrow record batch."""
+    columns = COLUMNAR_TABLES[table]
+    arrays = [
+        _arrow_column([row[index] for row in rows], column_type)
+        for index, (_, column_type) in enumerate(columns)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=columnar_schema(table))
+
+
+class ExportService:
+    """Service for exports that stream rows from a database cursor."""
+
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 1000):
+        """Initialize service with database manager."""
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.activity_log = get_activity_logger(db_manager)
+
+    def export_json(self, file_path: str, fmt: Optional[str] = None,
+                    compress: Optional[bool] = None,
+                    progress: Optional[ProgressCallback] = None) -> int:
+        """Export all offenders to JSON without holding them in memory.
+
+        ``fmt`` is ``'array'`` or ``'jsonl'`` and ``compress`` enables gzip; both
+        default to what the file name suggests. Rows are read from one snapshot
+        in batches and ``progress(done, total)`` is called after each batch.
+        Returns the number of records written.
+        """
+        options = detect_json_options(file_path)
+        fmt = fmt or options['fmt']
+        compress = options['compress'] if compress is None else compress
+
+        with self.db_manager.read_snapshot() as snapshot:
+            total = snapshot.count_offenders()
+            if progress:
+                progress(0, total)
+
+            def on_record(done: int):
+                if progress and (done % self.batch_size == 0 or done == total):
+                    progress(done, total)
+
+            records = (o.to_dict() for o in snapshot.iter_offenders(self.batch_size))
+            with open_text_output(file_path, compress) as output:
+                count = write_json_records(records, output, fmt, on_record)
+        self.activity_log.log(ActivityAction.EXPORT, f"Xuất {count} đối tượng ra JSON ({Path(file_path).name})")
+        return count
+
+    def export_columnar(self, output_dir: str, fmt: str = 'parquet',
+                        tables: Sequence[str] = tuple(COLUMNAR_TABLES),
+                        progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        """Export tables as typed columnar files (Parquet or Arrow IPC) for analytics tools.
+
+        Writes one ``<table>.parquet`` / ``<table>.arrow`` file per table in
+        ``output_dir``, batch by batch from one database snapshot. Dates are
+        date32, timestamps microsecond timestamps and enum columns categoricals.
+        Requires pyarrow. Returns the number of rows written per table.
+        """
+        _require_pyarrow()
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+
+        counts: Dict[str, int] = {}
+        with self.db_manager.read_snapshot() as snapshot:
+            totals = {table: snapshot.count_rows(table) for table in tables}
+            total = sum(totals.values())
+            done = 0
+            if progress:
+                progress(0, total)
+            for table in tables:
+                schema = columnar_schema(table)
+                columns = ", ".join(name for name, _ in COLUMNAR_TABLES[table])
+                path = output / f"{table}{COLUMNAR_FORMATS[fmt]}"
+                if fmt == 'parquet':
+                    writer = pq.ParquetWriter(str(path), schema, compression='zstd')
+                else:
+                    writer = pa.ipc.new_file(str(path), schema,
+                                             options=pa.ipc.IpcWriteOptions(compression='zstd'))
+                counts[table] = 0
+                with writer:
+                    batches = snapshot.iter_row_batches(
+                        f"SELECT {columns} FROM {table} ORDER BY id", batch_size=self.batch_size
+                    )
+                    for rows in batches:
+                        writer.write_batch(rows_to_record_batch(table, rows))
+                        counts[table] += len(rows)
+                        done += len(rows)
+                        if progress:
+                            progress(done, total)
+        summary = ", ".join(f"{table}: {count}" for table, count in counts.items())
+        self.activity_log.log(ActivityAction.EXPORT, f"Xuất dữ liệu {fmt} ({summary})")
+        return counts
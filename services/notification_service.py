@@ -0,0 +1,87 @@
+"""
+Background scanner for the dashboard's expiry and notification cohorts.
+
+The scanner recounts the cohorts (expiring, overdue, reduction-eligible and the
+status/risk totals) on its own thread and snapshot connection, keeps the latest
+counts for instant display and reports only the counts that changed.
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, Optional
+
+from database.database_manager import DatabaseManager
+
+
+# How often cohorts are recounted when nothing requests a scan
+NOTIFICATION_SCAN_INTERVAL = 5 * 60
+
+# Horizon of the "expiring" cohort, in days
+EXPIRING_DAYS = 30
+
+
+class NotificationScanner:
+    """Recounts dashboard cohorts on a schedule and reports changes through on_change."""
+
+    def __init__(self, db_manager: DatabaseManager,
+                 interval_seconds: float = NOTIFICATION_SCAN_INTERVAL,
+                 expiring_days: int = EXPIRING_DAYS,
+                 on_change: Optional[Callable[[Dict[str, int]], None]] = None):
+        """Initialize scanner; on_change is called from the scanner thread."""
+        self.db_manager = db_manager.clone()
+        self.interval_seconds = interval_seconds
+        self.expiring_days = expiring_days
+        self.on_change = on_change
+        # Latest counts by cohort name; empty until the first scan finishes
+        self.snapshot: Dict[str, int] = {}
+        self.last_scan: Optional[datetime] = None
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def scan(self) -> Dict[str, int]:
+        """Recount on the calling thread; returns (and reports) the counts that changed."""
+        with self.db_manager.read_snapshot() as reader:
+            counts = reader.count_offender_cohorts(date.today(), self.expiring_days)
+        changed = {name: count for name, count in counts.items() if self.snapshot.get(name) != count}
+        self.snapshot = counts
+        self.last_scan = datetime.now()
+        if changed and self.on_change:
+            try:
+                self.on_change(changed)
+            except Exception as e:
+                print(f"Error handling notification counts: {e}")
+        return changed
+
+    def request_scan(self):
+        """Ask the background thread to scan now (e.g. after data was edited)."""
+        self._wake_event.set()
+
+    def start(self):
+        """Start the background thread; the first scan runs immediately."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._wake_event.set()
+        self._thread = threading.Thread(target=self._loop, name="notification-scanner", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the background thread."""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        """Background loop: scan when woken or when the interval elapses."""
+        while True:
+            self._wake_event.wait(self.interval_seconds)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                return
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"Error scanning notifications: {e}")
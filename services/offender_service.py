@@ -2,22 +2,48 @@
 Offender service for business logic.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
+
+import numpy as np
+import pandas as pd
 
 from database.database_manager import DatabaseManager
 from models.offender import Offender, Status, RiskLevel
+from models.derivation import apply_derivation
+from models.offender_frame import OffenderFrame
+from models.compact import to_compact
 from models.violation import Violation
 from models.reduction import Reduction
+from services.activity_service import ActivityAction, ActivityLogger, get_activity_logger
+from services.ai_service import AIService
+
+
+# Validation rules shared by single-record and bulk (column-wise) validation
+MIN_DURATION_MONTHS = 1
+MAX_DURATION_MONTHS = 60
+MSG_CASE_NUMBER_REQUIRED = "Số hồ sơ không được để trống"
+MSG_FULL_NAME_REQUIRED = "Họ tên không được để trống"
+MSG_BIRTH_DATE_IN_FUTURE = "Ngày sinh không thể lớn hơn ngày hiện tại"
+MSG_START_BEFORE_BIRTH = "Ngày bắt đầu không thể trước ngày sinh"
+MSG_DURATION_RANGE = f"Thời gian thử thách phải từ {MIN_DURATION_MONTHS}-{MAX_DURATION_MONTHS} tháng"
+
+
+def append_row_errors(errors: pd.Series, failed, message: str):
+    """Add ``message`` to the error text of every row where ``failed`` is True (in place)."""
+    failed = np.asarray(failed, dtype=bool)
+    current = errors[failed]
+    errors[failed] = np.where(current == '', message, current + '; ' + message)
 
 
 class OffenderService:
     """Service for offender business logic."""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, activity_log: Optional[ActivityLogger] = None):
         """Initialize service with database manager."""
         self.db_manager = db_manager
+        self.ai_service = AIService()
+        self.activity_log = activity_log or get_activity_logger(db_manager)
     
     def create_offender(self, offender_data: Dict[str, Any]) -> Offender:
         """Create new offender with validation and calculations."""
@@ -33,6 +59,8 @@ class OffenderService:
         # Save to database
         offender_id = self.db_manager.create_offender(offender)
         offender.id = offender_id
+        self.activity_log.log(ActivityAction.CREATE, f"Thêm đối tượng {offender.full_name}",
+                              'offender', offender_id)
         
         return offender
     
@@ -65,11 +93,44 @@ class OffenderService:
         self._calculate_offender_fields(offender)
 
         # Update in database
-        return self.db_manager.update_offender(offender)
+        success = self.db_manager.update_offender(offender)
+        if success:
+            self.activity_log.log(ActivityAction.UPDATE, f"Cập nhật đối tượng {offender.full_name}",
+                                  'offender', offender_id)
+        return success
+    
+    def merge_offender_changes(self, base: Offender, changes: Dict[str, Any],
+                               current: Offender) -> Tuple[Dict[str, Any], List[str]]:
+        """Three-way merge of a user's edits onto a record someone else has updated.
+        
+        ``base`` is the record as the user loaded it, ``changes`` the edited
+        form data and ``current`` the record now stored. Returns the fields to
+        save (stamped with the current row_version) and the names of fields both
+        sides changed to different values.
+        """
+        merged: Dict[str, Any] = {}
+        conflicts: List[str] = []
+        for key, value in changes.items():
+            if key == 'row_version' or not hasattr(current, key):
+                continue
+            base_value = getattr(base, key, None)
+            if value == base_value:
+                # Not edited by this user: keep the other user's value
+                continue
+            current_value = getattr(current, key)
+            if current_value != base_value and current_value != value:
+                conflicts.append(key)
+            merged[key] = value
+        merged['row_version'] = current.row_version
+        return merged, conflicts
     
     def delete_offender(self, offender_id: int) -> bool:
         """Delete offender."""
-        return self.db_manager.delete_offender(offender_id)
+        success = self.db_manager.delete_offender(offender_id)
+        if success:
+            self.activity_log.log(ActivityAction.DELETE, f"Xóa đối tượng #{offender_id}",
+                                  'offender', offender_id)
+        return success
     
     def get_offender(self, offender_id: int) -> Optional[Offender]:
         """Get offender by ID."""
@@ -79,6 +140,39 @@ class OffenderService:
         """Get all offenders."""
         return self.db_manager.get_all_offenders()
     
+    def get_compact_offenders(self, frozen: bool = True) -> list:
+        """Get all offenders as slotted records (FrozenOffender by default) for long-lived UI lists."""
+        return [to_compact(offender, frozen) for offender in self.db_manager.iter_offenders()]
+    
+    def get_offenders_frame(self) -> OffenderFrame:
+        """Get all offenders as columnar arrays for analytics."""
+        return self.db_manager.get_offenders_frame()
+    
+    def read_snapshot(self):
+        """Context manager yielding a read-only, snapshot-consistent database reader.
+        
+        Use it for long reports and exports so they neither block nor observe
+        concurrent edits.
+        """
+        return self.db_manager.read_snapshot()
+    
+    def get_offenders_page(self, page: int = 1, page_size: int = 50,
+                           status: Optional[str] = None,
+                           search_term: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of offenders with pagination metadata."""
+        page = max(1, page)
+        page_size = max(1, page_size)
+        offenders, total = self.db_manager.get_offenders_page(
+            (page - 1) * page_size, page_size, status, search_term
+        )
+        return {
+            'items': offenders,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'total_pages': (total + page_size - 1) // page_size
+        }
+    
     def search_offenders(self, search_term: str) -> List[Offender]:
         """Search offenders."""
         return self.db_manager.search_offenders(search_term)
@@ -87,19 +181,30 @@ class OffenderService:
         """Get offenders by status."""
         return self.db_manager.get_offenders_by_status(status)
     
+    EXPIRY_BUCKETS = {
+        'today': 0,
+        '7_days': 7,
+        '30_days': 30,
+        '90_days': 90
+    }
+    
     def get_expiring_offenders(self, days: int = 5) -> List[Offender]:
         """Get offenders expiring within specified days."""
-        offenders = self.get_all_offenders()
+        return self.get_expiry_window(0, days)
+    
+    def get_expiry_window(self, start_days: int = 0, end_days: int = 30) -> List[Offender]:
+        """Get offenders whose completion date is between today+start_days and today+end_days."""
         today = date.today()
-        expiring = []
-        
-        for offender in offenders:
-            if offender.completion_date:
-                days_until = (offender.completion_date - today).days
-                if 0 <= days_until <= days:
-                    expiring.append(offender)
-        
-        return expiring
+        return self.db_manager.get_offenders_by_completion_range(
+            today + timedelta(days=start_days), today + timedelta(days=end_days)
+        )
+    
+    def get_expiry_bucket_counts(self) -> Dict[str, int]:
+        """Count offenders expiring today and within 7, 30 and 90 days."""
+        counts = self.db_manager.count_offenders_by_completion_buckets(
+            date.today(), list(self.EXPIRY_BUCKETS.values())
+        )
+        return dict(zip(self.EXPIRY_BUCKETS.keys(), counts))
     
     def get_completed_offenders(self) -> List[Offender]:
         """Get offenders who have completed their sentence."""
@@ -113,52 +218,26 @@ class OffenderService:
         """Get offenders with violations."""
         return self.get_offenders_by_status(Status.VIOLATION.value)
     
-    def calculate_risk_assessment(self, offender: Offender) -> Dict[str, Any]:
-        """Calculate risk assessment for offender."""
-        risk_factors = []
-        risk_score = 0.0
-        
-        # Age factor
-        if offender.birth_date:
-            age = (date.today() - offender.birth_date).days / 365.25
-            if age < 25:
-                risk_factors.append("Tuổi trẻ")
-                risk_score += 0.25
-            elif age > 50:
-                risk_factors.append("Tuổi cao")
-                risk_score -= 0.1
-        
-        # Employment factor
-        if not offender.occupation or offender.occupation.lower() in ['thất nghiệp', 'nông dân']:
-            risk_factors.append("Thất nghiệp")
-            risk_score += 0.2
-        
-        # Time remaining factor
-        if offender.days_remaining < 30:
-            risk_factors.append("Sắp hết hạn")
-            risk_score += 0.15
-        
-        # Previous violations factor
-        # This would require querying violations table
-        # For now, we'll use a placeholder
-        
-        # Normalize risk score
-        risk_score = min(1.0, max(0.0, risk_score))
-        
-        # Determine risk level
-        if risk_score < 0.3:
-            risk_level = RiskLevel.LOW
-        elif risk_score < 0.7:
-            risk_level = RiskLevel.MEDIUM
-        else:
-            risk_level = RiskLevel.HIGH
-        
-        return {
-            'risk_score': risk_score,
-            'risk_level': risk_level,
-            'risk_factors': risk_factors,
-            'risk_percentage': risk_score * 100
-        }
+    def calculate_risk_assessment(self, offender: Offender, violation_count: int = 0) -> Dict[str, Any]:
+        """Calculate risk assessment for offender (same rules as the batch re-scoring)."""
+        return self.ai_service.predict_risk(offender, violation_count)
+    
+    def rescore_all_risks(self) -> int:
+        """Re-score the whole caseload in one vectorized pass; returns the number of records changed."""
+        frame = self.get_offenders_frame()
+        if not len(frame):
+            return 0
+        scores = self.ai_service.predict_risk_batch(frame)
+        changed = ((scores['risk_level'] != frame.risk_level) |
+                   ~np.isclose(scores['risk_percentage'], frame.risk_percentage))
+        risk_levels = list(RiskLevel)
+        updates = [
+            (risk_levels[level].value, float(percentage), int(offender_id))
+            for offender_id, level, percentage in zip(
+                scores['id'][changed], scores['risk_level'][changed], scores['risk_percentage'][changed]
+            )
+        ]
+        return self.db_manager.update_risk_scores(updates)
     
     def apply_sentence_reduction(self, offender_id: int, months: int, reason: str) -> bool:
         """Apply sentence reduction to offender."""
@@ -179,7 +258,12 @@ class OffenderService:
         self._calculate_offender_fields(offender)
         
         # Update in database
-        return self.db_manager.update_offender(offender)
+        success = self.db_manager.update_offender(offender)
+        if success:
+            self.activity_log.log(ActivityAction.REDUCTION,
+                                  f"Giảm {months} tháng cho đối tượng {offender.full_name}: {reason}",
+                                  'offender', offender_id)
+        return success
     
     def _validate_offender(self, offender: Offender):
         """Validate offender data."""
@@ -187,56 +271,56 @@ class OffenderService:
         
         # Required fields
         if not offender.case_number:
-            errors.append("Số hồ sơ không được để trống")
+            errors.append(MSG_CASE_NUMBER_REQUIRED)
         
         if not offender.full_name:
-            errors.append("Họ tên không được để trống")
+            errors.append(MSG_FULL_NAME_REQUIRED)
         
         # Date validations
         if offender.birth_date and offender.birth_date > date.today():
-            errors.append("Ngày sinh không thể lớn hơn ngày hiện tại")
+            errors.append(MSG_BIRTH_DATE_IN_FUTURE)
         
         if offender.start_date and offender.birth_date:
             if offender.start_date < offender.birth_date:
-                errors.append("Ngày bắt đầu không thể trước ngày sinh")
+                errors.append(MSG_START_BEFORE_BIRTH)
         
         # Duration validation
-        if offender.duration_months < 1 or offender.duration_months > 60:
-            errors.append("Thời gian thử thách phải từ 1-60 tháng")
+        if offender.duration_months < MIN_DURATION_MONTHS or offender.duration_months > MAX_DURATION_MONTHS:
+            errors.append(MSG_DURATION_RANGE)
         
         if errors:
             raise ValueError("; ".join(errors))
     
+    @staticmethod
+    def validate_offender_columns(frame: pd.DataFrame) -> pd.Series:
+        """Column-wise version of _validate_offender for bulk imports.
+        
+        ``frame`` has one row per record with Offender field names as columns
+        (dates as datetime64, missing as NaT). Returns each row's error message,
+        joined with "; " as _validate_offender does, or "" for valid rows.
+        """
+        today = pd.Timestamp(date.today())
+        checks = [
+            (frame['case_number'].eq(''), MSG_CASE_NUMBER_REQUIRED),
+            (frame['full_name'].eq(''), MSG_FULL_NAME_REQUIRED),
+            (frame['birth_date'] > today, MSG_BIRTH_DATE_IN_FUTURE),
+            (frame['start_date'] < frame['birth_date'], MSG_START_BEFORE_BIRTH),
+            (~frame['duration_months'].between(MIN_DURATION_MONTHS, MAX_DURATION_MONTHS),
+             MSG_DURATION_RANGE)
+        ]
+        errors = pd.Series('', index=frame.index, dtype=object)
+        for failed, message in checks:
+            append_row_errors(errors, failed, message)
+        return errors
+    
     def _calculate_offender_fields(self, offender: Offender):
         """Calculate derived fields for offender."""
-        # Calculate completion date
-        if offender.start_date and offender.duration_months > 0:
-            base_completion = offender.start_date + relativedelta(months=offender.duration_months)
-            if offender.reduced_months > 0:
-                offender.completion_date = base_completion - relativedelta(months=offender.reduced_months)
-            else:
-                offender.completion_date = base_completion
-        
-        # Calculate status
-        if offender.completion_date:
-            today = date.today()
-            days_until = (offender.completion_date - today).days
-            
-            if days_until <= 0:
-                offender.status = Status.COMPLETED
-            elif days_until <= 30:
-                offender.status = Status.EXPIRING_SOON
-            else:
-                offender.status = Status.ACTIVE
-        
-        # Calculate days remaining
-        if offender.completion_date:
-            today = date.today()
-            days = (offender.completion_date - today).days
-            offender.days_remaining = max(0, days)
+        # Completion date, status and days remaining
+        apply_derivation(offender)
         
         # Calculate risk assessment
-        risk_data = self.calculate_risk_assessment(offender)
+        violation_count = self.db_manager.count_violations(offender.id) if offender.id else 0
+        risk_data = self.calculate_risk_assessment(offender, violation_count)
         offender.risk_level = risk_data['risk_level']
         offender.risk_percentage = risk_data['risk_percentage']
         
@@ -245,29 +329,39 @@ class OffenderService:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get system statistics."""
-        offenders = self.get_all_offenders()
+        frame = self.get_offenders_frame()
+        status_counts = frame.counts('status')
+        risk_counts = frame.counts('risk_level')
         
         stats = {
-            'total_offenders': len(offenders),
-            'active_offenders': len([o for o in offenders if o.status == Status.ACTIVE]),
-            'completed_offenders': len([o for o in offenders if o.status == Status.COMPLETED]),
-            'violation_offenders': len([o for o in offenders if o.status == Status.VIOLATION]),
-            'expiring_soon': len([o for o in offenders if o.status == Status.EXPIRING_SOON]),
-            'high_risk': len([o for o in offenders if o.risk_level == RiskLevel.HIGH]),
-            'medium_risk': len([o for o in offenders if o.risk_level == RiskLevel.MEDIUM]),
-            'low_risk': len([o for o in offenders if o.risk_level == RiskLevel.LOW])
+            'total_offenders': len(frame),
+            'active_offenders': status_counts[Status.ACTIVE],
+            'completed_offenders': status_counts[Status.COMPLETED],
+            'violation_offenders': status_counts[Status.VIOLATION],
+            'expiring_soon': status_counts[Status.EXPIRING_SOON],
+            'high_risk': risk_counts[RiskLevel.HIGH],
+            'medium_risk': risk_counts[RiskLevel.MEDIUM],
+            'low_risk': risk_counts[RiskLevel.LOW]
         }
         
         return stats 
 
     def get_total_count(self) -> int:
         """Trả về tổng số đối tượng."""
-        return len(self.get_all_offenders())
+        return self.db_manager.count_offenders()
 
-    def get_count_by_status(self, status: str) -> int:
+    def get_count_by_status(self, status) -> int:
         """Trả về số đối tượng theo trạng thái (status)."""
-        return len(self.get_offenders_by_status(status)) 
+        if not isinstance(status, Status):
+            status = Status(status)
+        return self.db_manager.count_offenders_by_status(status)
+
+    def get_cohort_counts(self, expiring_days: int = 30) -> Dict[str, int]:
+        """Dashboard cohort counts (see DatabaseManager.count_offender_cohorts)."""
+        return self.db_manager.count_offender_cohorts(date.today(), expiring_days)
 
-    def get_count_by_risk_level(self, risk_level: str) -> int:
+    def get_count_by_risk_level(self, risk_level) -> int:
         """Trả về số đối tượng theo mức độ nguy cơ (risk_level)."""
-        return len([o for o in self.get_all_offenders() if (o.risk_level.value if hasattr(o.risk_level, 'value') else str(o.risk_level)) == risk_level]) 
\ No newline at end of file
+        if not isinstance(risk_level, RiskLevel):
+            risk_level = RiskLevel(risk_level)
+        return self.db_manager.count_offenders_by_risk_level(risk_level) 
\ No newline at end of file
@@ -0,0 +1,430 @@
+"""
+Word to PDF conversion through pluggable backends.
+
+``LibreOfficeBackend`` keeps one headless LibreOffice process running and
+converts every document through it over UNO, so the office suite starts once
+per session rather than once per file. Without the ``uno`` bindings it falls
+back to converting each batch with a single ``soffice --convert-to`` call.
+``Docx2PdfBackend`` drives Microsoft Word through docx2pdf (Windows/macOS).
+
+``PdfConversionQueue`` collects conversion requests on a worker thread and
+hands them to the backend in batches.
+
+The backend is chosen with the OFFENDER_PDF_BACKEND environment variable
+('libreoffice' or 'docx2pdf'); by default LibreOffice is used when installed.
+"""
+
+import abc
+import atexit
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.export_service import ProgressCallback
+
+try:
+    import uno
+except ImportError:
+    uno = None
+
+
+# (word_path, pdf_path)
+ConversionJob = Tuple[str, str]
+
+PDF_BACKEND_ENV = "OFFENDER_PDF_BACKEND"
+
+# Where LibreOffice installs soffice when it is not on PATH
+SOFFICE_CANDIDATES = (
+    "soffice",
+    "libreoffice",
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+)
+
+# Files per soffice --convert-to call / per queue batch
+PDF_BATCH_SIZE = 20
+
+# Seconds to wait for a started LibreOffice to accept UNO connections
+OFFICE_START_TIMEOUT = 30
+
+# Seconds one soffice --convert-to call or UNO conversion may take before the office is killed
+SOFFICE_CALL_TIMEOUT = 300
+
+
+class PdfBackend(abc.ABC):
+    """Converts .docx files to PDF; subclasses implement available and convert_batch."""
+
+    name = ""
+
+    @abc.abstractmethod
+    def available(self) -> bool:
+        """Whether this backend can run on this machine."""
+
+    @abc.abstractmethod
+    def convert_batch(self, jobs: Sequence[ConversionJob]) -> List[Optional[str]]:
+        """Convert jobs; returns one error message (None on success) per job."""
+
+    def convert(self, word_path: str, pdf_path: str) -> bool:
+        """Convert a single file."""
+        error = self.convert_batch([(word_path, pdf_path)])[0]
+        if error:
+            print(f"Lỗi chuyển Word sang PDF: {error}")
+        return error is None
+
+    def close(self):
+        """Release any process held by the backend."""
+
+
+def find_soffice() -> Optional[str]:
+    """Path of the LibreOffice executable, or None."""
+    for candidate in SOFFICE_CANDIDATES:
+        found = shutil.which(candidate)
+        if found:
+            return found
+    return None
+
+
+class LibreOfficeBackend(PdfBackend):
+    """Headless LibreOffice: one persistent process over UNO, or batched CLI calls."""
+
+    name = "libreoffice"
+
+    def __init__(self, soffice: Optional[str] = None, batch_size: int = PDF_BATCH_SIZE,
+                 timeout: float = SOFFICE_CALL_TIMEOUT):
+        """Initialize backend; the office process starts on first use."""
+        self.soffice = soffice or find_soffice()
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.profile_dir: Optional[str] = None
+        self._process = None
+        self._desktop = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether soffice was found."""
+        return self.soffice is not None
+
+    def _profile_arg(self) -> str:
+        """A private profile, so a LibreOffice the user has open is never touched."""
+        if self.profile_dir is None:
+            self.profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        return "-env:UserInstallation=" + Path(self.profile_dir).as_uri()
+
+    def _timeout_error(self) -> str:
+        """Error reported for a conversion that ran past self.timeout."""
+        return f"LibreOffice không phản hồi sau {self.timeout:g} giây"
+
+    def _reset_profile(self):
+        """Use a fresh profile next time (a killed office may leave this one locked)."""
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def _start_office(self):
+        """Start the persistent office process and connect to it over UNO."""
+        pipe_name = f"offender_pdf_{os.getpid()}"
+        self._process = subprocess.Popen(
+            [self.soffice, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+             self._profile_arg(), f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        deadline = time.monotonic() + OFFICE_START_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except Exception:
+                if time.monotonic() > deadline or self._process.poll() is not None:
+                    self.close()
+                    raise RuntimeError("Không khởi động được LibreOffice")
+                time.sleep(0.25)
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+
+    @staticmethod
+    def _properties(**values):
+        from com.sun.star.beans import PropertyValue
+        properties = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name, prop.Value = name, value
+            properties.append(prop)
+        return tuple(properties)
+
+    def _convert_uno(self, word_path: str, pdf_path: str):
+        """Convert one file in the running office process."""
+        document = self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(Path(word_path).resolve())), "_blank", 0,
+            self._properties(Hidden=True, ReadOnly=True)
+        )
+        try:
+            Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(Path(pdf_path).resolve())),
+                self._properties(FilterName="writer_pdf_Export")
+            )
+        finally:
+            document.close(True)
+
+    def _convert_uno_with_deadline(self, word_path: str, pdf_path: str) -> Optional[str]:
+        """Convert one file over UNO; past self.timeout the office is killed and restarted on next use."""
+        timed_out = threading.Event()
+        process = self._process
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        watchdog = threading.Timer(self.timeout, kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            self._convert_uno(word_path, pdf_path)
+            return None
+        except Exception:
+            # Killing the office makes the blocked UNO call fail
+            if not timed_out.is_set():
+                raise
+            return self._timeout_error()
+        finally:
+            watchdog.cancel()
+            if timed_out.is_set():
+                self._desktop = None
+                process.wait()
+                self._process = None
+                self._reset_profile()
+
+    def _convert_cli(self, jobs: Sequence[ConversionJob]) -> List[Optional[str]]:
+        """Convert a batch with one soffice process (inputs renamed so names never clash)."""
+        errors: List[Optional[str]] = [None] * len(jobs)
+        for start in range(0, len(jobs), self.batch_size):
+            batch = jobs[start:start + self.batch_size]
+            with tempfile.TemporaryDirectory() as tmp:
+                inputs = []
+                for i, (word_path, _) in enumerate(batch):
+                    source = Path(tmp) / f"{i}.docx"
+                    try:
+                        shutil.copyfile(word_path, source)
+                        inputs.append(str(source))
+                    except OSError as e:
+                        errors[start + i] = str(e)
+                failure = "LibreOffice không tạo được PDF"
+                if inputs:
+                    try:
+                        completed = subprocess.run(
+                            [self.soffice, "--headless", "--norestore", self._profile_arg(),
+                             "--convert-to", "pdf", "--outdir", tmp, *inputs],
+                            capture_output=True, text=True, timeout=self.timeout
+                        )
+                        failure = (completed.stderr or "").strip() or failure
+                    except subprocess.TimeoutExpired:
+                        failure = self._timeout_error()
+                        self._reset_profile()
+                for i, (_, pdf_path) in enumerate(batch):
+                    if errors[start + i]:
+                        continue
+                    produced = Path(tmp) / f"{i}.pdf"
+                    if produced.exists():
+                        Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+                        shutil.move(str(produced), pdf_path)
+                    else:
+                        errors[start + i] = failure
+        return errors
+
+    def convert_batch(self, jobs: Sequence[ConversionJob]) -> List[Optional[str]]:
+        """Convert jobs through the persistent office process (or batched CLI calls)."""
+        if not self.available():
+            return ["Không tìm thấy LibreOffice (soffice)"] * len(jobs)
+        with self._lock:
+            if uno is None:
+                return self._convert_cli(jobs)
+            errors: List[Optional[str]] = []
+            for word_path, pdf_path in jobs:
+                try:
+                    if self._desktop is None or self._process.poll() is not None:
+                        self._start_office()
+                    errors.append(self._convert_uno_with_deadline(word_path, pdf_path))
+                except Exception as e:
+                    errors.append(str(e))
+            return errors
+
+    def close(self):
+        """Terminate the office process and remove its profile."""
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+        self._reset_profile()
+
+
+class Docx2PdfBackend(PdfBackend):
+    """Microsoft Word through docx2pdf; Word stays open for the whole batch."""
+
+    name = "docx2pdf"
+
+    def available(self) -> bool:
+        """Whether docx2pdf is installed."""
+        try:
+            import docx2pdf  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def convert_batch(self, jobs: Sequence[ConversionJob]) -> List[Optional[str]]:
+        """Convert a folder of copies in one docx2pdf call (one Word session)."""
+        try:
+            from docx2pdf import convert
+        except ImportError:
+            return ["Chưa cài đặt docx2pdf"] * len(jobs)
+        errors: List[Optional[str]] = [None] * len(jobs)
+        with tempfile.TemporaryDirectory() as tmp:
+            source_dir = Path(tmp) / "in"
+            target_dir = Path(tmp) / "out"
+            source_dir.mkdir()
+            target_dir.mkdir()
+            for i, (word_path, _) in enumerate(jobs):
+                try:
+                    shutil.copyfile(word_path, source_dir / f"{i}.docx")
+                except OSError as e:
+                    errors[i] = str(e)
+            if all(errors):
+                return errors
+            try:
+                convert(str(source_dir), str(target_dir))
+            except Exception as e:
+                return [error or str(e) for error in errors]
+            for i, (_, pdf_path) in enumerate(jobs):
+                if errors[i]:
+                    continue
+                produced = target_dir / f"{i}.pdf"
+                if produced.exists():
+                    Path(pdf_path).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.move(str(produced), pdf_path)
+                else:
+                    errors[i] = "Word không tạo được PDF"
+        return errors
+
+
+PDF_BACKENDS: Dict[str, Callable[[], PdfBackend]] = {
+    LibreOfficeBackend.name: LibreOfficeBackend,
+    Docx2PdfBackend.name: Docx2PdfBackend,
+}
+
+_default_backend: Optional[PdfBackend] = None
+_default_lock = threading.Lock()
+
+
+def get_pdf_backend() -> PdfBackend:
+    """The process-wide backend, created on first use and closed at exit."""
+    global _default_backend
+    with _default_lock:
+        if _default_backend is None:
+            name = os.environ.get(PDF_BACKEND_ENV)
+            if name:
+                if name not in PDF_BACKENDS:
+                    raise ValueError(f"{PDF_BACKEND_ENV} không hợp lệ: {name}")
+                backend = PDF_BACKENDS[name]()
+            else:
+                backend = next((b for b in (factory() for factory in PDF_BACKENDS.values()) if b.available()),
+                               None) or LibreOfficeBackend()
+            _default_backend = backend
+            atexit.register(backend.close)
+        return _default_backend
+
+
+class PdfConversionQueue:
+    """Converts submitted files on a worker thread, in batches of up to batch_size.
+
+    ``submit`` returns a Future resolving to the PDF path (or raising the
+    conversion error). Requests arriving within ``max_wait`` seconds of each
+    other are converted together.
+    """
+
+    def __init__(self, backend: Optional[PdfBackend] = None, batch_size: int = PDF_BATCH_SIZE,
+                 max_wait: float = 0.2):
+        """Initialize queue and start its worker thread."""
+        self.backend = backend or get_pdf_backend()
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[ConversionJob, Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="pdf-conversion", daemon=True)
+        self._thread.start()
+
+    def submit(self, word_path: str, pdf_path: str) -> Future:
+        """Queue one conversion."""
+        future: Future = Future()
+        self._queue.put(((word_path, pdf_path), future))
+        return future
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.max_wait)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                errors = self.backend.convert_batch([job for job, _ in batch])
+            except Exception as e:
+                errors = [str(e)] * len(batch)
+            for (job, future), error in zip(batch, errors):
+                if error is None:
+                    future.set_result(job[1])
+                else:
+                    future.set_exception(RuntimeError(error))
+
+    def close(self):
+        """Finish queued conversions and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_many(jobs: Sequence[ConversionJob], backend: Optional[PdfBackend] = None,
+                 progress: Optional[ProgressCallback] = None) -> List[Optional[str]]:
+    """Convert jobs in batches; returns one error (None on success) per job."""
+    errors: List[Optional[str]] = [None] * len(jobs)
+    if progress:
+        progress(0, len(jobs))
+    with PdfConversionQueue(backend) as conversion_queue:
+        futures = [conversion_queue.submit(word_path, pdf_path) for word_path, pdf_path in jobs]
+        for i, future in enumerate(futures):
+            error = future.exception()
+            errors[i] = str(error) if error else None
+            if progress:
+                progress(i + 1, len(jobs))
+    return errors
@@ -2,13 +2,18 @@
 Report service for generating reports and exports.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Union
 from datetime import datetime, date
 import json
 import csv
 from pathlib import Path
 
+import numpy as np
+
+from models.derivation import NO_DATE, date_to_day
 from models.offender import Offender, Status, RiskLevel
+from models.offender_frame import OffenderFrame
+from services.export_service import detect_json_options, open_text_output, write_json_records
 
 
 class ReportService:
@@ -24,17 +29,20 @@ class ReportService:
             'risk': self._generate_risk_report
         }
     
-    def generate_report(self, report_type: str, offenders: List[Offender], 
+    def generate_report(self, report_type: str, offenders: Union[List[Offender], OffenderFrame],
                        filters: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Generate report based on type."""
+        """Generate report based on type from a list of offenders or an OffenderFrame."""
         if report_type not in self.report_templates:
             raise ValueError(f"Unknown report type: {report_type}")
         
+        if not isinstance(offenders, OffenderFrame):
+            offenders = OffenderFrame.from_offenders(offenders)
+        
         # Apply filters
-        filtered_offenders = self._apply_filters(offenders, filters or {})
+        filtered = self._apply_filters(offenders, filters or {})
         
         # Generate report
-        return self.report_templates[report_type](filtered_offenders)
+        return self.report_templates[report_type](filtered)
     
     def export_to_excel(self, offenders: List[Offender], filename: str) -> bool:
         """Export offenders to Excel CSV format."""
@@ -82,165 +90,152 @@ class ReportService:
             print(f"Error exporting to Excel: {e}")
             return False
     
-    def export_to_json(self, offenders: List[Offender], filename: str) -> bool:
-        """Export offenders to JSON format."""
+    def export_to_json(self, offenders: Iterable[Offender], filename: str) -> bool:
+        """Export offenders to JSON format, writing one record at a time."""
         try:
-            data = []
-            for offender in offenders:
-                data.append(offender.to_dict())
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            options = detect_json_options(filename)
+            with open_text_output(filename, options['compress']) as f:
+                write_json_records((o.to_dict() for o in offenders), f, options['fmt'])
             
             return True
         except Exception as e:
             print(f"Error exporting to JSON: {e}")
             return False
     
-    def _apply_filters(self, offenders: List[Offender], filters: Dict[str, Any]) -> List[Offender]:
-        """Apply filters to offenders list."""
-        filtered = offenders
+    def _apply_filters(self, frame: OffenderFrame, filters: Dict[str, Any]) -> OffenderFrame:
+        """Apply filters to offenders frame."""
+        mask = np.ones(len(frame), dtype=bool)
         
         # Status filter
         if 'status' in filters and filters['status']:
-            filtered = [o for o in filtered if (o.status.value if hasattr(o.status, 'value') else str(o.status)) == filters['status']]
+            mask &= frame.value_mask('status', filters['status'])
         
         # Risk level filter
         if 'risk_level' in filters and filters['risk_level']:
-            filtered = [o for o in filtered if (o.risk_level.value if hasattr(o.risk_level, 'value') else str(o.risk_level)) == filters['risk_level']]
+            mask &= frame.value_mask('risk_level', filters['risk_level'])
         
         # Date range filter
         if 'start_date' in filters and filters['start_date']:
-            filtered = [o for o in filtered if o.start_date and o.start_date >= filters['start_date']]
+            mask &= (frame.start_day != NO_DATE) & (frame.start_day >= date_to_day(filters['start_date']))
         
         if 'end_date' in filters and filters['end_date']:
-            filtered = [o for o in filtered if o.start_date and o.start_date <= filters['end_date']]
+            mask &= (frame.start_day != NO_DATE) & (frame.start_day <= date_to_day(filters['end_date']))
         
         # Search term filter
         if 'search' in filters and filters['search']:
-            search_term = filters['search'].lower()
-            filtered = [o for o in filtered if 
-                       search_term in o.full_name.lower() or 
-                       search_term in o.case_number.lower()]
+            mask &= (frame.text_contains('full_name', filters['search']) |
+                     frame.text_contains('case_number', filters['search']))
         
-        return filtered
+        return frame if mask.all() else frame.filter(mask)
+    
+    def _period_summary(self, frame: OffenderFrame, new_mask: np.ndarray) -> Dict[str, Any]:
+        """Counts shared by the monthly, quarterly and annual reports."""
+        status_counts = frame.counts('status')
+        return {
+            'total_offenders': len(frame),
+            'new_offenders': int(new_mask.sum()),
+            'completed_offenders': status_counts[Status.COMPLETED],
+            'active_offenders': status_counts[Status.ACTIVE],
+            'violation_offenders': status_counts[Status.VIOLATION],
+            'expiring_soon': status_counts[Status.EXPIRING_SOON],
+            'high_risk': frame.counts('risk_level')[RiskLevel.HIGH],
+            'completion_rate': self._calculate_completion_rate(frame),
+            'violation_rate': self._calculate_violation_rate(frame)
+        }
     
-    def _generate_monthly_report(self, offenders: List[Offender]) -> Dict[str, Any]:
+    def _generate_monthly_report(self, frame: OffenderFrame) -> Dict[str, Any]:
         """Generate monthly report."""
         current_month = datetime.now().month
         current_year = datetime.now().year
         
-        monthly_offenders = [o for o in offenders 
-                           if o.created_at and o.created_at.month == current_month 
-                           and o.created_at.year == current_year]
+        month_index = (current_year - 1970) * 12 + current_month - 1
+        monthly = frame.created_months() == month_index
         
         return {
             'report_type': 'monthly',
             'period': f"{current_month}/{current_year}",
-            'total_offenders': len(offenders),
-            'new_offenders': len(monthly_offenders),
-            'completed_offenders': len([o for o in offenders if o.status == Status.COMPLETED]),
-            'active_offenders': len([o for o in offenders if o.status == Status.ACTIVE]),
-            'violation_offenders': len([o for o in offenders if o.status == Status.VIOLATION]),
-            'expiring_soon': len([o for o in offenders if o.status == Status.EXPIRING_SOON]),
-            'high_risk': len([o for o in offenders if o.risk_level == RiskLevel.HIGH]),
-            'completion_rate': self._calculate_completion_rate(offenders),
-            'violation_rate': self._calculate_violation_rate(offenders)
+            **self._period_summary(frame, monthly)
         }
     
-    def _generate_quarterly_report(self, offenders: List[Offender]) -> Dict[str, Any]:
+    def _generate_quarterly_report(self, frame: OffenderFrame) -> Dict[str, Any]:
         """Generate quarterly report."""
         current_quarter = (datetime.now().month - 1) // 3 + 1
         current_year = datetime.now().year
         
-        quarterly_offenders = [o for o in offenders 
-                             if o.created_at and 
-                             ((o.created_at.month - 1) // 3 + 1) == current_quarter 
-                             and o.created_at.year == current_year]
+        months = frame.created_months()
+        quarter_start = (current_year - 1970) * 12 + (current_quarter - 1) * 3
+        quarterly = (months >= quarter_start) & (months < quarter_start + 3)
         
         return {
             'report_type': 'quarterly',
             'period': f"Q{current_quarter}/{current_year}",
-            'total_offenders': len(offenders),
-            'new_offenders': len(quarterly_offenders),
-            'completed_offenders': len([o for o in offenders if o.status == Status.COMPLETED]),
-            'active_offenders': len([o for o in offenders if o.status == Status.ACTIVE]),
-            'violation_offenders': len([o for o in offenders if o.status == Status.VIOLATION]),
-            'expiring_soon': len([o for o in offenders if o.status == Status.EXPIRING_SOON]),
-            'high_risk': len([o for o in offenders if o.risk_level == RiskLevel.HIGH]),
-            'completion_rate': self._calculate_completion_rate(offenders),
-            'violation_rate': self._calculate_violation_rate(offenders)
+            **self._period_summary(frame, quarterly)
         }
     
-    def _generate_annual_report(self, offenders: List[Offender]) -> Dict[str, Any]:
+    def _generate_annual_report(self, frame: OffenderFrame) -> Dict[str, Any]:
         """Generate annual report."""
         current_year = datetime.now().year
         
-        annual_offenders = [o for o in offenders 
-                          if o.created_at and o.created_at.year == current_year]
+        months = frame.created_months()
+        year_start = (current_year - 1970) * 12
+        annual = (months >= year_start) & (months < year_start + 12)
         
         return {
             'report_type': 'annual',
             'period': str(current_year),
-            'total_offenders': len(offenders),
-            'new_offenders': len(annual_offenders),
-            'completed_offenders': len([o for o in offenders if o.status == Status.COMPLETED]),
-            'active_offenders': len([o for o in offenders if o.status == Status.ACTIVE]),
-            'violation_offenders': len([o for o in offenders if o.status == Status.VIOLATION]),
-            'expiring_soon': len([o for o in offenders if o.status == Status.EXPIRING_SOON]),
-            'high_risk': len([o for o in offenders if o.risk_level == RiskLevel.HIGH]),
-            'completion_rate': self._calculate_completion_rate(offenders),
-            'violation_rate': self._calculate_violation_rate(offenders)
+            **self._period_summary(frame, annual)
         }
     
-    def _generate_status_report(self, offenders: List[Offender]) -> Dict[str, Any]:
+    def _generate_status_report(self, frame: OffenderFrame) -> Dict[str, Any]:
         """Generate status report."""
+        status_counts = frame.counts('status')
+        risk_counts = frame.counts('risk_level')
         return {
             'report_type': 'status',
-            'total_offenders': len(offenders),
+            'total_offenders': len(frame),
             'status_distribution': {
-                'active': len([o for o in offenders if o.status == Status.ACTIVE]),
-                'completed': len([o for o in offenders if o.status == Status.COMPLETED]),
-                'violation': len([o for o in offenders if o.status == Status.VIOLATION]),
-                'expiring_soon': len([o for o in offenders if o.status == Status.EXPIRING_SOON])
+                'active': status_counts[Status.ACTIVE],
+                'completed': status_counts[Status.COMPLETED],
+                'violation': status_counts[Status.VIOLATION],
+                'expiring_soon': status_counts[Status.EXPIRING_SOON]
             },
             'risk_distribution': {
-                'high': len([o for o in offenders if o.risk_level == RiskLevel.HIGH]),
-                'medium': len([o for o in offenders if o.risk_level == RiskLevel.MEDIUM]),
-                'low': len([o for o in offenders if o.risk_level == RiskLevel.LOW])
+                'high': risk_counts[RiskLevel.HIGH],
+                'medium': risk_counts[RiskLevel.MEDIUM],
+                'low': risk_counts[RiskLevel.LOW]
             }
         }
     
-    def _generate_risk_report(self, offenders: List[Offender]) -> Dict[str, Any]:
+    def _generate_risk_report(self, frame: OffenderFrame) -> Dict[str, Any]:
         """Generate risk assessment report."""
-        high_risk = [o for o in offenders if o.risk_level == RiskLevel.HIGH]
-        medium_risk = [o for o in offenders if o.risk_level == RiskLevel.MEDIUM]
-        low_risk = [o for o in offenders if o.risk_level == RiskLevel.LOW]
+        total = len(frame)
+        risk_counts = frame.counts('risk_level')
+        high_risk = risk_counts[RiskLevel.HIGH]
+        medium_risk = risk_counts[RiskLevel.MEDIUM]
+        low_risk = risk_counts[RiskLevel.LOW]
         
         return {
             'report_type': 'risk',
-            'total_offenders': len(offenders),
-            'high_risk_count': len(high_risk),
-            'medium_risk_count': len(medium_risk),
-            'low_risk_count': len(low_risk),
-            'high_risk_percentage': (len(high_risk) / len(offenders) * 100) if offenders else 0,
-            'medium_risk_percentage': (len(medium_risk) / len(offenders) * 100) if offenders else 0,
-            'low_risk_percentage': (len(low_risk) / len(offenders) * 100) if offenders else 0,
-            'high_risk_offenders': [o.case_number for o in high_risk],
-            'medium_risk_offenders': [o.case_number for o in medium_risk],
-            'low_risk_offenders': [o.case_number for o in low_risk]
+            'total_offenders': total,
+            'high_risk_count': high_risk,
+            'medium_risk_count': medium_risk,
+            'low_risk_count': low_risk,
+            'high_risk_percentage': (high_risk / total * 100) if total else 0,
+            'medium_risk_percentage': (medium_risk / total * 100) if total else 0,
+            'low_risk_percentage': (low_risk / total * 100) if total else 0,
+            'high_risk_offenders': frame.case_number[frame.is_risk(RiskLevel.HIGH)].tolist(),
+            'medium_risk_offenders': frame.case_number[frame.is_risk(RiskLevel.MEDIUM)].tolist(),
+            'low_risk_offenders': frame.case_number[frame.is_risk(RiskLevel.LOW)].tolist()
         }
     
-    def _calculate_completion_rate(self, offenders: List[Offender]) -> float:
+    def _calculate_completion_rate(self, frame: OffenderFrame) -> float:
         """Calculate completion rate."""
-        if not offenders:
+        if not len(frame):
             return 0.0
-        completed = len([o for o in offenders if o.status == Status.COMPLETED])
-        return (completed / len(offenders)) * 100
+        return float(frame.is_status(Status.COMPLETED).mean() * 100)
     
-    def _calculate_violation_rate(self, offenders: List[Offender]) -> float:
+    def _calculate_violation_rate(self, frame: OffenderFrame) -> float:
         """Calculate violation rate."""
-        if not offenders:
+        if not len(frame):
             return 0.0
-        violations = len([o for o in offenders if o.status == Status.VIOLATION])
-        return (violations / len(offenders)) * 100 
\ No newline at end of file
+        return float(frame.is_status(Status.VIOLATION).mean() * 100)
@@ -0,0 +1,296 @@
+"""
+Trained risk model: features, training pipeline and versioned artifacts.
+
+The model is a logistic regression predicting whether an offender commits a
+violation during supervision, trained on offenders whose term has ended.
+Artifacts are plain NumPy arrays written with joblib as
+``<RISK_MODEL_DIR>/risk_model_v<version>.joblib`` and loaded memory-mapped, so
+scoring only needs NumPy; scikit-learn is needed for training alone.
+
+Train from the project root:
+    python -m services.risk_model --db data/database.db
+"""
+
+import argparse
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import joblib
+except ImportError:  # optional: without it the rule-based scorer is used
+    joblib = None
+
+try:
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+except ImportError:  # optional: only needed to train a model
+    LogisticRegression = roc_auc_score = None
+
+from models.derivation import NO_DATE, date_to_day
+from models.offender import CaseType, Gender, RiskLevel
+from models.offender_frame import OffenderFrame, enum_code
+
+
+RISK_MODEL_DIR = Path("data/models")
+
+# Artifact layout version; artifacts of another format are ignored
+ARTIFACT_FORMAT = 2
+
+# Scores below the first threshold are low risk, from the second on high risk
+RISK_THRESHOLDS = (0.3, 0.7)
+
+# Fewer completed cases than this are not enough to learn from
+MIN_TRAINING_ROWS = 50
+
+# Every HOLDOUT_EVERY-th training row is held out to measure the model
+HOLDOUT_EVERY = 5
+
+UNEMPLOYED_OCCUPATIONS = ['thất nghiệp', 'nông dân']
+URBAN_MARKER = 'thành phố'
+
+FEATURE_NAMES = (
+    ['age_at_start', 'age_unknown', 'age_young', 'age_old', 'unemployed', 'urban', 'rural',
+     'duration_years', 'male']
+    + [f'case_type_{member.name.lower()}' for member in CaseType]
+)
+
+_ARTIFACT_PATTERN = re.compile(r'^risk_model_v(\d+)\.joblib$')
+
+
+def risk_features(frame: OffenderFrame) -> np.ndarray:
+    """Feature matrix (rows aligned with the frame, columns in FEATURE_NAMES order).
+
+    Violations are what the model predicts, so violation history is not a feature,
+    and neither are sentence reductions: they are only granted without violations.
+    """
+    # Age when supervision started (today's age when the start date is unknown)
+    start_day = np.where(frame.start_day != NO_DATE, frame.start_day, date_to_day(frame.as_of))
+    known_age = frame.birth_day != NO_DATE
+    age = np.where(known_age, (start_day - frame.birth_day) / 365.25, 0.0)
+
+    occupation = np.char.lower(frame.occupation.astype(str))
+    unemployed = (occupation == '') | np.isin(occupation, UNEMPLOYED_OCCUPATIONS)
+    has_address = frame.address.astype(str) != ''
+    urban = has_address & frame.text_contains('address', URBAN_MARKER)
+
+    columns = [
+        age,
+        ~known_age,
+        known_age & (age < 25),
+        known_age & (age > 50),
+        unemployed,
+        urban,
+        has_address & ~urban,
+        frame.duration_months / 12.0,
+        frame.gender == enum_code(Gender.MALE),
+    ]
+    columns.extend(frame.case_type == enum_code(member) for member in CaseType)
+    return np.column_stack(columns).astype(np.float64)
+
+
+def risk_levels(scores: np.ndarray, thresholds: Tuple[float, float] = RISK_THRESHOLDS) -> np.ndarray:
+    """RiskLevel codes for scores in [0, 1]."""
+    low, high = thresholds
+    return np.select(
+        [scores < low, scores < high],
+        [enum_code(RiskLevel.LOW), enum_code(RiskLevel.MEDIUM)],
+        default=enum_code(RiskLevel.HIGH)
+    ).astype(np.int8)
+
+
+class RiskModel:
+    """Standardized logistic regression over risk_features."""
+
+    def __init__(self, coef: np.ndarray, intercept: float, mean: np.ndarray, scale: np.ndarray,
+                 version: int = 0, thresholds: Tuple[float, float] = RISK_THRESHOLDS,
+                 trained_at: Optional[datetime] = None, metrics: Optional[Dict[str, Any]] = None):
+        """Initialize model from its parameters."""
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.mean = mean
+        self.scale = scale
+        self.version = version
+        self.thresholds = tuple(thresholds)
+        self.trained_at = trained_at
+        self.metrics = metrics or {}
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Probability of a violation for each feature row."""
+        logits = ((features - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def score_frame(self, frame: OffenderFrame, violation_weight: float = 0.0) -> Dict[str, np.ndarray]:
+        """Score a frame; same keys as AIService.predict_risk_batch.
+
+        Violations are the label, not a feature, so ``violation_weight`` is added
+        to the probability of offenders with recorded violations instead.
+        """
+        risk_score = self.predict_proba(risk_features(frame))
+        if violation_weight:
+            risk_score = np.clip(risk_score + np.where(frame.violation_count > 0, violation_weight, 0.0), 0.0, 1.0)
+        return {
+            'id': frame.id,
+            'risk_score': risk_score,
+            'risk_percentage': risk_score * 100,
+            'risk_level': risk_levels(risk_score, self.thresholds)
+        }
+
+    def to_artifact(self) -> Dict[str, Any]:
+        """Plain dict written to disk (arrays stay NumPy arrays so they can be memory-mapped)."""
+        return {
+            'format': ARTIFACT_FORMAT,
+            'version': self.version,
+            'features': list(FEATURE_NAMES),
+            'coef': np.ascontiguousarray(self.coef, dtype=np.float64),
+            'intercept': self.intercept,
+            'mean': np.ascontiguousarray(self.mean, dtype=np.float64),
+            'scale': np.ascontiguousarray(self.scale, dtype=np.float64),
+            'thresholds': self.thresholds,
+            'trained_at': self.trained_at.isoformat() if self.trained_at else None,
+            'metrics': self.metrics
+        }
+
+    @classmethod
+    def from_artifact(cls, artifact: Dict[str, Any]) -> 'RiskModel':
+        """Build a model from a loaded artifact; rejects other formats and feature sets."""
+        if artifact.get('format') != ARTIFACT_FORMAT or list(artifact.get('features', [])) != FEATURE_NAMES:
+            raise ValueError("Mô hình được huấn luyện với bộ đặc trưng khác, cần huấn luyện lại")
+        trained_at = artifact.get('trained_at')
+        return cls(
+            artifact['coef'], artifact['intercept'], artifact['mean'], artifact['scale'],
+            artifact['version'], artifact['thresholds'],
+            datetime.fromisoformat(trained_at) if trained_at else None, artifact.get('metrics')
+        )
+
+    def save(self, directory: Union[str, Path] = RISK_MODEL_DIR) -> Path:
+        """Write the model as the next version in directory; returns the artifact path."""
+        if joblib is None:
+            raise RuntimeError("Lưu mô hình cần thư viện joblib (pip install joblib)")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        versions = [version for version, _ in _artifact_versions(directory)]
+        self.version = max(versions, default=0) + 1
+        path = directory / f"risk_model_v{self.version:04d}.joblib"
+        # Uncompressed, so load_model can memory-map the arrays; rename so readers never see a partial file
+        part = path.with_name(f".{path.name}.{os.getpid()}.part")
+        joblib.dump(self.to_artifact(), part)
+        os.replace(part, path)
+        return path
+
+
+def _artifact_versions(directory: Path) -> List[Tuple[int, Path]]:
+    """(version, path) of the artifacts in directory, oldest first."""
+    if not directory.is_dir():
+        return []
+    found = []
+    for path in directory.iterdir():
+        match = _ARTIFACT_PATTERN.match(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def latest_model_path(directory: Union[str, Path] = RISK_MODEL_DIR) -> Optional[Path]:
+    """Path of the newest artifact in directory, if any."""
+    versions = _artifact_versions(Path(directory))
+    return versions[-1][1] if versions else None
+
+
+_models: Dict[str, Tuple[int, RiskModel]] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(path: Union[str, Path]) -> RiskModel:
+    """Load an artifact memory-mapped; each file is read once per modification time."""
+    if joblib is None:
+        raise RuntimeError("Tải mô hình cần thư viện joblib (pip install joblib)")
+    path = Path(path).resolve()
+    mtime = path.stat().st_mtime_ns
+    key = str(path)
+    with _models_lock:
+        cached = _models.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    model = RiskModel.from_artifact(joblib.load(path, mmap_mode='r'))
+    with _models_lock:
+        _models[key] = (mtime, model)
+    return model
+
+
+def load_latest_model(directory: Union[str, Path] = RISK_MODEL_DIR) -> Optional[RiskModel]:
+    """Newest usable model in directory, or None (callers fall back to rule-based scoring)."""
+    if joblib is None:
+        return None
+    path = latest_model_path(directory)
+    if path is None:
+        return None
+    try:
+        return load_model(path)
+    except Exception as e:
+        print(f"Không thể tải mô hình rủi ro {path.name}: {e}")
+        return None
+
+
+def training_set(frame: OffenderFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Features and labels (had at least one violation) for offenders whose term has ended."""
+    as_of = date_to_day(frame.as_of)
+    ended = (frame.completion_day != NO_DATE) & (frame.completion_day <= as_of)
+    history = frame.filter(ended)
+    return risk_features(history), (history.violation_count > 0).astype(np.int8)
+
+
+def train_risk_model(frame: OffenderFrame, regularization: float = 1.0) -> RiskModel:
+    """Fit a model on the frame's completed cases (version is assigned by RiskModel.save)."""
+    if LogisticRegression is None:
+        raise RuntimeError("Huấn luyện mô hình cần thư viện scikit-learn (pip install scikit-learn)")
+    features, labels = training_set(frame)
+    if len(labels) < MIN_TRAINING_ROWS or labels.min() == labels.max():
+        raise ValueError(
+            f"Cần ít nhất {MIN_TRAINING_ROWS} đối tượng đã kết thúc, có cả trường hợp vi phạm "
+            f"và không vi phạm (hiện có {len(labels)})"
+        )
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    holdout = np.arange(len(labels)) % HOLDOUT_EVERY == 0
+    # Violations are rare; balanced weights keep scores spread across the risk thresholds
+    classifier = LogisticRegression(C=regularization, class_weight='balanced', max_iter=1000)
+    classifier.fit((features[~holdout] - mean) / scale, labels[~holdout])
+    model = RiskModel(classifier.coef_[0], classifier.intercept_[0], mean, scale,
+                      trained_at=datetime.now())
+
+    metrics: Dict[str, Any] = {'rows': int(len(labels)), 'violation_rate': float(labels.mean())}
+    if labels[holdout].min() != labels[holdout].max():
+        metrics['holdout_auc'] = float(roc_auc_score(labels[holdout], model.predict_proba(features[holdout])))
+    model.metrics = metrics
+    return model
+
+
+def main():
+    """Train on the database's offenders and save a new model version."""
+    from database.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--db', default="data/database.db")
+    parser.add_argument('--output', default=str(RISK_MODEL_DIR))
+    parser.add_argument('--regularization', type=float, default=1.0)
+    args = parser.parse_args()
+
+    with DatabaseManager(args.db) as db_manager:
+        frame = db_manager.get_offenders_frame()
+    model = train_risk_model(frame, args.regularization)
+    path = model.save(args.output)
+    print(f"Đã lưu mô hình phiên bản {model.version}: {path}")
+    for name, value in model.metrics.items():
+        print(f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Statistics service for daily snapshots and historical trends.
+"""
+
+from typing import Dict, List, Optional, Any
+from datetime import date, timedelta
+
+from database.database_manager import DatabaseManager
+
+
+class StatsService:
+    """Service for pre-aggregated daily statistics."""
+    
+    DIMENSIONS = ['total', 'status', 'risk_level', 'ward', 'case_type']
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """Initialize service with database manager."""
+        self.db_manager = db_manager
+    
+    def take_daily_snapshot(self, snapshot_date: Optional[date] = None,
+                            force: bool = False) -> bool:
+        """Record today's counts once; returns True if a snapshot was written."""
+        snapshot_date = snapshot_date or date.today()
+        if not force and self.db_manager.has_daily_stats(snapshot_date):
+            return False
+        self.db_manager.save_daily_stats(snapshot_date)
+        return True
+    
+    def get_time_series(self, dimension: str, start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        value: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Get counts over time grouped by dimension value."""
+        if dimension not in self.DIMENSIONS:
+            raise ValueError(f"Unknown statistics dimension: {dimension}")
+        
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        rows = self.db_manager.get_daily_stats(dimension, start_date, end_date, value)
+        for snapshot_date, dimension_value, count in rows:
+            series.setdefault(dimension_value, []).append({
+                'date': snapshot_date,
+                'count': count
+            })
+        return series
+    
+    def get_recent_series(self, dimension: str, days: int = 365) -> Dict[str, List[Dict[str, Any]]]:
+        """Get time series for the last N days."""
+        end_date = date.today()
+        return self.get_time_series(dimension, end_date - timedelta(days=days), end_date)
+    
+    def get_trend_summary(self, dimension: str, days: int = 30) -> Dict[str, Dict[str, Any]]:
+        """Summarize first/last counts and change for each value over the last N days."""
+        summary = {}
+        for dimension_value, points in self.get_recent_series(dimension, days).items():
+            first = points[0]['count']
+            last = points[-1]['count']
+            summary[dimension_value] = {
+                'start_date': points[0]['date'],
+                'end_date': points[-1]['date'],
+                'start': first,
+                'end': last,
+                'change': last - first,
+                'change_rate': ((last - first) / first * 100) if first else 0.0
+            }
+        return summary
@@ -7,15 +7,17 @@ from datetime import datetime
 
 from database.database_manager import DatabaseManager
 from models.user import User, UserRole
+from services.activity_service import ActivityAction, ActivityLogger, get_activity_logger
 
 
 class UserService:
     """Service for user authentication and authorization."""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, activity_log: Optional[ActivityLogger] = None):
         """Initialize service with database manager."""
         self.db_manager = db_manager
         self.current_user: Optional[User] = None
+        self.activity_log = activity_log or get_activity_logger(db_manager)
     
     def authenticate(self, username: str, password: str) -> Optional[User]:
         """Authenticate user with username and password."""
@@ -39,6 +41,9 @@ class UserService:
                 if user.id:
                     self.db_manager.update_user_login(user.id, user.last_login)
                 self.current_user = user
+                # Later entries in this database's log are attributed to this user
+                self.activity_log.user_id = user.id
+                self.activity_log.log(ActivityAction.LOGIN, f"{user.full_name} đăng nhập", 'user', user.id)
                 return user
             else:
                 # Increment failed login attempts
@@ -53,6 +58,10 @@ class UserService:
     
     def logout(self):
         """Logout current user."""
+        if self.current_user:
+            self.activity_log.log(ActivityAction.LOGOUT, f"{self.current_user.full_name} đăng xuất",
+                                  'user', self.current_user.id)
+        self.activity_log.user_id = None
         self.current_user = None
     
     def get_current_user(self) -> Optional[User]:
@@ -102,6 +111,7 @@ class UserService:
         # Save to database
         user_id = self.db_manager.create_user(user)
         user.id = user_id
+        self.activity_log.log(ActivityAction.CREATE, f"Tạo tài khoản {user.username}", 'user', user_id)
         
         return user
     
@@ -122,7 +132,10 @@ class UserService:
                 setattr(user, key, value)
         
         # Update in database
-        return self.db_manager.update_user(user)
+        success = self.db_manager.update_user(user)
+        if success:
+            self.activity_log.log(ActivityAction.UPDATE, f"Cập nhật tài khoản {user.username}", 'user', user_id)
+        return success
     
     def change_password(self, user_id: int, old_password: str, 
                        new_password: str) -> bool:
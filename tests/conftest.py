@@ -0,0 +1,11 @@
+import pytest
+from database.database_manager import DatabaseManager
+from database.migrations import create_tables
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    create_tables(db_path)
+    manager = DatabaseManager(db_path)
+    yield manager
+    manager.disconnect()
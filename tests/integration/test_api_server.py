@@ -0,0 +1,139 @@
+import pytest
+from datetime import date, timedelta
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+from api.server import create_app
+from api.client import RemoteDatabaseManager
+from database.database_manager import UPSERT_COLUMNS, DatabaseManager
+from models.offender import Offender
+from services.offender_service import OffenderService
+
+def offender_payload(case_number):
+    return {
+        'case_number': case_number,
+        'full_name': 'Nguyễn Văn A',
+        'gender': 'Nam',
+        'case_type': 'Án treo',
+        'birth_date': '1990-05-15',
+        'start_date': (date.today() - timedelta(days=20)).isoformat(),
+        'duration_months': 1,
+    }
+
+@pytest.fixture
+def client(tmp_path):
+    return TestClient(create_app(str(tmp_path / "server.db")))
+
+def test_create_and_paginate(client):
+    for i in range(5):
+        response = client.post('/offenders', json=offender_payload(f'HS{i}'))
+        assert response.status_code == 201
+    page = client.get('/offenders', params={'page': 2, 'page_size': 2}).json()
+    assert page['total'] == 5
+    assert page['total_pages'] == 3
+    assert len(page['items']) == 2
+
+def test_validation_error(client):
+    payload = offender_payload('')
+    assert client.post('/offenders', json=payload).status_code == 422
+
+def test_etag_and_cache_invalidation(client):
+    client.post('/offenders', json=offender_payload('HS1'))
+    first = client.get('/offenders')
+    etag = first.headers['ETag']
+    assert client.get('/offenders', headers={'If-None-Match': etag}).status_code == 304
+    assert client.app.state.api.cache.hits >= 1
+    client.post('/offenders', json=offender_payload('HS2'))
+    changed = client.get('/offenders', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json()['total'] == 2
+
+def test_writes_outside_the_api_invalidate_the_cache(client, tmp_path):
+    client.post('/offenders', json=offender_payload('HS1'))
+    etag = client.get('/offenders').headers['ETag']
+    with DatabaseManager(str(tmp_path / "server.db")) as db:
+        db.create_offender(Offender(case_number='HS2', full_name='Nguyễn Văn B'))
+    changed = client.get('/offenders', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.json()['total'] == 2
+
+def test_remote_database_manager(client):
+    remote = RemoteDatabaseManager("http://testserver", page_size=2)
+    remote.session = client
+    remote._is_connected = True
+    service = OffenderService(remote)
+    created = service.create_offender({
+        'case_number': 'HS1', 'full_name': 'Nguyễn Văn A',
+        'start_date': date.today() - timedelta(days=20), 'duration_months': 1
+    })
+    for i in range(2, 5):
+        client.post('/offenders', json=offender_payload(f'HS{i}'))
+    assert len(service.get_all_offenders()) == 4
+    assert service.get_offender(created.id).case_number == 'HS1'
+    assert service.update_offender(created.id, {'full_name': 'Nguyễn Văn B'}) is True
+    assert service.get_offender(created.id).full_name == 'Nguyễn Văn B'
+    assert len(service.get_expiring_offenders(days=30)) == 4
+    assert service.get_expiry_bucket_counts()['30_days'] == 4
+    cohorts = service.get_cohort_counts()
+    assert (cohorts['total'], cohorts['expiring'], cohorts['overdue']) == (4, 4, 0)
+    assert service.delete_offender(created.id) is True
+    assert service.get_offender(created.id) is None
+
+def test_report_endpoint(client):
+    client.post('/offenders', json=offender_payload('HS1'))
+    report = client.get('/reports/status').json()
+    assert report['total_offenders'] == 1
+    assert client.get('/reports/unknown').status_code == 404
+
+def test_stale_update_returns_conflict(client):
+    created = client.post('/offenders', json=offender_payload('HS1')).json()
+    stale = dict(created)
+    created['full_name'] = 'Nguyễn Văn B'
+    assert client.put(f"/offenders/{created['id']}", json=created).status_code == 200
+    stale['full_name'] = 'Nguyễn Văn C'
+    response = client.put(f"/offenders/{created['id']}", json=stale)
+    assert response.status_code == 409
+    assert response.json()['detail']['current']['full_name'] == 'Nguyễn Văn B'
+
+def test_recent_activity_endpoint(client):
+    offender_id = client.post('/offenders', json=offender_payload('HS1')).json()['id']
+    client.delete(f'/offenders/{offender_id}')
+    client.app.state.api.offender_service().activity_log.flush()
+    entries = client.get('/activity', params={'limit': 1}).json()
+    assert [(e['action'], e['entity_id']) for e in entries] == [('delete', offender_id)]
+
+def test_remote_iteration_beyond_server_page_cap(client, tmp_path):
+    rows = [
+        tuple(getattr(Offender(case_number=f'HS{i:04d}', full_name='Nguyễn Văn A'), column)
+              for column in UPSERT_COLUMNS)
+        for i in range(1200)
+    ]
+    with DatabaseManager(str(tmp_path / "server.db")) as db:
+        db.upsert_offenders(rows)
+    remote = RemoteDatabaseManager("http://testserver", page_size=1000)
+    remote.session = client
+    remote._is_connected = True
+    case_numbers = [o.case_number for o in remote.iter_offenders(batch_size=1000)]
+    assert len(case_numbers) == len(set(case_numbers)) == 1200
+    assert len(remote.get_all_offenders()) == 1200
+    with pytest.raises(ValueError):
+        remote.get_offenders_page(0, 1000)
+
+def test_token_is_required_when_configured(tmp_path):
+    client = TestClient(create_app(str(tmp_path / "secured.db"), token="bi-mat"))
+    assert client.get('/offenders').status_code == 401
+    assert client.get('/offenders', headers={'Authorization': 'Bearer sai'}).status_code == 401
+    assert client.post('/offenders/upsert', json={'rows': []}).status_code == 401
+    remote = RemoteDatabaseManager("http://testserver")
+    remote.session = client
+    remote._is_connected = True
+    with pytest.raises(PermissionError):
+        remote.count_offenders()
+    remote.token = "bi-mat"
+    assert remote.count_offenders() == 0
+    assert remote.clone().token == "bi-mat"
+
+def test_upsert_rejects_malformed_rows(client):
+    assert client.post('/offenders/upsert', json={'rows': [['HS1', 'A']]}).status_code == 422
@@ -0,0 +1,56 @@
+import pytest
+from datetime import date
+from database.database_manager import DatabaseManager
+from services.activity_service import ActivityAction, ActivityLogger, get_activity_logger
+from services.excel_service import ExcelService
+from services.offender_service import OffenderService
+
+@pytest.fixture
+def db(db):
+    yield db
+    get_activity_logger(db).close()
+
+def test_entries_are_written_in_batches(db, monkeypatch):
+    batches = []
+    insert = DatabaseManager.insert_activities
+    monkeypatch.setattr(DatabaseManager, 'insert_activities',
+                        lambda self, rows: batches.append(len(rows)) or insert(self, rows))
+    logger = ActivityLogger(db, batch_size=3, flush_interval=0.2)
+    for i in range(7):
+        logger.log(ActivityAction.EXPORT, f"Xuất lần {i}")
+    logger.close()
+    assert sum(batches) == 7
+    assert max(batches) <= 3
+    assert len(batches) < 7
+    assert [e['description'] for e in logger.recent(3)] == ["Xuất lần 6", "Xuất lần 5", "Xuất lần 4"]
+
+def test_loggers_are_shared_per_database(db):
+    assert get_activity_logger(db) is get_activity_logger(db.clone())
+    assert OffenderService(db).activity_log is get_activity_logger(db)
+
+def test_offender_actions_are_logged_with_user(db):
+    service = OffenderService(db)
+    service.activity_log.user_id = 7
+    offender = service.create_offender({'case_number': 'HS1', 'full_name': 'Nguyễn Văn A',
+                                        'start_date': date(2024, 1, 1), 'duration_months': 12})
+    service.update_offender(offender.id, {'address': 'Phường 1'})
+    service.delete_offender(offender.id)
+    service.activity_log.flush()
+    entries = service.activity_log.recent(10)
+    assert [(e['action'], e['entity_id'], e['user_id']) for e in entries] == [
+        ('delete', offender.id, 7), ('update', offender.id, 7), ('create', offender.id, 7)
+    ]
+    assert entries[-1]['description'] == "Thêm đối tượng Nguyễn Văn A"
+
+def test_excel_import_and_dry_run_logging(db, tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text("Số hồ sơ,Họ tên,Ngày bắt đầu,Thời gian (tháng)\n"
+                    "HS1,Nguyễn Văn A,01/01/2024,12\n", encoding='utf-8')
+    service = ExcelService(OffenderService(db))
+    service.import_from_excel(str(path), dry_run=True)
+    service.import_from_excel(str(path))
+    log = service.offender_service.activity_log
+    log.flush()
+    assert [e['description'] for e in log.recent(10)] == [
+        "Nhập 1 đối tượng từ import.csv (1 mới, 0 cập nhật)"
+    ]
@@ -0,0 +1,59 @@
+import pytest
+from datetime import date, datetime, timedelta
+from models.offender import Offender, RiskLevel
+from models.offender_frame import OffenderFrame
+from services.ai_service import AIService
+from services.offender_service import OffenderService
+
+def sample_offenders():
+    today = date.today()
+    return [
+        Offender(id=1, case_number='HS1', full_name='A', birth_date=today - timedelta(days=20 * 365),
+                 occupation='', address='Xã Hồng Hà', start_date=today - timedelta(days=100), duration_months=4),
+        Offender(id=2, case_number='HS2', full_name='B', birth_date=date(1960, 1, 1),
+                 occupation='Kỹ sư', address='Thành phố Hà Nội', start_date=today, duration_months=24),
+        Offender(id=3, case_number='HS3', full_name='C', occupation='Nông Dân',
+                 start_date=today - timedelta(days=10), duration_months=12),
+        Offender(id=4, case_number='HS4', full_name='D', birth_date=date(1990, 3, 3),
+                 occupation='Thất nghiệp', address='Phường Bắc Hồng'),
+    ]
+
+def test_batch_matches_single_predictions():
+    service = AIService()
+    offenders = sample_offenders()
+    violations = {1: 2, 4: 1}
+    scores = service.predict_risk_batch(OffenderFrame.from_offenders(offenders, violation_counts=violations))
+    levels = list(RiskLevel)
+    for i, offender in enumerate(offenders):
+        single = service.predict_risk(offender, violations.get(offender.id, 0))
+        assert scores['id'][i] == offender.id
+        assert scores['risk_score'][i] == pytest.approx(single['risk_score'])
+        assert levels[scores['risk_level'][i]] == single['risk_level']
+    assert levels[scores['risk_level'][0]] == RiskLevel.HIGH
+
+def test_batch_on_empty_frame():
+    scores = AIService().predict_risk_batch(OffenderFrame.from_offenders([]))
+    assert len(scores['risk_score']) == 0
+
+def test_rescore_all_risks_uses_violation_history(db):
+    for offender in sample_offenders():
+        offender.id = None
+        offender.created_at = datetime(2024, 1, 1)
+        db.create_offender(offender)
+    service = OffenderService(db)
+    first = db.search_offenders('HS2')[0]
+    db.execute(
+        "INSERT INTO violations (offender_id, violation_type, status, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (first.id, 'Vắng mặt', 'Mới', datetime.now(), datetime.now())
+    )
+    db.commit()
+    assert service.get_offenders_frame().violation_count.sum() == 1
+
+    assert service.rescore_all_risks() == 4
+    assert service.rescore_all_risks() == 0
+    rescored = db.get_offender(first.id)
+    expected = service.calculate_risk_assessment(rescored, violation_count=1)
+    assert rescored.risk_percentage == pytest.approx(expected['risk_percentage'])
+    assert rescored.risk_level == expected['risk_level']
+    assert rescored.row_version == 1
@@ -0,0 +1,46 @@
+import dataclasses
+import pytest
+from datetime import date
+from models.compact import (
+    CompactOffender, FrozenCase, FrozenOffender, FrozenViolation, to_compact
+)
+from models.offender import Offender, Status
+from models.violation import Violation, ViolationType
+
+def make_offender(ward='Phường Bắc Hồng'):
+    return Offender(id=7, case_number='HS7', full_name='Nguyễn Văn A', ward=ward,
+                    start_date=date(2024, 1, 1), duration_months=12)
+
+def test_compact_records_have_no_instance_dict():
+    offender = make_offender()
+    for record in (to_compact(offender), to_compact(offender, frozen=True)):
+        assert not hasattr(record, '__dict__')
+        assert record.to_dict() == offender.to_dict()
+
+def test_ward_strings_are_interned():
+    first = to_compact(make_offender(''.join(['Phường ', 'Nam Hồng'])))
+    second = to_compact(make_offender(''.join(['Phường ', 'Nam', ' Hồng'])))
+    assert first.ward is second.ward
+
+def test_frozen_offender_is_immutable_and_derives_fields():
+    record = FrozenOffender(case_number='HS1', status='Vi phạm', start_date=date.today(),
+                            duration_months=12)
+    assert record.status is Status.VIOLATION
+    assert record.completion_date is not None
+    assert record.days_remaining > 300
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        record.ward = 'Khác'
+
+def test_mutable_variant_keeps_model_methods():
+    record = CompactOffender(case_number='HS2', start_date=date(2024, 1, 31), duration_months=1)
+    assert record.completion_date == date(2024, 2, 29)
+    record.recalculate(date(2024, 2, 1))
+    assert record.days_remaining == 28
+    assert isinstance(record.to_model(), Offender)
+
+def test_other_models_have_variants():
+    violation = FrozenViolation(offender_id=1, violation_type='Vi phạm vừa', location='Xã A')
+    assert violation.violation_type is ViolationType.MODERATE
+    assert violation.get_severity_score() == to_compact(
+        Violation(violation_type=ViolationType.MODERATE), frozen=True).get_severity_score()
+    assert FrozenCase(case_number='VA1').to_dict()['case_number'] == 'VA1'
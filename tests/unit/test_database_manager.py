@@ -0,0 +1,132 @@
+import sqlite3
+import pytest
+from datetime import date, datetime, timedelta
+from database.converters import OFFENDER_COLUMNS
+from database.database_manager import ConcurrencyConflictError
+from models.codecs import decode_enum
+from models.offender import Offender, Gender, RiskLevel, Status
+from models.user import User, UserRole, UserStatus
+
+def add_offender(db, case_number, completion_in_days):
+    offender = Offender(case_number=case_number, full_name='Nguyễn Văn A')
+    offender.completion_date = date.today() + timedelta(days=completion_in_days)
+    offender.id = db.create_offender(offender)
+    return offender
+
+def test_completion_range_is_inclusive(db):
+    add_offender(db, 'HS1', -1)
+    add_offender(db, 'HS2', 0)
+    add_offender(db, 'HS3', 5)
+    add_offender(db, 'HS4', 6)
+    today = date.today()
+    result = db.get_offenders_by_completion_range(today, today + timedelta(days=5))
+    assert [o.case_number for o in result] == ['HS2', 'HS3']
+
+def test_completion_range_uses_index(db):
+    plan = db.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM offenders WHERE completion_date BETWEEN ? AND ?",
+        (date.today(), date.today())
+    ).fetchall()
+    assert any('idx_offenders_completion_date' in row[-1] for row in plan)
+
+def test_completion_bucket_counts(db):
+    for i, days in enumerate([-3, 0, 3, 7, 20, 45, 90, 120]):
+        add_offender(db, f'HS{i}', days)
+    assert db.count_offenders_by_completion_buckets(date.today(), [0, 7, 30, 90]) == [1, 3, 4, 6]
+
+def test_counts_by_status_and_risk_level(db):
+    for i, (status, risk_level) in enumerate([(Status.ACTIVE, RiskLevel.HIGH), (Status.ACTIVE, RiskLevel.LOW),
+                                              (Status.COMPLETED, RiskLevel.HIGH)]):
+        offender = Offender(case_number=f'HS{i}', full_name='Nguyễn Văn A', risk_level=risk_level)
+        offender.status = status
+        db.create_offender(offender)
+    assert db.count_offenders_by_status(Status.ACTIVE) == 2
+    assert db.count_offenders_by_status(Status.VIOLATION) == 0
+    assert db.count_offenders_by_risk_level(RiskLevel.HIGH) == 2
+
+def test_read_snapshot_is_isolated_from_writes(db):
+    add_offender(db, 'HS1', 10)
+    with db.read_snapshot() as snapshot:
+        assert len(snapshot.get_all_offenders()) == 1
+        # Writes on the main connection neither block nor show up in the snapshot
+        add_offender(db, 'HS2', 10)
+        assert len(snapshot.get_all_offenders()) == 1
+        assert [o.case_number for o in snapshot.iter_offenders(batch_size=1)] == ['HS1']
+    assert len(db.get_all_offenders()) == 2
+
+def test_read_snapshot_is_read_only(db):
+    add_offender(db, 'HS1', 10)
+    with db.read_snapshot() as snapshot:
+        with pytest.raises(sqlite3.OperationalError):
+            snapshot.delete_offender(1)
+    assert len(db.get_all_offenders()) == 1
+
+def test_update_with_stale_row_version_conflicts(db):
+    offender = add_offender(db, 'HS1', 10)
+    first = db.get_offender(offender.id)
+    second = db.get_offender(offender.id)
+    first.full_name = 'Nguyễn Văn B'
+    assert db.update_offender(first) is True
+    assert first.row_version == 2
+    second.full_name = 'Nguyễn Văn C'
+    with pytest.raises(ConcurrencyConflictError) as excinfo:
+        db.update_offender(second)
+    assert excinfo.value.current.full_name == 'Nguyễn Văn B'
+    assert excinfo.value.current.row_version == 2
+    assert db.get_offender(offender.id).full_name == 'Nguyễn Văn B'
+
+def test_update_deleted_offender_returns_false(db):
+    offender = add_offender(db, 'HS1', 10)
+    loaded = db.get_offender(offender.id)
+    db.delete_offender(offender.id)
+    assert db.update_offender(loaded) is False
+
+def test_rows_are_decoded_by_driver(db):
+    add_offender(db, 'HS1', 10)
+    row = db.execute(f"SELECT {OFFENDER_COLUMNS} FROM offenders").fetchone()
+    assert row['gender'] is Gender.MALE
+    assert row['status'] in list(Status)
+    assert isinstance(row['completion_date'], date)
+    assert isinstance(row['created_at'], datetime)
+    db.execute("UPDATE offenders SET gender = 'Không rõ'")
+    assert db.get_all_offenders()[0].gender is Gender.MALE
+
+def test_user_round_trip_decodes_enums_and_datetimes(db):
+    user = User(username='canbo', full_name='Cán bộ', role=UserRole.MANAGER)
+    user.set_password('secret')
+    db.create_user(user)
+    loaded = db.get_user_by_username('canbo')
+    assert loaded.role is UserRole.MANAGER
+    assert loaded.status is UserStatus.ACTIVE
+    assert isinstance(loaded.created_at, datetime)
+    assert loaded.check_password('secret')
+
+def test_decode_enum():
+    assert decode_enum(RiskLevel, 'Cao') is RiskLevel.HIGH
+    assert decode_enum(RiskLevel, RiskLevel.LOW) is RiskLevel.LOW
+    assert decode_enum(RiskLevel, 'x', RiskLevel.MEDIUM) is RiskLevel.MEDIUM
+    with pytest.raises(ValueError):
+        decode_enum(UserRole, 'x')
+
+def test_cohort_counts(db):
+    today = date.today()
+    rows = [
+        # completion in days, status, months served, sentence months, risk
+        (-5, Status.ACTIVE, 12, 12, RiskLevel.HIGH),     # overdue
+        (-5, Status.COMPLETED, 12, 12, RiskLevel.LOW),   # finished, not overdue
+        (10, Status.VIOLATION, 11, 12, RiskLevel.HIGH),  # expiring, eligible
+        (200, Status.ACTIVE, 5, 12, RiskLevel.LOW),      # eligible
+        (300, Status.ACTIVE, 2, 12, RiskLevel.LOW),      # too early
+    ]
+    for i, (days, status, served, months, risk) in enumerate(rows):
+        offender = Offender(case_number=f'HS{i}', full_name='Nguyễn Văn A', risk_level=risk,
+                            duration_months=months,
+                            start_date=today - timedelta(days=int(served * 30.44) + 1))
+        # Stored as last derived; the overdue row's status went stale after its end date
+        offender.completion_date = today + timedelta(days=days)
+        offender.status = status
+        db.create_offender(offender)
+    assert db.count_offender_cohorts(today, 30) == {
+        'total': 5, 'active': 3, 'completed': 1, 'violation': 1, 'high_risk': 2,
+        'expiring': 1, 'overdue': 1, 'reduction_eligible': 2
+    }
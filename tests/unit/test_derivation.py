@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from datetime import date
+from models.derivation import (
+    EXPIRING_SOON_DAYS, STATUS_BY_CODE, STATUS_CODES, date_to_day, day_to_date,
+    derive, derive_arrays, shift_months
+)
+from models.offender import Offender, Status
+
+AS_OF = date(2024, 6, 1)
+
+def test_shift_months_clamps_month_end():
+    assert shift_months(date(2024, 1, 31), 1) == date(2024, 2, 29)
+    assert shift_months(date(2024, 3, 31), -1) == date(2024, 2, 29)
+    assert shift_months(date(2024, 1, 15), 12) == date(2025, 1, 15)
+
+@pytest.mark.parametrize('completion, expected', [
+    (AS_OF, Status.COMPLETED),
+    (date(2024, 6, 2), Status.EXPIRING_SOON),
+    (date(2024, 7, 1), Status.EXPIRING_SOON),
+    (date(2024, 7, 2), Status.ACTIVE),
+])
+def test_status_thresholds(completion, expected):
+    days = (completion - AS_OF).days
+    start = completion.replace(year=completion.year - 1)
+    completion_date, status, remaining = derive(start, 12, 0, AS_OF)
+    assert completion_date == completion
+    assert status == expected
+    assert remaining == max(0, days)
+
+def test_violation_kept_until_completion():
+    assert derive(date(2024, 1, 1), 12, 0, AS_OF, Status.VIOLATION)[1] == Status.VIOLATION
+    assert derive(date(2023, 1, 1), 12, 0, AS_OF, Status.VIOLATION)[1] == Status.COMPLETED
+
+def test_model_and_service_agree_on_threshold():
+    offender = Offender(start_date=date(2023, 6, 20), duration_months=12)
+    offender.recalculate(AS_OF)
+    assert offender.completion_date == date(2024, 6, 20)
+    assert (offender.completion_date - AS_OF).days <= EXPIRING_SOON_DAYS
+    assert offender.status == Status.EXPIRING_SOON
+    assert offender.get_days_remaining(AS_OF) == 19
+
+def test_reduction_applied_after_duration():
+    assert derive(date(2024, 1, 31), 2, 1, AS_OF)[0] == date(2024, 2, 29)
+
+def test_arrays_match_scalar_derivation():
+    rows = [
+        (date(2024, 1, 31), 1, 0, Status.ACTIVE),
+        (date(2023, 8, 31), 6, 2, Status.ACTIVE),
+        (date(2023, 6, 20), 12, 0, Status.VIOLATION),
+        (date(2024, 2, 29), 12, 0, Status.VIOLATION),
+        (date(2022, 12, 31), 14, 3, Status.ACTIVE),
+        (None, 12, 0, Status.ACTIVE),
+        (date(2024, 1, 1), 0, 0, Status.ACTIVE),
+    ]
+    completion, status, remaining = derive_arrays(
+        np.array([date_to_day(r[0]) for r in rows]),
+        np.array([r[1] for r in rows]),
+        np.array([r[2] for r in rows]),
+        AS_OF,
+        np.array([STATUS_CODES[r[3]] for r in rows])
+    )
+    for i, (start, duration, reduced, current) in enumerate(rows):
+        expected = derive(start, duration, reduced, AS_OF, current)
+        assert day_to_date(completion[i]) == expected[0]
+        assert STATUS_BY_CODE[status[i]] == expected[1]
+        assert remaining[i] == expected[2]
@@ -0,0 +1,168 @@
+import os
+import struct
+import time
+import zlib
+import pytest
+from datetime import date
+from pathlib import Path
+from docx import Document
+from models.offender import Offender
+from services.document_service import (
+    CONTEXT_FIELDS, DocumentService, RenderCache, RenderJob, TemplateCache, safe_filename
+)
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / "mau.docx"
+    doc = Document()
+    doc.add_paragraph("Họ tên: {{ ten_doi_tuong }}")
+    doc.save(str(path))
+    return str(path)
+
+def _jobs(tmp_path, count):
+    return [RenderJob(f'Đối tượng {i}', {'ten_doi_tuong': f'Nguyễn Văn {i}'},
+                      str(tmp_path / "out" / f"doc_{i}.docx")) for i in range(count)]
+
+def _text(path):
+    return "\n".join(p.text for p in Document(path).paragraphs)
+
+def _png(path):
+    """A 1x1 PNG, enough for python-docx to embed as a picture."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+                     + chunk(b'IDAT', zlib.compress(b'\x00\x00')) + chunk(b'IEND', b''))
+    return str(path)
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_render_batch_renders_every_document(template, tmp_path, max_workers):
+    calls = []
+    result = DocumentService().render_batch(
+        template, _jobs(tmp_path, 5), max_workers=max_workers,
+        progress=lambda done, total: calls.append((done, total))
+    )
+    assert result['success_count'] == 5
+    assert result['error_count'] == 0
+    assert sorted(result['generated_files']) == sorted(j.output_path for j in _jobs(tmp_path, 5))
+    assert _text(str(tmp_path / "out" / "doc_3.docx")) == "Họ tên: Nguyễn Văn 3"
+    assert calls == [(i, 5) for i in range(6)]
+
+def test_render_batch_reports_errors_per_document(template, tmp_path):
+    jobs = _jobs(tmp_path, 2) + [RenderJob('Hỏng', {}, str(tmp_path / "missing" / "x.docx"))]
+    result = DocumentService().render_batch(str(tmp_path / "khong_co.docx"), jobs, max_workers=2)
+    assert result['success_count'] == 0
+    assert result['error_count'] == 3
+    assert all(d['error'] and d['path'] is None for d in result['documents'])
+    assert {d['label'] for d in result['documents']} == {'Đối tượng 0', 'Đối tượng 1', 'Hỏng'}
+
+def test_safe_filename_replaces_path_separators():
+    assert safe_filename('40CE0625/405LF') == '40CE0625_405LF'
+
+def test_template_cache_extracts_variables_and_reloads_on_change(template, tmp_path):
+    cache = TemplateCache()
+    assert cache.variables(template) == {'ten_doi_tuong'}
+    assert cache.get(template) is cache.get(template)
+    doc = Document()
+    doc.add_paragraph("{{ so_ho_so }} - {{ ngay_sinh }}")
+    doc.save(template)
+    os.utime(template, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    assert cache.variables(template) == {'so_ho_so', 'ngay_sinh'}
+    assert len(cache._entries) == 1
+
+def test_clones_render_independently(template, tmp_path):
+    cache = TemplateCache()
+    for name in ('A', 'B'):
+        doc = cache.clone(template)
+        doc.render({'ten_doi_tuong': name}, cache.env)
+        doc.save(str(tmp_path / f"{name}.docx"))
+    assert _text(str(tmp_path / "A.docx")) == "Họ tên: A"
+    assert _text(str(tmp_path / "B.docx")) == "Họ tên: B"
+
+def test_prepare_context_computes_only_requested_fields():
+    offender = Offender(case_number='HS1', full_name='Nguyễn Văn A', birth_date=date(1990, 5, 15))
+    service = DocumentService()
+    assert service._prepare_context(offender, {'ten_doi_tuong', 'ngay_sinh', 'khong_co'}) == {
+        'ten_doi_tuong': 'Nguyễn Văn A', 'ngay_sinh': '15/05/1990'
+    }
+    assert set(service._prepare_context(offender)) == set(CONTEXT_FIELDS)
+
+def test_merged_docx_has_one_page_per_record(tmp_path):
+    path = str(tmp_path / "mau.docx")
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Đơn vị {{ don_vi }}"
+    doc.add_paragraph("Họ tên: {{ ten_doi_tuong }}")
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = "{{ so_ho_so }}"
+    doc.add_picture(_png(tmp_path / "con_dau.png"))
+    doc.save(path)
+    calls = []
+    contexts = ({'ten_doi_tuong': f'Nguyễn Văn {i}', 'so_ho_so': f'HS{i}', 'don_vi': 'X'} for i in range(3))
+    output = str(tmp_path / "gop.docx")
+    count = DocumentService().render_merged(path, contexts, output,
+                                            lambda done, total: calls.append((done, total)), 3)
+    assert count == 3
+    assert calls == [(0, 3), (1, 3), (2, 3), (3, 3)]
+    merged = Document(output)
+    assert [p.text for p in merged.paragraphs if p.text] == [f'Họ tên: Nguyễn Văn {i}' for i in range(3)]
+    assert [t.cell(0, 0).text for t in merged.tables] == ['HS0', 'HS1', 'HS2']
+    assert merged.sections[0].header.paragraphs[0].text == "Đơn vị X"
+    assert merged.element.body.xml.count('w:type="page"') == 2
+    ids = [e.get('id') for e in merged.element.body.iter('{%s}docPr' % merged.element.nsmap['wp'])]
+    assert len(ids) == len(set(ids)) == 3
+
+def test_build_context_adds_template_fields(template):
+    service = DocumentService()
+    service.templates_dir = Path(template).parent
+    context = service.build_context(Offender(case_number='HS1', full_name='Nguyễn Văn A'), Path(template).name)
+    assert context['ten_doi_tuong'] == 'Nguyễn Văn A'
+    assert context['case_number'] == 'HS1'
+    assert 'ngay_sinh' not in context
+
+def test_render_cache_serves_repeats_and_rerenders_on_change(template, tmp_path):
+    cache = RenderCache(tmp_path / "exports")
+    first = cache.get_or_render(template, {'ten_doi_tuong': 'A'}, 'Giay_xac_nhan_HS1/2024')
+    assert Path(first).name.startswith('Giay_xac_nhan_HS1_2024_')
+    assert cache.get_or_render(template, {'ten_doi_tuong': 'A'}, 'Giay_xac_nhan_HS1/2024') == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get_or_render(template, {'ten_doi_tuong': 'B'}, 'Giay_xac_nhan_HS1/2024') != first
+    doc = Document()
+    doc.add_paragraph("Tên: {{ ten_doi_tuong }}")
+    doc.save(template)
+    os.utime(template, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    changed = cache.get_or_render(template, {'ten_doi_tuong': 'A'}, 'Giay_xac_nhan_HS1/2024')
+    assert changed != first
+    assert _text(changed) == "Tên: A"
+
+def test_render_cache_evicts_by_age_then_size_and_keeps_other_files(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=250, max_age_days=1)
+    now = time.time()
+    for i, age_days in enumerate([3, 0.5, 0.2, 0.1]):
+        path = tmp_path / f"Giay_{i}_{'%020x' % i}.docx"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+    other = tmp_path / "offenders.xlsx"
+    other.write_bytes(b"x" * 1000)
+    os.utime(other, (now - 90 * 86400, now - 90 * 86400))
+    assert cache.evict() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"Giay_2_{'%020x' % 2}.docx", f"Giay_3_{'%020x' % 3}.docx", "offenders.xlsx"
+    ]
+
+def test_batch_letters_reuse_cached_documents(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    doc = Document()
+    doc.add_paragraph("{{ ten_doi_tuong }} - {{ so_ho_so }}")
+    doc.save(str(templates / "mau.docx"))
+    service = DocumentService(RenderCache(tmp_path / "exports"))
+    service.templates_dir = templates
+    offenders = [Offender(case_number=f'HS{i}', full_name=f'Nguyễn Văn {i}') for i in range(3)]
+    first = service.generate_batch_confirmation_letters(offenders[:2], "mau.docx", max_workers=1)
+    calls = []
+    second = service.generate_batch_confirmation_letters(
+        offenders, "mau.docx", max_workers=1, progress=lambda done, total: calls.append((done, total))
+    )
+    assert second['success_count'] == 3
+    assert set(first['generated_files']) < set(second['generated_files'])
+    assert service.render_cache.hits == 2
+    assert calls[-1] == (3, 3)
+    assert len(list((tmp_path / "exports").iterdir())) == 3
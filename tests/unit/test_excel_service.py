@@ -0,0 +1,166 @@
+import pandas as pd
+import pytest
+from datetime import date
+from openpyxl import load_workbook
+from database.database_manager import DatabaseManager
+from database.migrations import create_tables
+from models.offender import CaseType, Gender, Offender, Status
+from services.excel_service import (
+    EXPORT_COLUMNS, EXPORT_SHEET_NAME, MAX_COLUMN_WIDTH, ExcelService, estimate_column_widths
+)
+from services.offender_service import MSG_DURATION_RANGE, MSG_FULL_NAME_REQUIRED, OffenderService
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    create_tables(db_path)
+    manager = DatabaseManager(db_path)
+    for i in range(3):
+        manager.create_offender(Offender(case_number=f'HS{i}', full_name='Nguyễn Văn A',
+                                         start_date=date(2024, 1, 1), duration_months=12))
+    yield ExcelService(OffenderService(manager))
+    manager.disconnect()
+
+def test_export_all_streams_rows_with_formats(service, tmp_path):
+    path = tmp_path / "offenders.xlsx"
+    calls = []
+    assert service.export_all_to_excel(str(path), progress=lambda done, total: calls.append((done, total)))
+    sheet = load_workbook(path)[EXPORT_SHEET_NAME]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == [column.header for column in EXPORT_COLUMNS]
+    assert sorted(row[0] for row in rows[1:]) == ['HS0', 'HS1', 'HS2']
+    start_cell = sheet.cell(row=2, column=11)
+    assert start_cell.value.date() == date(2024, 1, 1)
+    assert start_cell.number_format == 'DD/MM/YYYY'
+    assert sheet.column_dimensions['B'].width >= len('Nguyễn Văn A')
+    assert calls[0] == (0, 3) and calls[-1] == (3, 3)
+
+def make_service(tmp_path, name):
+    db_path = str(tmp_path / name)
+    create_tables(db_path)
+    return ExcelService(OffenderService(DatabaseManager(db_path)))
+
+def test_exported_workbook_can_be_reimported(service, tmp_path):
+    path = tmp_path / "offenders.xlsx"
+    assert service.export_all_to_excel(str(path))
+    target = make_service(tmp_path, "target.db")
+    result = target.import_from_excel(str(path))
+    assert result['success'] and result['errors'] == []
+    assert result['created_count'] == 3
+    imported = target.offender_service.db_manager.get_all_offenders()
+    assert {o.start_date for o in imported} == {date(2024, 1, 1)}
+    assert {o.completion_date for o in imported} == {date(2025, 1, 1)}
+    target.offender_service.db_manager.disconnect()
+
+def test_import_updates_existing_case_numbers(service, tmp_path):
+    db = service.offender_service.db_manager
+    db.execute("UPDATE offenders SET status = ? WHERE case_number = 'HS1'", (Status.VIOLATION,))
+    db.commit()
+    path = tmp_path / "update.xlsx"
+    pd.DataFrame([
+        {'Số hồ sơ': 'HS1', 'Họ tên': 'Trần Thị B', 'Giới tính': 'Nữ', 'Ngày bắt đầu': '01/01/2026',
+         'Thời gian (tháng)': 12, 'Loại án': 'Cải tạo không giam giữ'},
+        {'Số hồ sơ': 'HS9', 'Họ tên': 'Lê Văn C', 'Ngày bắt đầu': '01/01/2026', 'Thời gian (tháng)': 24}
+    ]).to_excel(path, index=False)
+    result = service.import_from_excel(str(path))
+    assert (result['created_count'], result['updated_count']) == (1, 1)
+    updated = next(o for o in db.get_all_offenders() if o.case_number == 'HS1')
+    assert updated.full_name == 'Trần Thị B'
+    assert updated.gender is Gender.FEMALE
+    assert updated.case_type is CaseType.PROBATION
+    assert updated.status is Status.VIOLATION
+    assert updated.row_version == 2
+    assert db.count_offenders() == 4
+
+def test_imported_records_are_risk_scored(tmp_path):
+    target = make_service(tmp_path, "target.db")
+    path = tmp_path / "risk.xlsx"
+    pd.DataFrame([
+        {'Số hồ sơ': 'HS1', 'Họ tên': 'A', 'Ngày sinh': '01/01/2006', 'Địa chỉ': 'Thành phố Hà Nội',
+         'Ngày bắt đầu': '01/01/2026', 'Thời gian (tháng)': 12},
+        {'Số hồ sơ': 'HS2', 'Họ tên': 'B', 'Ngày sinh': '01/01/1980', 'Địa chỉ': 'Xã Hồng Hà',
+         'Nghề nghiệp': 'Kỹ sư', 'Ngày bắt đầu': '01/01/2026', 'Thời gian (tháng)': 12}
+    ]).to_excel(path, index=False)
+    assert target.import_from_excel(str(path))['created_count'] == 2
+    service = target.offender_service
+    for offender in service.db_manager.get_all_offenders():
+        expected = service.ai_service.predict_risk(offender)
+        assert offender.risk_level is expected['risk_level']
+        assert offender.risk_percentage == pytest.approx(expected['risk_percentage'])
+        assert offender.risk_percentage > 0
+    service.db_manager.disconnect()
+
+def test_import_reports_row_errors(tmp_path):
+    target = make_service(tmp_path, "target.db")
+    path = tmp_path / "errors.xlsx"
+    pd.DataFrame([
+        {'Số hồ sơ': 'HS1', 'Họ tên': 'A', 'Thời gian (tháng)': 6, 'Được giảm (tháng)': None},
+        {'Số hồ sơ': 'HS2', 'Họ tên': '', 'Thời gian (tháng)': 0, 'Được giảm (tháng)': None},
+        {'Số hồ sơ': 'HS3', 'Họ tên': 'C', 'Thời gian (tháng)': 6, 'Được giảm (tháng)': 'abc'},
+        {'Số hồ sơ': 'HS1', 'Họ tên': 'D', 'Thời gian (tháng)': 6, 'Được giảm (tháng)': 1}
+    ]).to_excel(path, index=False)
+    result = target.import_from_excel(str(path))
+    assert result['imported_count'] == 1
+    assert result['errors'] == [
+        f"Dòng 3: {MSG_FULL_NAME_REQUIRED}; {MSG_DURATION_RANGE}",
+        "Dòng 4: Giá trị không hợp lệ ở cột 'Được giảm (tháng)'",
+        "Dòng 5: Số hồ sơ bị trùng trong file"
+    ]
+    target.offender_service.db_manager.disconnect()
+
+def test_estimate_column_widths_is_bounded():
+    sample = [['x' * 200] * len(EXPORT_COLUMNS)]
+    widths = estimate_column_widths(EXPORT_COLUMNS, sample)
+    assert widths == [MAX_COLUMN_WIDTH] * len(EXPORT_COLUMNS)
+    assert estimate_column_widths(EXPORT_COLUMNS, [])[0] == len('Số hồ sơ') + 2
+
+def write_sheet(path, count):
+    pd.DataFrame([
+        {'Số hồ sơ': f'HS{i}', 'Họ tên': 'A', 'Ngày bắt đầu': '01/01/2026', 'Thời gian (tháng)': 12}
+        for i in range(count)
+    ]).to_excel(path, index=False)
+
+def test_dry_run_validates_without_writing(tmp_path):
+    target = make_service(tmp_path, "target.db")
+    path = tmp_path / "dry.xlsx"
+    write_sheet(path, 3)
+    result = target.import_from_excel(str(path), dry_run=True)
+    assert result['dry_run'] and result['imported_count'] == 0
+    assert result['created_count'] == 3
+    assert target.offender_service.db_manager.count_offenders() == 0
+    target.offender_service.db_manager.disconnect()
+
+def test_cancel_rolls_back_the_chunk_being_written(tmp_path, monkeypatch):
+    monkeypatch.setattr('services.excel_service.IMPORT_CHUNK_SIZE', 2)
+    target = make_service(tmp_path, "target.db")
+    path = tmp_path / "cancel.xlsx"
+    write_sheet(path, 5)
+    checks = iter([False, False, False, True])
+    calls = []
+    result = target.import_from_excel(
+        str(path), progress=lambda done, total: calls.append((done, total)),
+        should_cancel=lambda: next(checks)
+    )
+    assert result['cancelled'] and result['imported_count'] == 2
+    assert calls == [(0, 5), (2, 5)]
+    assert target.offender_service.db_manager.count_offenders() == 2
+    target.offender_service.db_manager.disconnect()
+
+def test_import_reads_csv_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr('services.excel_service.IMPORT_CHUNK_SIZE', 2)
+    target = make_service(tmp_path, "target.db")
+    path = tmp_path / "district.csv"
+    pd.DataFrame([
+        {'Số hồ sơ': 'HS1', 'Họ tên': 'A', 'Ngày bắt đầu': '01/01/2026', 'Thời gian (tháng)': '12'},
+        {'Số hồ sơ': 'HS2', 'Họ tên': 'B', 'Ngày bắt đầu': '01/02/2026', 'Thời gian (tháng)': '6'},
+        {'Số hồ sơ': 'HS3', 'Họ tên': 'C', 'Ngày bắt đầu': 'x', 'Thời gian (tháng)': '0'},
+        {'Số hồ sơ': 'HS1', 'Họ tên': 'D', 'Ngày bắt đầu': '01/01/2026', 'Thời gian (tháng)': '12'}
+    ]).to_csv(path, index=False)
+    calls = []
+    result = target.import_from_excel(str(path), progress=lambda done, total: calls.append((done, total)))
+    assert result['created_count'] == 2
+    assert result['errors'] == [f"Dòng 4: {MSG_DURATION_RANGE}", "Dòng 5: Số hồ sơ bị trùng trong file"]
+    assert calls == [(0, 4), (2, 4), (4, 4)]
+    stored = {o.case_number: o for o in target.offender_service.db_manager.get_all_offenders()}
+    assert stored['HS2'].start_date == date(2026, 2, 1)
+    target.offender_service.db_manager.disconnect()
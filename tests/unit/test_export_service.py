@@ -0,0 +1,81 @@
+import gzip
+import json
+import pytest
+from datetime import date
+from database.database_manager import DatabaseManager
+from database.migrations import create_tables
+from models.offender import Offender
+from services.export_service import ExportService, detect_json_options
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    create_tables(db_path)
+    manager = DatabaseManager(db_path)
+    for i in range(5):
+        manager.create_offender(Offender(case_number=f'HS{i}', full_name='Nguyễn Văn A',
+                                         start_date=date(2024, 1, 1), duration_months=12))
+    yield manager
+    manager.disconnect()
+
+def test_array_export_matches_offender_dicts(db, tmp_path):
+    path = tmp_path / "offenders.json"
+    assert ExportService(db).export_json(str(path)) == 5
+    records = json.loads(path.read_text(encoding='utf-8'))
+    expected = json.loads(json.dumps([o.to_dict() for o in db.get_all_offenders()], default=str))
+    assert records == expected
+
+def test_jsonl_gzip_export_with_progress(db, tmp_path):
+    path = tmp_path / "offenders.jsonl.gz"
+    calls = []
+    count = ExportService(db, batch_size=2).export_json(
+        str(path), progress=lambda done, total: calls.append((done, total))
+    )
+    assert count == 5
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert sorted(r['case_number'] for r in lines) == [f'HS{i}' for i in range(5)]
+    assert calls == [(0, 5), (2, 5), (4, 5), (5, 5)]
+
+def test_empty_export_is_valid_json(tmp_path):
+    db_path = str(tmp_path / "empty.db")
+    create_tables(db_path)
+    manager = DatabaseManager(db_path)
+    path = tmp_path / "empty.json"
+    assert ExportService(manager).export_json(str(path)) == 0
+    assert json.loads(path.read_text(encoding='utf-8')) == []
+    manager.disconnect()
+
+def test_detect_json_options():
+    assert detect_json_options('a.json') == {'fmt': 'array', 'compress': False}
+    assert detect_json_options('a.ndjson') == {'fmt': 'jsonl', 'compress': False}
+    assert detect_json_options('a.JSONL.gz') == {'fmt': 'jsonl', 'compress': True}
+    assert detect_json_options('a.json.gz') == {'fmt': 'array', 'compress': True}
+
+def test_columnar_export_keeps_types(db, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    db.execute(
+        "INSERT INTO violations (offender_id, violation_type, violation_date, status, created_at, updated_at) "
+        "VALUES (1, 'Vi phạm nhẹ', '2024-03-01', 'Chờ xử lý', '2024-03-01 08:00:00', '2024-03-01 08:00:00')"
+    )
+    db.commit()
+    calls = []
+    counts = ExportService(db, batch_size=2).export_columnar(
+        str(tmp_path), progress=lambda done, total: calls.append((done, total))
+    )
+    assert counts == {'offenders': 5, 'violations': 1, 'reductions': 0}
+    assert calls[0] == (0, 6) and calls[-1] == (6, 6)
+
+    offenders = pq.read_table(tmp_path / "offenders.parquet")
+    assert offenders.num_rows == 5
+    assert offenders.schema.field('start_date').type == pa.date32()
+    assert pa.types.is_dictionary(offenders.schema.field('status').type)
+    assert offenders.column('start_date')[0].as_py() == date(2024, 1, 1)
+    violations = pq.read_table(tmp_path / "violations.parquet").to_pylist()
+    assert violations[0]['violation_type'] == 'Vi phạm nhẹ'
+    assert violations[0]['violation_date'] == date(2024, 3, 1)
+
+    ExportService(db).export_columnar(str(tmp_path), 'arrow', tables=('offenders',))
+    with pa.ipc.open_file(tmp_path / "offenders.arrow") as reader:
+        assert reader.read_all().num_rows == 5
@@ -0,0 +1,62 @@
+import sqlite3
+import pytest
+from database.migrations import create_tables
+from database.maintenance import DatabaseMaintenance, MaintenanceScheduler, AUTO_VACUUM_INCREMENTAL
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    create_tables(path)
+    return path
+
+def fill_and_delete(db_path, rows=2000):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO offenders (case_number, full_name, gender, case_type, status, risk_level, "
+        "created_at, updated_at, notes) VALUES (?, 'A', 'Nam', 'Án treo', 'Đang chấp hành', "
+        "'Thấp', '2025-01-01', '2025-01-01', ?)",
+        [(f"HS{i}", "x" * 500) for i in range(rows)]
+    )
+    conn.commit()
+    conn.execute("DELETE FROM offenders")
+    conn.commit()
+    conn.close()
+
+def test_new_database_uses_incremental_auto_vacuum(db_path):
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL
+    conn.close()
+
+def test_run_reclaims_space(db_path):
+    fill_and_delete(db_path)
+    report = DatabaseMaintenance(db_path).run()
+    assert report['success'] is True
+    assert report['converted_auto_vacuum'] is False
+    assert report['pages_freed'] > 0
+    assert report['bytes_reclaimed'] > 0
+    assert report['integrity_errors'] == []
+    assert set(report['timings']) == {'auto_vacuum', 'optimize', 'incremental_vacuum', 'quick_check'}
+
+def test_run_converts_legacy_database(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (x TEXT)")
+    conn.commit()
+    conn.close()
+    report = DatabaseMaintenance(path).run()
+    assert report['converted_auto_vacuum'] is True
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL
+    conn.close()
+
+def test_scheduler_waits_for_idle(db_path):
+    scheduler = MaintenanceScheduler(DatabaseMaintenance(db_path), idle_seconds=3600)
+    scheduler.notify_activity()
+    assert scheduler.is_due()
+    assert not scheduler.is_idle()
+    reports = []
+    scheduler.on_report = reports.append
+    scheduler.run_now()
+    assert len(reports) == 1
+    assert not scheduler.is_due()
+    assert scheduler.last_report is reports[0]
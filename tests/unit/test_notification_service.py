@@ -0,0 +1,42 @@
+import threading
+from datetime import date, timedelta
+from models.offender import Offender, Status
+from services.notification_service import NotificationScanner
+
+def add_offender(db, case_number, completion_in_days, status=Status.ACTIVE):
+    offender = Offender(case_number=case_number, full_name='Nguyễn Văn A')
+    offender.completion_date = date.today() + timedelta(days=completion_in_days)
+    offender.status = status
+    offender.id = db.create_offender(offender)
+    return offender
+
+def test_scan_reports_only_changed_cohorts(db):
+    add_offender(db, 'HS1', 10)
+    reported = []
+    scanner = NotificationScanner(db, on_change=reported.append)
+    first = scanner.scan()
+    assert first['expiring'] == 1 and first['active'] == 1 and first['overdue'] == 0
+    assert scanner.scan() == {}
+    add_offender(db, 'HS2', -3, Status.VIOLATION)
+    db.commit()
+    assert scanner.scan() == {'total': 2, 'violation': 1, 'overdue': 1}
+    assert reported == [first, {'total': 2, 'violation': 1, 'overdue': 1}]
+    assert scanner.snapshot['expiring'] == 1
+
+def test_background_scan_runs_on_request(db):
+    scanned = threading.Event()
+    reported = []
+    scanner = NotificationScanner(db, interval_seconds=60,
+                                  on_change=lambda changed: (reported.append(changed), scanned.set()))
+    scanner.start()
+    try:
+        assert scanned.wait(5)
+        scanned.clear()
+        add_offender(db, 'HS1', 5)
+        db.commit()
+        scanner.request_scan()
+        assert scanned.wait(5)
+    finally:
+        scanner.stop(5)
+    assert reported[-1]['expiring'] == 1
+    assert scanner.last_scan is not None
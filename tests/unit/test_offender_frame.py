@@ -0,0 +1,62 @@
+import pytest
+from datetime import date, datetime, timedelta
+from models.derivation import day_to_date
+from models.offender import Offender, RiskLevel, Status
+from models.offender_frame import OffenderFrame
+from services.ai_service import AIService
+from services.report_service import ReportService
+
+@pytest.fixture
+def loaded(db):
+    today = date.today()
+    rows = [
+        ('HS1', 'Nguyễn Văn A', today - timedelta(days=400), 12, RiskLevel.HIGH, date(1960, 5, 1)),
+        ('HS2', 'Trần Thị B', today - timedelta(days=20), 1, RiskLevel.LOW, date(2003, 1, 1)),
+        ('HS3', 'Lê Văn C', today - timedelta(days=30), 24, RiskLevel.HIGH, None),
+        ('HS4', 'Phạm Văn D', None, 6, RiskLevel.MEDIUM, date(1985, 7, 7)),
+    ]
+    for case_number, name, start, months, risk, birth in rows:
+        db.create_offender(Offender(
+            case_number=case_number, full_name=name, start_date=start,
+            duration_months=months, risk_level=risk, birth_date=birth,
+            created_at=datetime(2020, 1, 15, 8, 30)
+        ))
+    return db
+
+def test_frame_matches_offender_objects(loaded):
+    frame = loaded.get_offenders_frame()
+    offenders = loaded.get_all_offenders()
+    assert len(frame) == len(offenders) == 4
+    assert frame.case_number.tolist() == [o.case_number for o in offenders]
+    for i, offender in enumerate(offenders):
+        assert day_to_date(frame.completion_day[i]) == offender.completion_date
+        assert frame.days_remaining[i] == offender.days_remaining
+        assert frame.is_status(offender.status)[i]
+    assert frame.counts('risk_level')[RiskLevel.HIGH] == 2
+
+def test_reports_same_from_list_and_frame(loaded):
+    service = ReportService()
+    frame = loaded.get_offenders_frame()
+    offenders = loaded.get_all_offenders()
+    for report_type in service.report_templates:
+        assert service.generate_report(report_type, frame) == \
+            service.generate_report(report_type, offenders)
+    assert service.generate_report('risk', frame)['high_risk_offenders'] == ['HS1', 'HS3']
+    filtered = service.generate_report('status', frame, {'search': 'văn', 'risk_level': 'Cao'})
+    assert filtered['total_offenders'] == 2
+    assert service.generate_report('status', frame, {'status': 'không có'})['total_offenders'] == 0
+
+def test_ai_analytics_from_frame(loaded):
+    service = AIService()
+    frame = loaded.get_offenders_frame()
+    trends = service.analyze_trends(frame)
+    assert trends == service.analyze_trends(loaded.get_all_offenders())
+    assert trends['age_distribution'] == {'18-25': 1, '26-35': 0, '36-50': 1, '50+': 1}
+    assert service.generate_insights(frame) == service.generate_insights(loaded.get_all_offenders())
+
+def test_empty_frame():
+    frame = OffenderFrame.from_offenders([])
+    assert len(frame) == 0
+    assert AIService().analyze_trends(frame) == {}
+    assert ReportService().generate_report('monthly', frame)['total_offenders'] == 0
+    assert frame.counts('status')[Status.ACTIVE] == 0
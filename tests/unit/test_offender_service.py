@@ -119,21 +119,45 @@ def test_get_expiring_offenders(service, mock_db):
     offender = Offender(**data)
     assert offender.completion_date is not None
     assert (offender.completion_date - today).days == 3
-    mock_db.get_all_offenders.return_value = [offender]
+    mock_db.get_offenders_by_completion_range.return_value = [offender]
     result = service.get_expiring_offenders(days=5)
     assert len(result) == 1
-    assert result[0].completion_date is not None
     assert (result[0].completion_date - today).days == 3
-    # Edge case: offender đã hoàn thành (completion_date < today)
-    data2 = offender_data()
-    data2.update({
-        'start_date': today - timedelta(days=40),
-        'duration_months': 1,
-        'reduced_months': 0
-    })
-    completed = Offender(**data2)
-    if completed.completion_date is not None:
-        assert (completed.completion_date - today).days < 0
-    mock_db.get_all_offenders.return_value = [completed]
-    result = service.get_expiring_offenders(days=5)
-    assert len(result) == 0 
\ No newline at end of file
+    # Truy vấn theo khoảng ngày hoàn thành [hôm nay, hôm nay + 5]
+    mock_db.get_offenders_by_completion_range.assert_called_once_with(
+        today, today + timedelta(days=5)
+    )
+    mock_db.get_all_offenders.assert_not_called()
+
+def test_get_expiry_bucket_counts(service, mock_db):
+    mock_db.count_offenders_by_completion_buckets.return_value = [1, 2, 5, 9]
+    counts = service.get_expiry_bucket_counts()
+    assert counts == {'today': 1, '7_days': 2, '30_days': 5, '90_days': 9}
+    mock_db.count_offenders_by_completion_buckets.assert_called_once_with(
+        date.today(), [0, 7, 30, 90]
+    )
+
+def test_single_counts_use_count_queries(service, mock_db):
+    mock_db.count_offenders_by_status.return_value = 4
+    mock_db.count_offenders_by_risk_level.return_value = 2
+    assert service.get_count_by_status(Status.ACTIVE.value) == 4
+    assert service.get_count_by_risk_level(RiskLevel.HIGH) == 2
+    mock_db.count_offenders_by_status.assert_called_once_with(Status.ACTIVE)
+    mock_db.count_offenders_by_risk_level.assert_called_once_with(RiskLevel.HIGH)
+    mock_db.get_offenders_frame.assert_not_called()
+
+def test_merge_offender_changes(service):
+    base = Offender(**offender_data())
+    current = Offender(**offender_data())
+    current.address = 'Địa chỉ mới'
+    current.notes = 'Ghi chú của người khác'
+    current.row_version = 3
+    changes = {
+        'full_name': 'Nguyễn Văn B',       # chỉ mình sửa
+        'address': base.address,            # mình không sửa
+        'notes': 'Ghi chú của tôi',         # cả hai cùng sửa
+        'row_version': 1
+    }
+    merged, conflicts = service.merge_offender_changes(base, changes, current)
+    assert merged == {'full_name': 'Nguyễn Văn B', 'notes': 'Ghi chú của tôi', 'row_version': 3}
+    assert conflicts == ['notes']
@@ -0,0 +1,147 @@
+import subprocess
+import sys
+import threading
+import types
+import pytest
+from pathlib import Path
+from services import pdf_service
+from services.pdf_service import (
+    Docx2PdfBackend, LibreOfficeBackend, PdfBackend, PdfConversionQueue, convert_many
+)
+
+FAKE_SOFFICE = '''#!{python}
+import sys, pathlib, time
+args = sys.argv[1:]
+log = pathlib.Path({log!r})
+log.write_text(log.read_text() + "call\\n" if log.exists() else "call\\n")
+outdir = pathlib.Path(args[args.index("--outdir") + 1])
+for arg in args[args.index("--outdir") + 2:]:
+    source = pathlib.Path(arg)
+    if source.read_bytes() == b"hang":
+        time.sleep(30)
+    if source.read_bytes() != b"broken":
+        (outdir / (source.stem + ".pdf")).write_bytes(b"%PDF " + source.read_bytes())
+'''
+
+class RecordingBackend(PdfBackend):
+    name = "recording"
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+
+    def available(self):
+        return True
+
+    def convert_batch(self, jobs):
+        self.release.wait(5)
+        self.batches.append(list(jobs))
+        return [None if 'bad' not in word else 'hỏng' for word, _ in jobs]
+
+@pytest.fixture
+def soffice(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_service, 'uno', None)
+    script = tmp_path / "soffice"
+    log = tmp_path / "calls.log"
+    script.write_text(FAKE_SOFFICE.format(python=sys.executable, log=str(log)))
+    script.chmod(0o755)
+    return str(script), log
+
+def test_cli_backend_converts_batches_with_one_process_each(soffice, tmp_path):
+    script, log = soffice
+    jobs = []
+    for i in range(5):
+        # Same file name in different folders must not clash
+        word = tmp_path / f"dir{i}" / "letter.docx"
+        word.parent.mkdir()
+        word.write_bytes(b"broken" if i == 3 else f"doc {i}".encode())
+        jobs.append((str(word), str(tmp_path / "pdf" / f"{i}.pdf")))
+    backend = LibreOfficeBackend(script, batch_size=2)
+    errors = backend.convert_batch(jobs)
+    backend.close()
+    assert [e is None for e in errors] == [True, True, True, False, True]
+    assert (tmp_path / "pdf" / "4.pdf").read_bytes() == b"%PDF doc 4"
+    assert log.read_text().count("call") == 3
+    assert backend.profile_dir is None
+
+def test_missing_soffice_reports_every_job(monkeypatch):
+    monkeypatch.setattr(pdf_service, 'find_soffice', lambda: None)
+    backend = LibreOfficeBackend()
+    assert not backend.available()
+    assert backend.convert_batch([('a.docx', 'a.pdf')]) == ["Không tìm thấy LibreOffice (soffice)"]
+
+def test_queue_batches_pending_requests():
+    backend = RecordingBackend()
+    with PdfConversionQueue(backend, batch_size=3, max_wait=0.5) as conversion_queue:
+        futures = [conversion_queue.submit(f"{name}.docx", f"{name}.pdf")
+                   for name in ('a', 'b', 'bad', 'c', 'd')]
+        backend.release.set()
+    assert [len(batch) for batch in backend.batches] == [3, 2]
+    assert futures[0].result() == "a.pdf"
+    with pytest.raises(RuntimeError, match='hỏng'):
+        futures[2].result()
+
+def test_convert_many_reports_progress_and_errors():
+    backend = RecordingBackend()
+    backend.release.set()
+    calls = []
+    errors = convert_many([('a.docx', 'a.pdf'), ('bad.docx', 'bad.pdf')], backend,
+                          progress=lambda done, total: calls.append((done, total)))
+    assert errors == [None, 'hỏng']
+    assert calls == [(0, 2), (1, 2), (2, 2)]
+
+def test_hung_soffice_times_out_as_job_errors(soffice, tmp_path):
+    script, log = soffice
+    jobs = []
+    for i, content in enumerate([b"hang", b"doc 1"]):
+        word = tmp_path / f"{i}.docx"
+        word.write_bytes(content)
+        jobs.append((str(word), str(tmp_path / "pdf" / f"{i}.pdf")))
+    backend = LibreOfficeBackend(script, batch_size=1, timeout=1)
+    errors = backend.convert_batch(jobs)
+    backend.close()
+    assert 'không phản hồi' in errors[0]
+    assert errors[1] is None
+
+def test_hung_uno_conversion_restarts_the_office(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_service, 'uno', types.SimpleNamespace())
+    backend = LibreOfficeBackend("soffice", timeout=0.5)
+    processes = []
+
+    def start_office():
+        backend._process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        backend._desktop = object()
+        processes.append(backend._process)
+
+    def convert_uno(word_path, pdf_path):
+        if word_path == "hang.docx":
+            # A hung office only returns once it is killed
+            processes[-1].wait()
+            raise RuntimeError("DisposedException")
+        Path(pdf_path).write_bytes(b"%PDF")
+
+    monkeypatch.setattr(backend, '_start_office', start_office)
+    monkeypatch.setattr(backend, '_convert_uno', convert_uno)
+    errors = backend.convert_batch([("hang.docx", str(tmp_path / "a.pdf")), ("b.docx", str(tmp_path / "b.pdf"))])
+    processes[-1].kill()
+    assert 'không phản hồi' in errors[0]
+    assert errors[1] is None
+    assert len(processes) == 2 and processes[0].returncode is not None
+
+def test_backends_must_implement_conversion():
+    with pytest.raises(TypeError):
+        PdfBackend()
+
+def test_docx2pdf_reports_missing_inputs_per_job(tmp_path, monkeypatch):
+    def convert(source_dir, target_dir):
+        for source in Path(source_dir).iterdir():
+            (Path(target_dir) / (source.stem + ".pdf")).write_bytes(b"%PDF")
+    monkeypatch.setitem(sys.modules, 'docx2pdf', types.SimpleNamespace(convert=convert))
+    word = tmp_path / "a.docx"
+    word.write_bytes(b"doc")
+    errors = Docx2PdfBackend().convert_batch([
+        (str(tmp_path / "missing.docx"), str(tmp_path / "missing.pdf")),
+        (str(word), str(tmp_path / "a.pdf"))
+    ])
+    assert errors[0] and errors[1] is None
+    assert (tmp_path / "a.pdf").read_bytes() == b"%PDF"
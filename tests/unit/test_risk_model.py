@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from models.offender import CaseType, Offender, RiskLevel
+from models.offender_frame import OffenderFrame
+from services.ai_service import AIService
+from services.risk_model import (
+    FEATURE_NAMES, RiskModel, latest_model_path, load_latest_model, risk_features, train_risk_model
+)
+
+def sample_frame():
+    today = date.today()
+    offenders = [
+        Offender(id=1, case_number='HS1', full_name='A', birth_date=today - timedelta(days=22 * 365),
+                 occupation='', address='Xã Hồng Hà', start_date=today - timedelta(days=30), duration_months=12),
+        Offender(id=2, case_number='HS2', full_name='B', birth_date=date(1960, 1, 1), occupation='Kỹ sư',
+                 address='Thành phố Hà Nội', case_type=CaseType.PROBATION, start_date=today, duration_months=24),
+        Offender(id=3, case_number='HS3', full_name='C', occupation='Nông Dân'),
+    ]
+    return OffenderFrame.from_offenders(offenders)
+
+def fixed_model():
+    # Young and unemployed push the score up, urban down
+    coef = np.zeros(len(FEATURE_NAMES))
+    coef[FEATURE_NAMES.index('age_young')] = 2.0
+    coef[FEATURE_NAMES.index('unemployed')] = 1.0
+    coef[FEATURE_NAMES.index('urban')] = -2.0
+    return RiskModel(coef, 0.0, np.zeros(len(FEATURE_NAMES)), np.ones(len(FEATURE_NAMES)), version=3)
+
+def history_frame(rows=400):
+    today = date.today()
+    rng = np.random.default_rng(7)
+    offenders, violations = [], {}
+    for i in range(rows):
+        young = i % 2 == 0
+        offenders.append(Offender(
+            id=i + 1, case_number=f'HS{i}', full_name='A',
+            birth_date=today - timedelta(days=(20 if young else 45) * 365 + 900),
+            occupation='' if i % 3 else 'Kỹ sư', start_date=today - timedelta(days=900), duration_months=12
+        ))
+        if rng.random() < (0.6 if young else 0.1):
+            violations[i + 1] = 1
+    return OffenderFrame.from_offenders(offenders, violation_counts=violations)
+
+def test_features_per_offender():
+    features = risk_features(sample_frame())
+    assert features.shape == (3, len(FEATURE_NAMES))
+    column = {name: features[:, i] for i, name in enumerate(FEATURE_NAMES)}
+    assert column['age_at_start'][0] == pytest.approx(21.9, abs=0.1)
+    assert list(column['age_young']) == [1, 0, 0]
+    assert list(column['age_unknown']) == [0, 0, 1]
+    assert list(column['unemployed']) == [1, 0, 1]
+    assert list(column['urban']) == [0, 1, 0]
+    assert list(column['rural']) == [1, 0, 0]
+    assert list(column['case_type_probation']) == [0, 1, 0]
+    assert risk_features(OffenderFrame.from_offenders([])).shape == (0, len(FEATURE_NAMES))
+
+def test_model_scores_batch_and_single_alike(tmp_path):
+    service = AIService(model_dir=tmp_path)
+    assert service.model is None
+    service.model = fixed_model()
+    frame = sample_frame()
+    scores = service.predict_risk_batch(frame)
+    assert scores['risk_score'][0] == pytest.approx(1 / (1 + np.exp(-3)))
+    assert list(RiskLevel)[scores['risk_level'][0]] == RiskLevel.HIGH
+    assert list(RiskLevel)[scores['risk_level'][1]] == RiskLevel.LOW
+    single = service.predict_risk(Offender(
+        case_number='HS1', full_name='A', birth_date=date.today() - timedelta(days=22 * 365),
+        occupation='', address='Xã Hồng Hà', start_date=date.today() - timedelta(days=30), duration_months=12
+    ))
+    assert single['risk_score'] == pytest.approx(scores['risk_score'][0])
+    assert single['model_version'] == 3
+    assert "Tuổi trẻ" in single['risk_factors']
+
+def test_artifacts_are_versioned_and_loaded_once(tmp_path):
+    pytest.importorskip("joblib")
+    first = fixed_model().save(tmp_path)
+    second = fixed_model().save(tmp_path)
+    assert (first.name, second.name) == ('risk_model_v0001.joblib', 'risk_model_v0002.joblib')
+    assert latest_model_path(tmp_path) == second
+    model = load_latest_model(tmp_path)
+    assert model.version == 2
+    assert isinstance(model.coef, np.memmap)
+    assert load_latest_model(tmp_path) is model
+    assert AIService(model_dir=tmp_path).model is model
+
+def test_training_learns_from_completed_cases(tmp_path):
+    pytest.importorskip("sklearn")
+    model = train_risk_model(history_frame())
+    assert model.metrics['rows'] == 400
+    assert model.metrics['holdout_auc'] > 0.7
+    assert model.coef[FEATURE_NAMES.index('age_young')] > 0
+
+def test_training_needs_enough_history():
+    pytest.importorskip("sklearn")
+    with pytest.raises(ValueError):
+        train_risk_model(sample_frame())
+
+def test_reductions_do_not_change_features():
+    # Reductions are only granted without violations, so they would leak the label
+    today = date.today()
+    offenders = [Offender(case_number=f'HS{i}', full_name='A', birth_date=date(1990, 1, 1),
+                          start_date=today - timedelta(days=400), duration_months=24, reduced_months=months)
+                 for i, months in enumerate([0, 6])]
+    features = risk_features(OffenderFrame.from_offenders(offenders))
+    assert (features[0] == features[1]).all()
+
+def test_violations_never_lower_model_scores():
+    service = AIService(model_dir=None)
+    service.model = fixed_model()
+    frame = sample_frame()
+    clean = service.predict_risk_batch(frame)
+    frame.columns['violation_count'] = np.array([1, 1, 0])
+    scores = service.predict_risk_batch(frame)
+    assert (scores['risk_score'] >= clean['risk_score']).all()
+    assert scores['risk_score'][1] > clean['risk_score'][1]
+    assert scores['risk_score'][2] == clean['risk_score'][2]
+    offender = Offender(case_number='HS1', full_name='A', birth_date=date(1960, 1, 1), occupation='Kỹ sư')
+    assert (service.predict_risk(offender, violation_count=2)['risk_score']
+            > service.predict_risk(offender)['risk_score'])
@@ -0,0 +1,30 @@
+from datetime import datetime
+from openpyxl import Workbook
+from utils.spreadsheet_reader import estimate_row_count, iter_sheet_chunks
+
+def test_xlsx_chunks_keep_row_numbers_and_skip_blank_rows(tmp_path):
+    path = str(tmp_path / "sheet.xlsx")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(['Số hồ sơ', ' Họ tên ', 'Ngày'])
+    sheet.append(['HS1', 'A'])
+    sheet.append([None, None, None])
+    sheet.append(['HS3', 'C', datetime(2024, 1, 1)])
+    sheet.append(['HS4', 'D', None])
+    workbook.save(path)
+
+    chunks = list(iter_sheet_chunks(path, chunk_size=2))
+    assert [list(chunk.index) for chunk in chunks] == [[0], [2, 3]]
+    assert list(chunks[0].columns) == ['Số hồ sơ', 'Họ tên', 'Ngày']
+    assert chunks[0].loc[0, 'Ngày'] is None
+    assert chunks[1].loc[2, 'Ngày'] == datetime(2024, 1, 1)
+    assert estimate_row_count(path) == 4
+
+def test_csv_chunks_keep_text(tmp_path):
+    path = tmp_path / "sheet.csv"
+    path.write_text("Số hồ sơ,Ngày sinh\n007,01/02/1990\n008,\n009,03/04/1991\n", encoding='utf-8-sig')
+    chunks = list(iter_sheet_chunks(str(path), chunk_size=2))
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2]]
+    assert chunks[0].loc[0, 'Số hồ sơ'] == '007'
+    assert chunks[0].loc[0, 'Ngày sinh'] == '01/02/1990'
+    assert estimate_row_count(str(path)) == 3
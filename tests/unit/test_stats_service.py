@@ -0,0 +1,55 @@
+import pytest
+from datetime import date, timedelta
+from services.stats_service import StatsService
+from models.offender import Offender, CaseType
+
+@pytest.fixture
+def service(db):
+    return StatsService(db)
+
+def add_offender(db, case_number, ward, case_type=CaseType.SUSPENDED_SENTENCE):
+    db.create_offender(Offender(
+        case_number=case_number,
+        full_name='Nguyễn Văn A',
+        ward=ward,
+        case_type=case_type,
+        start_date=date.today() - timedelta(days=60),
+        duration_months=6
+    ))
+
+def test_snapshot_counts_per_dimension(service, db):
+    add_offender(db, 'HS1', 'Bắc Hồng')
+    add_offender(db, 'HS2', 'Bắc Hồng', CaseType.PROBATION)
+    add_offender(db, 'HS3', 'Nam Hồng')
+    assert service.take_daily_snapshot() is True
+    wards = service.get_time_series('ward')
+    assert wards['Bắc Hồng'][0]['count'] == 2
+    assert wards['Nam Hồng'][0]['count'] == 1
+    case_types = service.get_time_series('case_type')
+    assert case_types[CaseType.PROBATION.value][0]['count'] == 1
+    assert service.get_time_series('total')['all'][0]['count'] == 3
+
+def test_snapshot_is_idempotent(service, db):
+    add_offender(db, 'HS1', 'Bắc Hồng')
+    assert service.take_daily_snapshot() is True
+    assert service.take_daily_snapshot() is False
+    add_offender(db, 'HS2', 'Bắc Hồng')
+    assert service.take_daily_snapshot(force=True) is True
+    series = service.get_time_series('total')['all']
+    assert len(series) == 1
+    assert series[0]['count'] == 2
+
+def test_trend_summary(service, db):
+    today = date.today()
+    add_offender(db, 'HS1', 'Bắc Hồng')
+    service.take_daily_snapshot(today - timedelta(days=10))
+    add_offender(db, 'HS2', 'Bắc Hồng')
+    service.take_daily_snapshot(today)
+    summary = service.get_trend_summary('total', days=30)
+    assert summary['all']['start'] == 1
+    assert summary['all']['end'] == 2
+    assert summary['all']['change'] == 1
+
+def test_unknown_dimension(service):
+    with pytest.raises(ValueError):
+        service.get_time_series('unknown')
@@ -235,6 +235,8 @@ class AIToolsWidget(QWidget):
             # Update results
             risk_val = prediction['risk_level'].value if hasattr(prediction['risk_level'], 'value') else str(prediction['risk_level'])
             risk_text = f"Nguy cơ: {risk_val} ({prediction['risk_percentage']:.1f}%)"
+            if prediction.get('model_version'):
+                risk_text += f" - mô hình v{prediction['model_version']}"
             self.risk_result_label.setText(risk_text)
             
             # Show risk factors
@@ -274,7 +276,7 @@ class AIToolsWidget(QWidget):
     def analyze_trends(self):
         """Analyze trends in offender data."""
         try:
-            offenders = self.offender_service.get_all_offenders()
+            offenders = self.offender_service.get_offenders_frame()
             trends = self.ai_service.analyze_trends(offenders)
             
             if not trends:
@@ -0,0 +1,202 @@
+"""
+Batch print dialog: one template for many offenders, rendered on a worker thread.
+"""
+
+import tempfile
+from pathlib import Path
+from typing import List
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QPushButton, QComboBox,
+    QRadioButton, QButtonGroup, QProgressBar, QPlainTextEdit, QFileDialog
+)
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from models.offender import Offender
+from services.document_service import DocumentService, RenderJob, safe_filename
+
+
+class BatchPrintWorker(QObject):
+    """Renders the batch off the GUI thread."""
+
+    progress = pyqtSignal(int, int)  # documents done, total steps
+    finished = pyqtSignal(dict)      # {'success', 'files', 'errors'}
+
+    def __init__(self, document_service: DocumentService, template_name: str,
+                 offenders: List[Offender], output: str, merged: bool, pdf: bool):
+        """Initialize worker."""
+        super().__init__()
+        self.document_service = document_service
+        self.template_name = template_name
+        self.offenders = offenders
+        self.output = output
+        self.merged = merged
+        self.pdf = pdf
+
+    def run(self):
+        """Render one merged document or one file per offender, then emit the result."""
+        service = self.document_service
+        template_path = str(service.templates_dir / self.template_name)
+        try:
+            if self.merged:
+                contexts = (service.build_context(o, self.template_name) for o in self.offenders)
+                count = service.render_merged(template_path, contexts, self.output,
+                                              self.progress.emit, len(self.offenders))
+                result = {'success': True, 'files': [self.output] if count else [], 'errors': []}
+            else:
+                result = self._render_separate(template_path)
+        except Exception as e:
+            result = {'success': False, 'files': [], 'errors': [str(e)]}
+        self.finished.emit(result)
+
+    def _render_separate(self, template_path: str) -> dict:
+        """One .docx per offender (converted in batches when PDF is chosen)."""
+        service = self.document_service
+        total = len(self.offenders) * (2 if self.pdf else 1)
+        stem = Path(self.template_name).stem
+        with tempfile.TemporaryDirectory() as tmp:
+            word_dir = Path(tmp) if self.pdf else Path(self.output)
+            jobs = [
+                RenderJob(o.full_name, service.build_context(o, self.template_name),
+                          str(word_dir / f"{stem}_{safe_filename(o.case_number)}.docx"))
+                for o in self.offenders
+            ]
+            rendered = service.render_batch(template_path, jobs,
+                                             progress=lambda done, _: self.progress.emit(done, total))
+            if not self.pdf:
+                return {'success': True, 'files': rendered['generated_files'], 'errors': rendered['errors']}
+            done = len(jobs)
+            converted = service.export_batch_to_pdf(
+                rendered['generated_files'], self.output,
+                progress=lambda converted_count, _: self.progress.emit(done + converted_count, total)
+            )
+        return {'success': True, 'files': converted['generated_files'],
+                'errors': rendered['errors'] + converted['errors']}
+
+
+class BatchPrintDialog(QDialog):
+    """Choose template, output mode and format once for all selected offenders."""
+
+    def __init__(self, offenders: List[Offender], parent=None):
+        """Initialize dialog."""
+        super().__init__(parent)
+        self.offenders = offenders
+        self.document_service = DocumentService()
+        self.worker_thread = None
+        self.worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup user interface."""
+        self.setWindowTitle("In hàng loạt")
+        self.setMinimumSize(520, 380)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Số đối tượng: {len(self.offenders)}"))
+
+        form = QFormLayout()
+        self.template_combo = QComboBox()
+        self.template_combo.addItems([t['name'] for t in self.document_service.get_available_templates()])
+        form.addRow("Mẫu văn bản:", self.template_combo)
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("Word (.docx)", '.docx')
+        self.format_combo.addItem("PDF (.pdf)", '.pdf')
+        form.addRow("Định dạng:", self.format_combo)
+
+        mode_layout = QHBoxLayout()
+        self.merged_radio = QRadioButton("Gộp thành một file")
+        self.separate_radio = QRadioButton("Mỗi đối tượng một file")
+        self.merged_radio.setChecked(True)
+        self.mode_group = QButtonGroup(self)
+        self.mode_group.addButton(self.merged_radio)
+        self.mode_group.addButton(self.separate_radio)
+        mode_layout.addWidget(self.merged_radio)
+        mode_layout.addWidget(self.separate_radio)
+        form.addRow("Kiểu xuất:", mode_layout)
+        layout.addLayout(form)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, max(len(self.offenders), 1))
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Sẵn sàng")
+        layout.addWidget(self.status_label)
+
+        self.error_list = QPlainTextEdit()
+        self.error_list.setReadOnly(True)
+        self.error_list.setPlaceholderText("Các văn bản lỗi sẽ hiển thị ở đây")
+        layout.addWidget(self.error_list)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.start_btn = QPushButton("Tạo văn bản")
+        self.start_btn.setEnabled(self.template_combo.count() > 0)
+        self.start_btn.clicked.connect(self.start_print)
+        buttons.addWidget(self.start_btn)
+        self.close_btn = QPushButton("Đóng")
+        self.close_btn.clicked.connect(self.close)
+        buttons.addWidget(self.close_btn)
+        layout.addLayout(buttons)
+
+    def _choose_output(self, template_name: str, suffix: str, merged: bool) -> str:
+        """Ask for the merged file or the folder of separate files."""
+        if not merged:
+            return QFileDialog.getExistingDirectory(self, "Chọn thư mục lưu văn bản")
+        name = f"{Path(template_name).stem}_{len(self.offenders)}_doi_tuong{suffix}"
+        file_filter = "PDF Files (*.pdf)" if suffix == '.pdf' else "Word Files (*.docx)"
+        path, _ = QFileDialog.getSaveFileName(self, "Lưu văn bản gộp", name, file_filter)
+        if path and not path.lower().endswith(suffix):
+            path += suffix
+        return path
+
+    def start_print(self):
+        """Ask for the output location and render on a worker thread."""
+        template_name = self.template_combo.currentText()
+        suffix = self.format_combo.currentData()
+        merged = self.merged_radio.isChecked()
+        output = self._choose_output(template_name, suffix, merged)
+        if not output:
+            return
+
+        self.error_list.clear()
+        self.status_label.setText("Đang tạo văn bản...")
+        for widget in (self.start_btn, self.close_btn, self.template_combo, self.format_combo,
+                       self.merged_radio, self.separate_radio):
+            widget.setEnabled(False)
+
+        self.worker_thread = QThread(self)
+        self.worker = BatchPrintWorker(self.document_service, template_name, self.offenders,
+                                       output, merged, suffix == '.pdf')
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.finished.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.worker.deleteLater)
+        self.worker_thread.start()
+
+    def on_progress(self, done: int, total: int):
+        """Update the progress bar."""
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"Đang tạo văn bản {done}/{total}...")
+
+    def on_finished(self, result: dict):
+        """Show the outcome and any per-document errors."""
+        self.worker = None
+        for widget in (self.start_btn, self.close_btn, self.template_combo, self.format_combo,
+                       self.merged_radio, self.separate_radio):
+            widget.setEnabled(True)
+        if result['success']:
+            self.status_label.setText(f"Đã tạo {len(result['files'])} file, {len(result['errors'])} lỗi")
+        else:
+            self.status_label.setText("Không thể tạo văn bản")
+        self.error_list.setPlainText("\n".join(result['errors']))
+
+    def closeEvent(self, event):
+        """Keep the dialog open while rendering."""
+        if self.worker_thread and self.worker_thread.isRunning():
+            event.ignore()
+            return
+        super().closeEvent(event)
@@ -5,7 +5,7 @@ Dashboard widget for displaying system overview and statistics.
 """
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QGroupBox, QGridLayout, QSizePolicy
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QGroupBox, QGridLayout, QSizePolicy
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QPropertyAnimation, QSequentialAnimationGroup, QParallelAnimationGroup, QPoint, QEasingCurve, QPauseAnimation
 from PyQt6.QtGui import QFont, QMouseEvent
@@ -15,12 +15,16 @@ from PyQt6.QtWidgets import QGraphicsOpacityEffect
 
 from typing import List, Dict, Any
 
-from models.offender import RiskLevel
 from services.offender_service import OffenderService
 from services.ai_service import AIService
+from services.notification_service import NotificationScanner
 from ui.notification_card import NotificationCard
 
 
+# Entries shown in "Hoạt động gần đây"
+RECENT_ACTIVITY_LIMIT = 5
+
+
 class ClickableCard(QFrame):
     """Clickable card widget for dashboard statistics với SVG icon, shadow, counter effect."""
     clicked = pyqtSignal(str)
@@ -110,6 +114,7 @@ class Dashboard(QWidget):
     # Signals
     refresh_requested = pyqtSignal()
     card_clicked = pyqtSignal(str, dict)  # action_type, filter_data
+    cohorts_changed = pyqtSignal(dict)  # changed cohort counts, emitted from the scanner thread
     
     def __init__(self, offender_service: OffenderService, 
                  ai_service: AIService, parent=None):
@@ -121,6 +126,9 @@ class Dashboard(QWidget):
         self._stats_grid = None
         self._notifications_layout = None
         self.notification_cards = []
+        # Cohort counts are recounted off the GUI thread; the cards show its cached snapshot
+        self.scanner = NotificationScanner(offender_service.db_manager,
+                                           on_change=self.cohorts_changed.emit)
         self.setup_ui()
         self.setup_connections()
         
@@ -214,7 +222,7 @@ class Dashboard(QWidget):
             {
                 "type": "warning",
                 "title": "CẢNH BÁO HỆ THỐNG",
-                "message": "5 đối tượng sắp hết hạn thi hành án trong 30 ngày tới",
+                "message": "Đang kiểm tra đối tượng sắp hết hạn...",
                 "action_text": "Xem chi tiết"
             },
             {
@@ -226,14 +234,26 @@ class Dashboard(QWidget):
             {
                 "type": "success",
                 "title": "HOÀN THÀNH NHIỆM VỤ",
-                "message": "15 đối tượng đã hoàn thành thi hành án thành công",
+                "message": "Đang kiểm tra đối tượng hoàn thành...",
                 "action_text": "Xem danh sách"
             },
             {
                 "type": "error",
                 "title": "VI PHẠM MỚI",
-                "message": "3 đối tượng vi phạm quy định thi hành án",
+                "message": "Đang kiểm tra vi phạm...",
                 "action_text": "Xử lý ngay"
+            },
+            {
+                "type": "error",
+                "title": "QUÁ HẠN",
+                "message": "Đang kiểm tra đối tượng quá hạn...",
+                "action_text": "Xem danh sách"
+            },
+            {
+                "type": "info",
+                "title": "ĐỦ ĐIỀU KIỆN GIẢM ÁN",
+                "message": "Đang kiểm tra đối tượng đủ điều kiện giảm án...",
+                "action_text": "Xem danh sách"
             }
         ]
         
@@ -289,10 +309,17 @@ class Dashboard(QWidget):
         elif action_type == "violations":
             # Chuyển đến danh sách đối tượng với filter vi phạm
             self.card_clicked.emit("offender_list", {"filter": "violations"})
+        elif action_type == "overdue_offenders":
+            # Chuyển đến danh sách đối tượng quá hạn nhưng chưa hoàn thành
+            self.card_clicked.emit("offender_list", {"filter": "overdue"})
+        elif action_type == "reduction_eligible":
+            # Chuyển đến danh sách đối tượng đủ điều kiện giảm án
+            self.card_clicked.emit("offender_list", {"filter": "reduction_eligible"})
 
     def handle_notification_action_by_index(self, index: int):
         """Handle notification action by card index."""
-        action_types = ["expiring_offenders", "ai_analysis", "completed_offenders", "violations"]
+        action_types = ["expiring_offenders", "ai_analysis", "completed_offenders", "violations",
+                        "overdue_offenders", "reduction_eligible"]
         if 0 <= index < len(action_types):
             self.handle_notification_action(action_types[index])
 
@@ -393,6 +420,13 @@ class Dashboard(QWidget):
         # Connect activity group click
         self.activity_group.mousePressEvent = lambda event: self.handle_group_click("activity", event)
         
+        # Cohort counts arrive (queued) from the scanner thread
+        self.cohorts_changed.connect(self.apply_cohorts)
+        self.scanner.start()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.scanner.stop)
+        
     def handle_card_click(self, action_type: str, status: str = None):
         """Handle stat card click."""
         filter_data = {}
@@ -409,12 +443,9 @@ class Dashboard(QWidget):
     def refresh_data(self):
         """Refresh dashboard data."""
         try:
-            # Update statistics
-            stats = self.get_statistics()
-            self.update_statistics_cards(stats)
-            
-            # Update notifications
-            self.update_notifications()
+            # Show the last counts at once; the scanner reports what changed since
+            self.apply_cohorts(self.scanner.snapshot)
+            self.scanner.request_scan()
             
             # Update activity
             activities = self.get_recent_activity()
@@ -423,83 +454,53 @@ class Dashboard(QWidget):
         except Exception as e:
             print(f"Error refreshing dashboard: {e}")
             
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get current statistics."""
-        try:
-            total_offenders = self.offender_service.get_total_count()
-            active_offenders = self.offender_service.get_count_by_status("active")
-            expiring_offenders = self.offender_service.get_count_by_status("expiring")
-            violation_offenders = self.offender_service.get_count_by_status("violation")
-            high_risk_offenders = self.offender_service.get_count_by_risk_level(RiskLevel.HIGH)
+    def apply_cohorts(self, cohorts: Dict[str, int]):
+        """Update the cards whose cohort counts are given (all or only the changed ones)."""
+        self.update_statistics_cards(cohorts)
+        self.update_notifications(cohorts)
             
-            return {
-                "active": active_offenders,
-                "expiring": expiring_offenders,
-                "violation": violation_offenders,
-                "high_risk": high_risk_offenders
-            }
-        except Exception as e:
-            print(f"Error getting statistics: {e}")
-            return {"active": 0, "expiring": 0, "violation": 0, "high_risk": 0}
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get current statistics (from the scanner's latest snapshot)."""
+        snapshot = self.scanner.snapshot
+        return {key: snapshot.get(key, 0) for key in ("active", "expiring", "violation", "high_risk")}
             
     def update_statistics_cards(self, stats: Dict[str, Any]):
-        """Update statistics cards with new data."""
+        """Update statistics cards with new data (keys missing from stats are left as is)."""
         if len(self.stat_cards) >= 4:
-            self.stat_cards[0].set_value(stats.get("active", 0))
-            self.stat_cards[1].set_value(stats.get("expiring", 0))
-            self.stat_cards[2].set_value(stats.get("violation", 0))
-            self.stat_cards[3].set_value(stats.get("high_risk", 0))
+            for card, key in zip(self.stat_cards, ("active", "expiring", "violation", "high_risk")):
+                if key in stats:
+                    card.set_value(stats[key])
 
-    def update_notifications(self):
-        """Update notification cards với dữ liệu thực tế."""
-        try:
-            # Lấy dữ liệu thực tế từ services
-            expiring_count = self.offender_service.get_count_by_status("expiring")
-            violation_count = self.offender_service.get_count_by_status("violation")
-            completed_count = self.offender_service.get_count_by_status("completed")
-            
-            # Cập nhật nội dung notification cards
-            if len(self.notification_cards) >= 4:
-                # Card 1: Cảnh báo sắp hết hạn
-                if expiring_count > 0:
-                    self.notification_cards[0].update_message(
-                        f"{expiring_count} đối tượng sắp hết hạn thi hành án trong 30 ngày tới"
-                    )
-                else:
-                    self.notification_cards[0].update_message("Không có đối tượng sắp hết hạn")
-                
-                # Card 2: AI phân tích (giữ nguyên)
-                # Card 3: Hoàn thành
-                if completed_count > 0:
-                    self.notification_cards[2].update_message(
-                        f"{completed_count} đối tượng đã hoàn thành thi hành án thành công"
-                    )
-                else:
-                    self.notification_cards[2].update_message("Chưa có đối tượng hoàn thành")
-                
-                # Card 4: Vi phạm
-                if violation_count > 0:
-                    self.notification_cards[3].update_message(
-                        f"{violation_count} đối tượng vi phạm quy định thi hành án"
-                    )
-                else:
-                    self.notification_cards[3].update_message("Không có vi phạm mới")
-                    
-        except Exception as e:
-            print(f"Error updating notifications: {e}")
+    def update_notifications(self, cohorts: Dict[str, int]):
+        """Update notification cards với số liệu từ bộ quét (chỉ các card có số liệu mới)."""
+        messages = {
+            # cohort: (card index, message when > 0, message when 0)
+            "expiring": (0, "{} đối tượng sắp hết hạn thi hành án trong 30 ngày tới",
+                         "Không có đối tượng sắp hết hạn"),
+            # Card 2: AI phân tích (giữ nguyên)
+            "completed": (2, "{} đối tượng đã hoàn thành thi hành án thành công",
+                          "Chưa có đối tượng hoàn thành"),
+            "violation": (3, "{} đối tượng vi phạm quy định thi hành án", "Không có vi phạm mới"),
+            "overdue": (4, "{} đối tượng đã quá ngày kết thúc nhưng chưa được xác nhận hoàn thành",
+                        "Không có đối tượng quá hạn"),
+            "reduction_eligible": (5, "{} đối tượng đã chấp hành đủ 1/3 thời gian, có thể xét giảm án",
+                                   "Chưa có đối tượng đủ điều kiện giảm án"),
+        }
+        for cohort, (index, message, empty_message) in messages.items():
+            if cohort not in cohorts or index >= len(self.notification_cards):
+                continue
+            count = cohorts[cohort]
+            self.notification_cards[index].update_message(message.format(count) if count > 0 else empty_message)
             
     def get_recent_activity(self) -> List[str]:
         """Get recent activity data."""
         try:
-            # Lấy hoạt động gần đây từ database
-            activities = [
-                "15/11: Thêm đối tượng Nguyễn Văn A",
-                "14/11: Cập nhật trạng thái 3 đối tượng",
-                "13/11: Xuất báo cáo tháng 11",
-                "12/11: Nhập dữ liệu từ file Excel",
-                "11/11: Tạo báo cáo vi phạm"
+            # Lấy hoạt động gần đây từ nhật ký (đọc theo chỉ mục created_at)
+            entries = self.offender_service.activity_log.recent(RECENT_ACTIVITY_LIMIT)
+            return [
+                f"{entry['created_at'].strftime('%d/%m %H:%M')}: {entry['description']}"
+                for entry in entries
             ]
-            return activities
         except Exception as e:
             print(f"Error getting recent activity: {e}")
             return ["Không có hoạt động gần đây"]
@@ -0,0 +1,173 @@
+"""
+Excel import dialog running the import on a worker thread.
+"""
+
+import threading
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox,
+    QProgressBar, QPlainTextEdit
+)
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from services.excel_service import ExcelService
+from services.offender_service import OffenderService
+
+
+class ExcelImportWorker(QObject):
+    """Runs ExcelService.import_from_excel off the GUI thread."""
+
+    progress = pyqtSignal(int, int)  # rows read, estimated total rows
+    finished = pyqtSignal(dict)      # import result
+
+    def __init__(self, offender_service: OffenderService, file_path: str, dry_run: bool = False):
+        """Initialize worker."""
+        super().__init__()
+        self.offender_service = offender_service
+        self.file_path = file_path
+        self.dry_run = dry_run
+        self._cancel = threading.Event()
+
+    def run(self):
+        """Run the import on a connection of its own and emit the result."""
+        db_manager = self.offender_service.db_manager.clone()
+        try:
+            db_manager.connect()
+            excel_service = ExcelService(OffenderService(db_manager))
+            result = excel_service.import_from_excel(
+                self.file_path, self.dry_run, self.progress.emit, self._cancel.is_set
+            )
+        except Exception as e:
+            result = {'success': False, 'error': str(e), 'imported_count': 0, 'errors': []}
+        finally:
+            db_manager.disconnect()
+        self.finished.emit(result)
+
+    def cancel(self):
+        """Ask the import to stop; the chunk being written is rolled back."""
+        self._cancel.set()
+
+
+class ExcelImportDialog(QDialog):
+    """Dialog showing progress, cancellation and the per-row errors of an import."""
+
+    # Emitted when records were written to the database
+    data_imported = pyqtSignal()
+
+    def __init__(self, offender_service: OffenderService, file_path: str, parent=None):
+        """Initialize dialog."""
+        super().__init__(parent)
+        self.offender_service = offender_service
+        self.file_path = file_path
+        self.worker_thread = None
+        self.worker = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup user interface."""
+        self.setWindowTitle("Nhập dữ liệu từ Excel")
+        self.setMinimumSize(520, 360)
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel(f"Tệp: {self.file_path}"))
+
+        self.dry_run_checkbox = QCheckBox("Chỉ kiểm tra dữ liệu (không ghi vào cơ sở dữ liệu)")
+        layout.addWidget(self.dry_run_checkbox)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Sẵn sàng")
+        layout.addWidget(self.status_label)
+
+        self.error_list = QPlainTextEdit()
+        self.error_list.setReadOnly(True)
+        self.error_list.setPlaceholderText("Các dòng lỗi sẽ hiển thị ở đây")
+        layout.addWidget(self.error_list)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.start_btn = QPushButton("Bắt đầu")
+        self.start_btn.clicked.connect(self.start_import)
+        buttons.addWidget(self.start_btn)
+        self.cancel_btn = QPushButton("Hủy")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_import)
+        buttons.addWidget(self.cancel_btn)
+        self.close_btn = QPushButton("Đóng")
+        self.close_btn.clicked.connect(self.close)
+        buttons.addWidget(self.close_btn)
+        layout.addLayout(buttons)
+
+    def start_import(self):
+        """Start the import on a worker thread."""
+        self.error_list.clear()
+        self.progress_bar.setRange(0, 0)  # busy until the first chunk is done
+        self.status_label.setText("Đang đọc dữ liệu...")
+        self.start_btn.setEnabled(False)
+        self.dry_run_checkbox.setEnabled(False)
+        self.close_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+
+        self.worker_thread = QThread(self)
+        self.worker = ExcelImportWorker(
+            self.offender_service, self.file_path, self.dry_run_checkbox.isChecked()
+        )
+        self.worker.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.worker.run)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_finished)
+        self.worker.finished.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.worker.deleteLater)
+        self.worker_thread.start()
+
+    def cancel_import(self):
+        """Request cancellation of the running import."""
+        if self.worker:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText("Đang hủy...")
+
+    def on_progress(self, done: int, total: int):
+        """Update the progress bar."""
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        action = "Đang kiểm tra" if self.worker and self.worker.dry_run else "Đang nhập"
+        self.status_label.setText(f"{action} {done}/{total} dòng...")
+
+    def on_finished(self, result: dict):
+        """Show the outcome and the per-row errors."""
+        self.worker = None
+        self.cancel_btn.setEnabled(False)
+        self.close_btn.setEnabled(True)
+        self.start_btn.setEnabled(True)
+        self.dry_run_checkbox.setEnabled(True)
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 1)
+
+        if not result['success']:
+            self.status_label.setText(result.get('error', 'Lỗi nhập Excel'))
+        elif result.get('dry_run'):
+            self.status_label.setText(
+                f"Kiểm tra xong: {result['created_count']} mới, {result['updated_count']} cập nhật, "
+                f"{len(result['errors'])} dòng lỗi (chưa ghi dữ liệu)"
+            )
+        else:
+            prefix = "Đã hủy sau khi nhập" if result.get('cancelled') else "Đã nhập"
+            self.status_label.setText(
+                f"{prefix} {result['imported_count']} đối tượng ({result['created_count']} mới, "
+                f"{result['updated_count']} cập nhật), {len(result['errors'])} dòng lỗi"
+            )
+        self.error_list.setPlainText("\n".join(result.get('errors', [])))
+
+        if result.get('imported_count'):
+            self.data_imported.emit()
+
+    def closeEvent(self, event):
+        """Keep the dialog open while an import is running."""
+        if self.worker_thread and self.worker_thread.isRunning():
+            event.ignore()
+            return
+        super().closeEvent(event)
@@ -242,6 +242,20 @@ class MainWindow(QMainWindow):
         new_offender_action.triggered.connect(self.show_offender_form)
         file_menu.addAction(new_offender_action)
         
+        export_menu = file_menu.addMenu("&Xuất dữ liệu")
+        
+        export_excel_action = QAction("&Excel (.xlsx)", self)
+        export_excel_action.triggered.connect(self.offender_list.export_to_excel)
+        export_menu.addAction(export_excel_action)
+        
+        export_json_action = QAction("&JSON", self)
+        export_json_action.triggered.connect(self.offender_list.export_to_json)
+        export_menu.addAction(export_json_action)
+        
+        export_parquet_action = QAction("&Parquet (phân tích)", self)
+        export_parquet_action.triggered.connect(self.offender_list.export_to_parquet)
+        export_menu.addAction(export_parquet_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("&Thoát", self)
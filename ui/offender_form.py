@@ -26,10 +26,16 @@ from underthesea import ner
 from fuzzywuzzy import process
 
 from constants import COMPONENT_SIZES
+from database.database_manager import ConcurrencyConflictError
 from models.offender import Offender, Gender, CaseType
+from utils.spreadsheet_reader import iter_sheet_chunks
 from services.offender_service import OffenderService
 
 
+# Rows of a spreadsheet/CSV used to fill the form (one record, not a whole caseload)
+FILL_FROM_FILE_MAX_ROWS = 50
+
+
 class OffenderForm(QWidget):
     """Form for adding/editing offender information."""
     
@@ -42,6 +48,7 @@ class OffenderForm(QWidget):
         super().__init__(parent)
         self.offender_service = offender_service
         self.current_offender_id: Optional[int] = None
+        self.loaded_offender: Optional[Offender] = None  # Bản ghi lúc tải, dùng để gộp khi xung đột
         self.setup_ui()
         self.setup_connections()
         
@@ -439,6 +446,7 @@ class OffenderForm(QWidget):
             offender = self.offender_service.get_offender(offender_id)
             if offender:
                 self.current_offender_id = offender_id
+                self.loaded_offender = offender
                 self.populate_form(offender)
                 self.calculate_fields()
         except Exception as e:
@@ -491,9 +499,17 @@ class OffenderForm(QWidget):
             data = self.collect_form_data()
             
             if self.current_offender_id:
-                # Update existing offender
-                success = self.offender_service.update_offender(self.current_offender_id, data)
+                # Update existing offender, checking nobody else saved it meanwhile
+                if self.loaded_offender:
+                    data['row_version'] = self.loaded_offender.row_version
+                try:
+                    success = self.offender_service.update_offender(self.current_offender_id, data)
+                except ConcurrencyConflictError as conflict:
+                    success = self.resolve_save_conflict(data, conflict)
+                    if success is None:
+                        return
                 if success:
+                    self.loaded_offender = self.offender_service.get_offender(self.current_offender_id)
                     QMessageBox.information(self, "Thành công", "Cập nhật đối tượng thành công!")
                     self.offender_saved.emit(self.current_offender_id)
                 else:
@@ -507,6 +523,43 @@ class OffenderForm(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể lưu đối tượng: {str(e)}")
             
+    def resolve_save_conflict(self, data: Dict[str, Any],
+                              conflict: ConcurrencyConflictError) -> Optional[bool]:
+        """Xử lý khi đối tượng đã bị người khác cập nhật. Trả về None nếu người dùng hủy."""
+        current = conflict.current
+        merged, conflicts = self.offender_service.merge_offender_changes(
+            self.loaded_offender, data, current
+        )
+        
+        if not conflicts:
+            reply = QMessageBox.question(
+                self, "Dữ liệu đã thay đổi",
+                "Đối tượng vừa được người khác cập nhật nhưng không trùng trường bạn sửa.\n"
+                "Gộp thay đổi của bạn vào bản mới nhất và lưu?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.Cancel
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return None
+            return self.offender_service.update_offender(self.current_offender_id, merged)
+        
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Icon.Warning)
+        box.setWindowTitle("Xung đột cập nhật")
+        box.setText(
+            "Đối tượng đã được người khác cập nhật. Các trường bị sửa ở cả hai phía:\n"
+            + "\n".join(f"• {field}" for field in conflicts)
+        )
+        overwrite_button = box.addButton("Ghi đè bằng dữ liệu của tôi", QMessageBox.ButtonRole.AcceptRole)
+        reload_button = box.addButton("Tải lại bản mới nhất", QMessageBox.ButtonRole.ResetRole)
+        box.addButton(QMessageBox.StandardButton.Cancel)
+        box.exec()
+        
+        if box.clickedButton() == overwrite_button:
+            return self.offender_service.update_offender(self.current_offender_id, merged)
+        if box.clickedButton() == reload_button:
+            self.load_offender(self.current_offender_id)
+        return None
+    
     def validate_form(self) -> bool:
         """Validate form data và hiển thị lỗi trực quan."""
         valid = True
@@ -667,6 +720,7 @@ class OffenderForm(QWidget):
     def clear_form(self):
         """Clear form for new entry."""
         self.current_offender_id = None
+        self.loaded_offender = None
         
         # Clear all fields
         self.case_number_edit.clear()
@@ -816,7 +870,8 @@ class OffenderForm(QWidget):
         text = ""
         try:
             if ext in ["xlsx", "xls", "csv"]:
-                df = pd.read_excel(file_path) if ext != "csv" else pd.read_csv(file_path)
+                # Only the first rows describe the record being filled; don't load the whole file
+                df = next(iter_sheet_chunks(file_path, FILL_FROM_FILE_MAX_ROWS), pd.DataFrame())
                 text = "\n".join([str(val) for val in df.values.flatten() if pd.notnull(val)])
             elif ext == "docx":
                 doc = docx.Document(file_path)
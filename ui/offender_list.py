@@ -626,26 +626,14 @@ class OffenderList(QWidget):
             from PyQt6.QtWidgets import QFileDialog
             
             filename, _ = QFileDialog.getOpenFileName(
-                self, "Nhập Excel", "", "Excel Files (*.xlsx *.xls)"
+                self, "Nhập Excel", "", "Excel/CSV Files (*.xlsx *.xls *.csv)"
             )
             
             if filename:
-                from services.excel_service import ExcelService
-                excel_service = ExcelService(self.offender_service)
-                
-                result = excel_service.import_from_excel(filename)
-                
-                if result['success']:
-                    QMessageBox.information(
-                        self, "Thành công", 
-                        f"Đã nhập {result['imported_count']} đối tượng từ Excel!"
-                    )
-                    self.refresh_data()
-                else:
-                    error_msg = f"Lỗi nhập Excel: {result.get('error', '')}"
-                    if result['errors']:
-                        error_msg += f"\n\nChi tiết lỗi:\n" + "\n".join(result['errors'])
-                    QMessageBox.warning(self, "Lỗi", error_msg)
+                from ui.import_dialog import ExcelImportDialog
+                dialog = ExcelImportDialog(self.offender_service, filename, self)
+                dialog.data_imported.connect(self.refresh_data)
+                dialog.exec()
                     
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể nhập Excel: {str(e)}")
@@ -653,7 +641,7 @@ class OffenderList(QWidget):
     def export_to_excel(self):
         """Export data to Excel."""
         try:
-            from PyQt6.QtWidgets import QFileDialog
+            from PyQt6.QtWidgets import QFileDialog, QProgressDialog, QApplication
             filename, _ = QFileDialog.getSaveFileName(
                 self, "Xuất Excel", "offenders.xlsx", "Excel Files (*.xlsx)"
             )
@@ -661,8 +649,17 @@ class OffenderList(QWidget):
             if filename:
                 from services.excel_service import ExcelService
                 excel_service = ExcelService(self.offender_service)
+                progress_dialog = QProgressDialog("Đang xuất Excel...", None, 0, 0, self)
+                progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+                progress_dialog.setMinimumDuration(500)
                 
-                success = excel_service.export_to_excel(self.offenders, filename)
+                def on_progress(done: int, total: int):
+                    progress_dialog.setMaximum(total)
+                    progress_dialog.setValue(done)
+                    QApplication.processEvents()
+                
+                success = excel_service.export_all_to_excel(filename, progress=on_progress)
+                progress_dialog.close()
                 if success:
                     QMessageBox.information(self, "Thành công", f"Dữ liệu đã được xuất đến {filename}")
                 else:
@@ -673,25 +670,60 @@ class OffenderList(QWidget):
     def export_to_json(self):
         """Export data to JSON."""
         try:
-            from PyQt6.QtWidgets import QFileDialog
+            from PyQt6.QtWidgets import QFileDialog, QProgressDialog, QApplication
             filename, _ = QFileDialog.getSaveFileName(
-                self, "Xuất JSON", "offenders.json", "JSON Files (*.json)"
+                self, "Xuất JSON", "offenders.json",
+                "JSON Files (*.json);;JSON Lines (*.jsonl);;"
+                "JSON nén (*.json.gz);;JSON Lines nén (*.jsonl.gz)"
             )
             
             if filename:
-                import json
-                offenders_data = []
-                for offender in self.offenders:
-                    offenders_data.append(offender.to_dict())
+                from services.export_service import ExportService
+                progress_dialog = QProgressDialog("Đang xuất JSON...", None, 0, 0, self)
+                progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+                progress_dialog.setMinimumDuration(500)
                 
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(offenders_data, f, ensure_ascii=False, indent=2)
+                def on_progress(done: int, total: int):
+                    progress_dialog.setMaximum(total)
+                    progress_dialog.setValue(done)
+                    QApplication.processEvents()
                 
-                QMessageBox.information(self, "Thành công", "Xuất JSON thành công!")
+                export_service = ExportService(self.offender_service.db_manager)
+                count = export_service.export_json(filename, progress=on_progress)
+                progress_dialog.close()
+                
+                QMessageBox.information(self, "Thành công", f"Xuất JSON thành công ({count} đối tượng)!")
                 
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể xuất JSON: {str(e)}")
             
+    def export_to_parquet(self):
+        """Export offenders, violations and reductions as Parquet files for analysis."""
+        try:
+            from PyQt6.QtWidgets import QFileDialog, QProgressDialog, QApplication
+            directory = QFileDialog.getExistingDirectory(self, "Chọn thư mục xuất Parquet")
+            
+            if directory:
+                from services.export_service import ExportService
+                progress_dialog = QProgressDialog("Đang xuất Parquet...", None, 0, 0, self)
+                progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+                progress_dialog.setMinimumDuration(500)
+                
+                def on_progress(done: int, total: int):
+                    progress_dialog.setMaximum(total)
+                    progress_dialog.setValue(done)
+                    QApplication.processEvents()
+                
+                export_service = ExportService(self.offender_service.db_manager)
+                counts = export_service.export_columnar(directory, 'parquet', progress=on_progress)
+                progress_dialog.close()
+                
+                summary = ", ".join(f"{table}: {count}" for table, count in counts.items())
+                QMessageBox.information(self, "Thành công", f"Xuất Parquet thành công ({summary})!")
+                
+        except Exception as e:
+            QMessageBox.critical(self, "Lỗi", f"Không thể xuất Parquet: {str(e)}")
+            
     def show_context_menu(self, position):
         """Show context menu."""
         menu = QMenu()
@@ -737,7 +769,8 @@ class OffenderList(QWidget):
     def refresh_data(self):
         """Refresh offender data."""
         try:
-            self.offenders = self.offender_service.get_all_offenders()
+            # Slotted read-only records: the list lives as long as the window
+            self.offenders = self.offender_service.get_compact_offenders()
             # --- Populate area and case_type filter dynamically ---
             ward_set = set()
             for offender in self.offenders:
@@ -912,20 +945,16 @@ class OffenderList(QWidget):
                 QMessageBox.critical(self, "Lỗi", "Không thể xuất dữ liệu!")
 
     def bulk_print_selected(self):
+        """Print the chosen template for every selected offender from one batch dialog."""
         if not self.selected_ids:
             return
         offenders_to_print = [o for o in self.offenders if str(o.id) in self.selected_ids]
         if not offenders_to_print:
             QMessageBox.warning(self, "Cảnh báo", "Không có đối tượng nào để in!")
             return
-        self.bulk_print_btn.setEnabled(False)
-        # Mở dialog in cho từng đối tượng (hoặc có thể mở dialog batch nếu có)
-        for offender in offenders_to_print:
-            context = offender.to_dict()
-            dialog = PrintTemplateDialog(context, self)
-            dialog.exec()
-        self.bulk_print_btn.setEnabled(True)
-        QMessageBox.information(self, "Thành công", f"Đã in báo cáo cho {len(offenders_to_print)} đối tượng!") 
+        from ui.batch_print_dialog import BatchPrintDialog
+        dialog = BatchPrintDialog(offenders_to_print, self)
+        dialog.exec()
 
     def set_tab_order_accessibility(self):
         """Đảm bảo accessibility: set tab order cho các input, filter, button, table."""
@@ -319,13 +319,12 @@ class ReportsWidget(QWidget):
                 'case_type': self.case_type_filter_combo.currentText()
             }
             
-            # Get offenders
-            offenders = self.offender_service.get_all_offenders()
-            
-            # Generate report
-            report_data = self.report_service.generate_report(
-                report_type, offenders, filters
-            )
+            # Read offenders from one consistent snapshot and generate report
+            with self.offender_service.read_snapshot() as snapshot:
+                offenders = snapshot.get_offenders_frame()
+                report_data = self.report_service.generate_report(
+                    report_type, offenders, filters
+                )
             
             # Display report
             self.display_report(report_data)
@@ -416,22 +415,10 @@ Phân bố nguy cơ chi tiết:
             )
             
             if filename:
-                # Get current report data
-                report_type = self.report_type_combo.currentText()
-                filters = {
-                    'start_date': self.start_date_edit.date().toPyDate(),
-                    'end_date': self.end_date_edit.date().toPyDate(),
-                    'location': self.location_filter_combo.currentText(),
-                    'case_type': self.case_type_filter_combo.currentText()
-                }
-                
-                offenders = self.offender_service.get_all_offenders()
-                report_data = self.report_service.generate_report(
-                    "excel", offenders, filters
-                )
-                
-                # Export to Excel using report service
-                success = self.report_service.export_to_excel(offenders, filename)
+                # Export to Excel using report service, reading one consistent snapshot
+                with self.offender_service.read_snapshot() as snapshot:
+                    offenders = snapshot.get_all_offenders()
+                    success = self.report_service.export_to_excel(offenders, filename)
                 
                 if success:
                     QMessageBox.information(
@@ -0,0 +1,119 @@
+"""
+Chunked reading of large spreadsheets (.xlsx) and CSV files.
+
+Rows are yielded as DataFrames of at most ``chunk_size`` rows, so memory does
+not grow with the file. Each chunk's index is the 0-based data row number
+(row 1 of the sheet is the header), so ``index + 2`` is the row shown in Excel.
+"""
+
+import zipfile
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Formats openpyxl can stream in read-only mode
+OPENPYXL_SUFFIXES = ('.xlsx', '.xlsm')
+CSV_SUFFIXES = ('.csv', '.txt')
+
+
+def _header_names(values) -> List[str]:
+    """Column names like pandas gives them: stripped text, 'Unnamed: i' for blanks."""
+    return [
+        str(value).strip() if value is not None and str(value).strip() else f"Unnamed: {index}"
+        for index, value in enumerate(values)
+    ]
+
+
+def _iter_xlsx_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """First worksheet of an .xlsx file, read row by row in read-only mode."""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        width = len(columns)
+        offset = 0
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                return
+            index = range(offset, offset + len(batch))
+            offset += len(batch)
+            # Fully empty rows (e.g. formatted but unused ones) are dropped, keeping row numbers;
+            # rows whose trailing cells are empty come back short and are padded
+            kept = [(i, row[:width] + (None,) * (width - len(row))) for i, row in zip(index, batch)
+                    if any(value is not None and value != '' for value in row)]
+            if kept:
+                yield pd.DataFrame([row for _, row in kept], columns=columns,
+                                   index=[i for i, _ in kept], dtype=object)
+    finally:
+        workbook.close()
+
+
+def iter_sheet_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield the first sheet of ``file_path`` (or a CSV file) in DataFrames of up to chunk_size rows.
+
+    Cells are kept as read (dtype object): text stays text, so date and number
+    parsing is left to the caller.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix in CSV_SUFFIXES:
+        yield from pd.read_csv(file_path, chunksize=chunk_size, dtype=object,
+                               encoding='utf-8-sig', skip_blank_lines=True)
+    elif suffix in OPENPYXL_SUFFIXES:
+        yield from _iter_xlsx_chunks(file_path, chunk_size)
+    else:
+        # Legacy .xls cannot be streamed; read it once and hand it out in chunks
+        df = pd.read_excel(file_path, sheet_name=0, dtype=object)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def _count_xml_rows(file_path: str, worksheet_path: str) -> int:
+    """Count <row> elements in a worksheet by scanning the compressed XML stream."""
+    count = 0
+    tail = b''
+    with zipfile.ZipFile(file_path) as archive, archive.open(worksheet_path) as xml:
+        for block in iter(lambda: xml.read(1 << 20), b''):
+            data = tail + block
+            count += data.count(b'<row ') + data.count(b'<row>')
+            # Keep a few bytes so a tag split across blocks is counted once, in the next block
+            tail = data[-5:]
+            count -= tail.count(b'<row ') + tail.count(b'<row>')
+    return count
+
+
+def estimate_row_count(file_path: str) -> Optional[int]:
+    """Number of data rows, for progress reporting; None when unknown.
+
+    Uses the sheet dimension stored in .xlsx files and a line count for CSV,
+    so neither reads the cells. Blank rows are included in the estimate.
+    """
+    suffix = Path(file_path).suffix.lower()
+    try:
+        if suffix in CSV_SUFFIXES:
+            with open(file_path, 'rb') as f:
+                lines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+            return max(lines - 1, 0)
+        if suffix in OPENPYXL_SUFFIXES:
+            workbook = load_workbook(file_path, read_only=True)
+            try:
+                sheet = workbook.worksheets[0]
+                max_row = sheet.max_row
+                if not max_row:
+                    # Files saved in write-only mode carry no dimension: count row tags instead
+                    max_row = _count_xml_rows(file_path, sheet._worksheet_path)
+            finally:
+                workbook.close()
+            return max(max_row - 1, 0) if max_row else None
+    except Exception:
+        return None
+    return None